@@ -1,5 +1,627 @@
-class Beam():
-    pass
+import numpy as np
+from StructEng.Sections.class_ConcreteSection import ConcreteSection
+from StructEng.Sections.class_RectConcSect import RectConcSect
+from StructEng.Sections.class_CrackWidth import CrackWidth
 
-class ConcBeam():
-    pass
\ No newline at end of file
+"""
+---------UNITS--------------------
+length: mm
+force: N
+moment: N*mm
+---------ORIGIN-----------------
+x is measured from the left end of the beam. Loads are positive downwards and sagging
+moments (tension at the bottom fibre) are positive
+"""
+
+
+class Beam:
+    """straight beam discretized in stations along its span. Beams with more than two supports are solved with
+    a stiffness model whose nodes are the stations"""
+    kwDefaults = {
+        'L': 10000,  # beam length
+        'n_stations': 101,  # number of equally spaced stations, ends included
+        'supports': None,  # x coordinates of the supports. Both beam ends by default
+        'EI': 1.0,  # flexural stiffness. Scalar or one value per station. Only used by continuous beams
+    }
+
+    def __init__(self, **kwargs):
+        self.L = kwargs.get('L', self.kwDefaults['L'])
+        self.n_stations = kwargs.get('n_stations', self.kwDefaults['n_stations'])
+        self.supports = kwargs.get('supports', self.kwDefaults['supports'])
+        self.EI = kwargs.get('EI', self.kwDefaults['EI'])
+
+        self.__updt_dep_attrs()
+
+    def __updt_dep_attrs(self) -> None:
+        """update all dependent attributes"""
+        if self.supports is None:
+            self.supports = (0, self.L)
+        self.supports = tuple(sorted(self.supports))
+        if len(self.supports) < 2:
+            raise ValueError('a beam needs at least two supports')
+
+        self.x = self.stations()
+        self.w = self.lumping_weights()
+        self._IL = None  # influence lines at the stations. Lazily computed
+        self._factor = None  # banded cholesky factor of the stiffness matrix. Lazily computed
+        self._D = None  # deflection operator. Lazily computed
+
+    def set(self, default: bool = False, **kwargs) -> None:
+        """sets attributes to default or to the passed kwargs
+        :param default: indicate if you want to set default values of not"""
+        if default:
+            for k in self.kwDefaults:
+                self.__dict__[k] = self.kwDefaults[k]
+        else:
+            for k in kwargs:
+                if k in self.__dict__:
+                    self.__dict__[k] = kwargs[k]
+                else:
+                    raise AttributeError(f"{k} is not an attribute of {type(self).__name__}")
+
+        self.__updt_dep_attrs()
+
+    def stations(self) -> np.ndarray:
+        """x coordinates of the stations"""
+        return np.linspace(0, self.L, self.n_stations)
+
+    def lumping_weights(self) -> np.ndarray:
+        """tributary length of every station. A distributed load q(x) is lumped into nodal loads q * w"""
+        dx = np.diff(self.x)
+        w = np.zeros(self.n_stations)
+        w[:-1] += dx / 2
+        w[1:] += dx / 2
+        return w
+
+    def is_determinate(self) -> bool:
+        return len(self.supports) == 2
+
+    # -----------STATICS------------------------
+    def unit_reactions(self, xl) -> np.ndarray:
+        """upward support reactions for unit downward loads at xl. Shape (n_supports, len(xl))"""
+        xl = np.atleast_1d(np.asarray(xl, dtype=float))
+        if self.is_determinate():
+            a, b = self.supports
+            R_b = (xl - a) / (b - a)
+            return np.stack((1 - R_b, R_b))
+
+        return self.reactions(*self.solve(self.point_load_vector(xl)))
+
+    def uniform_reactions(self) -> np.ndarray:
+        """upward support reactions for a unit uniform load over the whole beam. Shape (n_supports,)"""
+        if self.is_determinate():
+            a, b = self.supports
+            R_b = self.L * (self.L / 2 - a) / (b - a)
+            return np.array((self.L - R_b, R_b))
+
+        return self.reactions(*self.solve(self.uniform_load_vector()))[:, 0]
+
+    def _unit_uniform(self) -> tuple:
+        """(M, V) at the stations due to a unit uniform load over the whole beam"""
+        R = self.uniform_reactions()
+        x = self.x
+        M = self.lever_arms() @ R - pow(x, 2) / 2
+        V = self._left_of(np.array(self.supports), x[:, None]) @ R - x
+        return M, V
+
+    def lever_arms(self) -> np.ndarray:
+        """distance from every support to every station on its right. Shape (n_stations, n_supports)"""
+        return np.clip(self.x[:, None] - np.array(self.supports), 0, None)
+
+    def _left_of(self, pos, x) -> np.ndarray:
+        """1 where a force placed at pos acts on the free body to the left of the section at x. Shear is
+        evaluated just to the right of every station except the last one, evaluated just to the left"""
+        pos = np.asarray(pos, dtype=float)
+        x = np.asarray(x, dtype=float)
+        return ((pos < x) | ((pos == x) & (x < self.L))).astype(float)
+
+    def influence_lines(self, xl=None) -> tuple:
+        """(IL_M, IL_V) influence matrices. Row i, column j is the moment (shear) at station i due to a unit
+        downward load at xl[j]
+        :param xl: load positions. The stations by default. Influence lines at the stations are cached
+        """
+        if xl is None:
+            if self._IL is None:
+                self._IL = self._influence_lines(self.x)
+            return self._IL
+        return self._influence_lines(np.atleast_1d(np.asarray(xl, dtype=float)))
+
+    def _influence_lines(self, xl) -> tuple:
+        R = self.unit_reactions(xl)
+        x = self.x[:, None]
+        IL_M = self.lever_arms() @ R - np.clip(x - xl, 0, None)
+        IL_V = self._left_of(np.array(self.supports), x) @ R - self._left_of(xl, x)
+        return IL_M, IL_V
+
+    def __effects(self, q, point_loads, which: int) -> np.ndarray:
+        q = np.asarray(q, dtype=float)
+        if q.ndim == 0:
+            result = q * self._unit_uniform()[which]
+        else:
+            # distributed load given per station. Lumped into nodal loads (exact for constant q)
+            result = (q * self.w) @ self.influence_lines()[which].T
+
+        if len(point_loads):
+            xP, P = np.asarray(point_loads, dtype=float).T
+            result = result + self.influence_lines(xP)[which] @ P
+
+        return result
+
+    def moment(self, q=0.0, point_loads=()) -> np.ndarray:
+        """bending moment at the stations
+        :param q: N/mm uniform load, or array of per-station values along its last axis (one row per load case)
+        :param point_loads: sequence of (x, P) pairs
+        """
+        return self.__effects(q, point_loads, 0)
+
+    def shear(self, q=0.0, point_loads=()) -> np.ndarray:
+        """shear force (dM/dx) at the stations. See moment()"""
+        return self.__effects(q, point_loads, 1)
+
+    # -----------STIFFNESS MODEL------------------------
+    def stiffness(self) -> np.ndarray:
+        """flexural stiffness EI at the stations"""
+        return np.broadcast_to(np.asarray(self.EI, dtype=float), self.x.shape)
+
+    def support_nodes(self) -> np.ndarray:
+        """indices of the stations the supports sit on"""
+        idx = np.searchsorted(self.x, self.supports)
+        idx = np.clip(idx, 0, self.n_stations - 1)
+        # nearest station
+        left = np.clip(idx - 1, 0, None)
+        idx = np.where(np.abs(self.x[left] - self.supports) < np.abs(self.x[idx] - self.supports), left, idx)
+        if not np.allclose(self.x[idx], self.supports, rtol=0, atol=1E-6 * self.L):
+            raise ValueError('the supports of a continuous beam must sit on stations')
+        return idx
+
+    def element_stiffness(self) -> np.ndarray:
+        """stiffness matrices of the elements between stations. Shape (n_stations - 1, 4, 4). Degrees of
+        freedom are (v_i, theta_i, v_j, theta_j) with v positive downwards and theta = dv/dx"""
+        l = np.diff(self.x)
+        EI = self.stiffness()
+        EI = (EI[:-1] + EI[1:]) / 2
+        k = np.array([[12, 6, -12, 6], [6, 4, -6, 2], [-12, -6, 12, -6], [6, 2, -6, 4]], dtype=float)
+        # scale rows/columns of rotational dofs by l
+        scale = np.stack((np.ones_like(l), l, np.ones_like(l), l), axis=1)
+        return (EI / pow(l, 3))[:, None, None] * k * scale[:, :, None] * scale[:, None, :]
+
+    def __element_dofs(self) -> np.ndarray:
+        e = np.arange(self.n_stations - 1)
+        return np.stack((2 * e, 2 * e + 1, 2 * e + 2, 2 * e + 3), axis=1)
+
+    def __free_dofs(self) -> np.ndarray:
+        free = np.ones(2 * self.n_stations, dtype=bool)
+        free[2 * self.support_nodes()] = False
+        return free
+
+    def factorization(self) -> np.ndarray:
+        """banded cholesky factor of the stiffness matrix with the support displacements removed. It is
+        computed once and reused by every load case until the beam changes"""
+        if self._factor is None:
+            free = self.__free_dofs()
+            r = np.cumsum(free) - 1  # reduced index of every free dof
+            dofs = self.__element_dofs()
+            k = self.element_stiffness()
+
+            e, a, b = np.meshgrid(np.arange(len(dofs)), np.arange(4), np.arange(4), indexing='ij')
+            gi, gj = dofs[e, a], dofs[e, b]
+            # upper triangle of the free-free block in LAPACK upper banded storage (3 super-diagonals)
+            mask = free[gi] & free[gj] & (r[gi] <= r[gj])
+            ab = np.zeros((4, free.sum()))
+            np.add.at(ab, (3 + r[gi][mask] - r[gj][mask], r[gj][mask]), k[e[mask], a[mask], b[mask]])
+            from scipy.linalg import cholesky_banded  # scipy is only imported by hyperstatic beams
+            self._factor = cholesky_banded(ab)
+
+        return self._factor
+
+    def solve(self, F) -> tuple:
+        """(d, F) nodal displacements for one or several load vectors. Shape (2 * n_stations, n_cases)
+        :param F: nodal loads (v forces positive downwards, theta moments). One column per load case
+        """
+        from scipy.linalg import cho_solve_banded
+        F = np.asarray(F, dtype=float).reshape(2 * self.n_stations, -1)
+        free = self.__free_dofs()
+        d = np.zeros_like(F)
+        d[free] = cho_solve_banded((self.factorization(), False), F[free])
+        return d, F
+
+    def reactions(self, d, F) -> np.ndarray:
+        """upward support reactions. Shape (n_supports, n_cases)
+        :param d: nodal displacements returned by solve()
+        :param F: nodal loads
+        """
+        dofs = self.__element_dofs()
+        Kd = np.zeros_like(F)
+        np.add.at(Kd, dofs, np.einsum('eab,ebm->eam', self.element_stiffness(), d[dofs]))
+        v = 2 * self.support_nodes()
+        return F[v] - Kd[v]
+
+    def __locate(self, xl) -> tuple:
+        """element index, local coordinate and length of the element at positions xl"""
+        l = np.diff(self.x)
+        e = np.clip(np.searchsorted(self.x, xl, side='right') - 1, 0, self.n_stations - 2)
+        return e, (xl - self.x[e]) / l[e], l[e]
+
+    def point_load_vector(self, xl) -> np.ndarray:
+        """consistent nodal loads of unit downward point loads at xl. One column per load"""
+        e, xi, l = self.__locate(np.asarray(xl, dtype=float))
+        N = np.stack((1 - 3 * pow(xi, 2) + 2 * pow(xi, 3), l * (xi - 2 * pow(xi, 2) + pow(xi, 3)),
+                      3 * pow(xi, 2) - 2 * pow(xi, 3), l * (pow(xi, 3) - pow(xi, 2))), axis=1)
+        F = np.zeros((2 * self.n_stations, len(xl)))
+        np.add.at(F, (self.__element_dofs()[e], np.arange(len(xl))[:, None]), N)
+        return F
+
+    def uniform_load_vector(self) -> np.ndarray:
+        """consistent nodal loads of a unit uniform downward load"""
+        l = np.diff(self.x)
+        F = np.zeros(2 * self.n_stations)
+        np.add.at(F, self.__element_dofs(), np.stack((l / 2, pow(l, 2) / 12, l / 2, -pow(l, 2) / 12), axis=1))
+        return F[:, None]
+
+    def curvature_load_vector(self, M0) -> np.ndarray:
+        """consistent nodal loads of an imposed moment field M0(x) (sagging positive), e.g. the primary moment
+        N * e of a tendon. Integrated with 3-point Gauss quadrature along every element
+        :param M0: callable returning the imposed moment at an array of x coordinates
+        """
+        l = np.diff(self.x)
+        gauss = np.array((0.5 - pow(0.15, 0.5), 0.5, 0.5 + pow(0.15, 0.5)))
+        weights = np.array((5, 8, 5)) / 18
+        x = self.x[:-1, None] + l[:, None] * gauss  # (n_el, 3)
+        M = M0(x)
+        # second derivatives of the hermite shape functions
+        B = np.stack(((-6 + 12 * gauss) / pow(l[:, None], 2), (-4 + 6 * gauss) / l[:, None],
+                      (6 - 12 * gauss) / pow(l[:, None], 2), (-2 + 6 * gauss) / l[:, None]), axis=1)
+        # sagging curvature is -v''
+        fe = -np.sum(B * (M * weights * l[:, None])[:, None, :], axis=2)
+        F = np.zeros(2 * self.n_stations)
+        np.add.at(F, self.__element_dofs(), fe)
+        return F[:, None]
+
+    # -----------DEFLECTIONS------------------------
+    def deflection_operator(self) -> np.ndarray:
+        """matrix D such that D @ k is the deflection (positive downwards) at the stations for a curvature field
+        k (sagging positive). Double trapezoidal integration of v'' = -k minus the deflection of a line through
+        the supports that is straight along every span (kinks allowed at interior supports) and extended over
+        the overhangs. v is then zero at every support also for cracked curvature fields, which are not
+        compatible with the elastic moments. Computed once and cached"""
+        if self._D is None:
+            n = self.n_stations
+            dx = np.diff(self.x)
+            # cumulative trapezoidal integration from the left end
+            E = np.zeros((n - 1, n))
+            E[np.arange(n - 1), np.arange(n - 1)] = dx / 2
+            E[np.arange(n - 1), np.arange(1, n)] = dx / 2
+            C = np.zeros((n, n))
+            C[1:] = np.cumsum(E, axis=0)
+            V = -C @ C
+
+            # interpolation rows of the deflection at the supports
+            sup = np.array(self.supports, dtype=float)
+            idx = np.clip(np.searchsorted(self.x, sup), 1, n - 1)
+            f = (sup - self.x[idx - 1]) / (self.x[idx] - self.x[idx - 1])
+            S = np.zeros((len(sup), n))
+            S[np.arange(len(sup)), idx - 1] = 1 - f
+            S[np.arange(len(sup)), idx] += f
+
+            # span by span linear interpolation of the support values at the stations
+            span = np.clip(np.searchsorted(sup, self.x, side='right') - 1, 0, len(sup) - 2)
+            t = (self.x - sup[span]) / (sup[span + 1] - sup[span])
+            P = np.zeros((n, len(sup)))
+            P[np.arange(n), span] = 1 - t
+            P[np.arange(n), span + 1] = t
+            self._D = (np.eye(n) - P @ S) @ V
+
+        return self._D
+
+    def deflection(self, k) -> np.ndarray:
+        """deflection (positive downwards) at the stations
+        :param k: curvature at the stations (sagging positive). Stations along the last axis
+        """
+        return np.asarray(k, dtype=float) @ self.deflection_operator().T
+
+    # -----------MOVING LOADS------------------------
+    def train_effects(self, axles, which: int = 0) -> np.ndarray:
+        """moment (which=0) or shear (which=1) at every station for every position of an axle train crossing
+        the beam from left to right. Shape (n_stations, n_positions). The train front advances one station
+        spacing per position, from the left end until the last axle leaves the beam, once for each phase that
+        places some axle exactly on the stations (where the extreme effects occur). Each axle is a shifted copy
+        of the influence lines. Axles between stations take the influence lines of loads at their own positions,
+        computed once per distance to the stations (influence_lines(xl), exact in the element shape functions)
+        :param axles: sequence of (offset, P) pairs. offset is the distance behind the front axle
+        """
+        IL = self.influence_lines()[which]
+        dx = self.L / (self.n_stations - 1)
+        offsets, P = np.asarray(axles, dtype=float).T
+
+        between = {}  # f: influence lines of loads f * dx left of every station but the first
+        blocks = []
+        for phase in np.unique(np.mod(offsets / dx, 1)):
+            shift = offsets / dx - phase
+            m = np.floor(shift).astype(int)
+            f = shift - m
+
+            n_pos = self.n_stations + m.max() + 1
+            # zero padding on the left stands for axles not yet on the beam, on the right for axles already off it
+            left = m.max() + 1
+            width = left + n_pos + max(0, -m.min())
+            IL_pad = np.zeros((self.n_stations, width))
+            IL_pad[:, left:left + self.n_stations] = IL
+
+            effects = np.zeros((self.n_stations, n_pos))
+            for mk, fk, Pk in zip(m, f, P):
+                start = left - mk
+                if fk:
+                    if fk not in between:
+                        between[fk] = self.influence_lines(self.x[1:] - fk * dx)[which]
+                    lines = np.zeros((self.n_stations, width))
+                    lines[:, left + 1:left + self.n_stations] = between[fk]
+                    effects += Pk * lines[:, start:start + n_pos]
+                else:
+                    effects += Pk * IL_pad[:, start:start + n_pos]
+            blocks.append(effects)
+
+        return np.hstack(blocks)
+
+    def envelope(self, axles=(), lane_load: float = 0.0, both_directions: bool = True) -> dict:
+        """max and min moment and shear at every station due to an axle train and a uniform lane load. The lane
+        load is applied wherever it is unfavourable
+        :param axles: sequence of (offset, P) pairs. See train_effects()
+        :param lane_load: N/mm uniform lane load
+        :param both_directions: consider the train crossing in both directions
+        """
+        trains = [axles] if len(axles) else []
+        if trains and both_directions:
+            offsets, P = np.asarray(axles, dtype=float).T
+            trains.append(tuple(zip(offsets.max() - offsets, P)))
+
+        result = {}
+        for which, name in ((0, 'M'), (1, 'V')):
+            IL = self.influence_lines()[which]
+            # lane load on the positive (negative) part of each influence line
+            high = lane_load * (np.clip(IL, 0, None) @ self.w)
+            low = lane_load * (np.clip(IL, None, 0) @ self.w)
+
+            if trains:
+                effects = [self.train_effects(train, which) for train in trains]
+                high = high + np.max([e.max(axis=1) for e in effects], axis=0)
+                low = low + np.min([e.min(axis=1) for e in effects], axis=0)
+
+            result[name + '_max'] = high
+            result[name + '_min'] = low
+
+        return result
+
+
+class Tendon:
+    """prestressing tendon with a piecewise linear profile dp(x). dp is measured from the top fibre"""
+    kwDefaults = {
+        'P0': 1000E3,  # prestress force at transfer
+        'P_inf': 850E3,  # prestress force after all losses
+        'x': (0, 10000),  # x coordinates of the profile points
+        'dp': (850, 850),  # tendon depth at each profile point
+    }
+
+    def __init__(self, **kwargs):
+        self.P0 = kwargs.get('P0', self.kwDefaults['P0'])
+        self.P_inf = kwargs.get('P_inf', self.kwDefaults['P_inf'])
+        self.x = kwargs.get('x', self.kwDefaults['x'])
+        self.dp = kwargs.get('dp', self.kwDefaults['dp'])
+
+    def __str__(self):
+        string = f"""
+        P0: prestress force at transfer............................................{self.P0} N
+        P_inf: prestress force after losses........................................{self.P_inf} N
+        """
+        return string
+
+    @classmethod
+    def parabolic(cls, L: float, dp_end: float, dp_mid: float, n: int = 51, **kwargs):
+        """tendon with a parabolic profile between both beam ends
+        :param L: beam length
+        :param dp_end: tendon depth at the beam ends
+        :param dp_mid: tendon depth at midspan
+        :param n: number of profile points
+        """
+        x = np.linspace(0, L, n)
+        dp = dp_end + 4 * (dp_mid - dp_end) * x * (L - x) / pow(L, 2)
+        return cls(x=tuple(x), dp=tuple(dp), **kwargs)
+
+    def dp_x(self, x) -> np.ndarray:
+        """tendon depth at x"""
+        return np.interp(x, self.x, self.dp)
+
+
+class ConcBeam(Beam):
+    """prestressed concrete beam. The cross-section can be a single ConcreteSection or a sequence of
+    (x_start, x_end, ConcreteSection) segments. Stations shared by two segments take the later one"""
+
+    def __init__(self, section=None, tendon: Tendon = None, **kwargs):
+        self.section = section if section is not None else RectConcSect()
+        self.tendon = tendon if tendon is not None else Tendon()
+        super().__init__(**kwargs)
+
+        self.groups = self.section_groups()
+        self.dp = self.tendon.dp_x(self.x)
+        self._M2_unit = None  # hyperstatic moment of a unit prestress force. Lazily computed
+
+    def section_groups(self) -> list:
+        """list of (section, station indices) pairs. Every section is evaluated once for all its stations"""
+        if isinstance(self.section, ConcreteSection):
+            return [(self.section, np.arange(self.n_stations))]
+
+        owner = np.full(self.n_stations, -1)
+        for i, (x0, x1, _) in enumerate(self.section):
+            owner[(self.x >= x0) & (self.x <= x1)] = i
+        if np.any(owner < 0):
+            raise ValueError('every station must be covered by a section segment')
+
+        return [(self.section[i][2], np.flatnonzero(owner == i)) for i in np.unique(owner)]
+
+    def set(self, default: bool = False, **kwargs) -> None:
+        """sets attributes to default or to the passed kwargs. section and tendon are kept when default"""
+        super().set(default, **kwargs)
+        self.groups = self.section_groups()
+        self.dp = self.tendon.dp_x(self.x)
+        self._M2_unit = None
+
+    def section_property(self, key: str) -> np.ndarray:
+        """homogenized section property (see ConcreteSection.hmgSection()) at every station"""
+        values = np.empty(self.n_stations)
+        for sect, idx in self.groups:
+            values[idx] = sect.hmgSect[key]
+        return values
+
+    def stiffness(self) -> np.ndarray:
+        """flexural stiffness Ecm * hmgIxo at the stations"""
+        EI = np.empty(self.n_stations)
+        for sect, idx in self.groups:
+            EI[idx] = sect.concrete.E_cm * sect.hmgSect['Ixo']
+        return EI
+
+    def prestress_moments(self, P: float) -> tuple:
+        """(M1, M2) primary (N * e) and secondary (hyperstatic) prestress moments at the stations
+        :param P: prestress force (positive)
+        """
+        y_cen = self.section_property('y_cen')
+        M1 = -P * (self.dp - y_cen)
+        if self.is_determinate():
+            return M1, np.zeros(self.n_stations)
+
+        if self._M2_unit is None:
+            # the tendon acts on the concrete as an imposed moment field. The reactions it produces are the
+            # only source of secondary moments, linear between supports
+            def M0(x):
+                return -(self.tendon.dp_x(x) - np.interp(x, self.x, y_cen))
+            R = self.reactions(*self.solve(self.curvature_load_vector(M0)))[:, 0]
+            self._M2_unit = self.lever_arms() @ R
+
+        return M1, P * self._M2_unit
+
+    def normal_force(self) -> tuple:
+        """(Ni, Nf) normal force at transfer and after losses"""
+        return -self.tendon.P0, -self.tendon.P_inf
+
+    def whole_moments(self, Mi, Mf) -> tuple:
+        """whole moments from the top fibre (external + prestress + hyperstatic prestress) at every station
+        :param Mi: external moment at the instant of prestress. Stations along the last axis
+        :param Mf: external moment under service loads
+        """
+        Ni, Nf = self.normal_force()
+        shape = np.broadcast_shapes(np.shape(Mi), np.shape(Mf), self.x.shape)
+        Mi = Mi + Ni * self.dp + self.prestress_moments(self.tendon.P0)[1]
+        Mf = Mf + Nf * self.dp + self.prestress_moments(self.tendon.P_inf)[1]
+        return np.broadcast_to(Mi, shape), np.broadcast_to(Mf, shape)
+
+    def stresses(self, Mi, Mf) -> dict:
+        """top and bottom fibre stresses at every station for the initial and final stages
+        :param Mi: external moment at the instant of prestress. Stations along the last axis
+        :param Mf: external moment under service loads
+        """
+        Ni, Nf = self.normal_force()
+        Mi, Mf = self.whole_moments(Mi, Mf)
+        result = {k: np.empty(Mi.shape) for k in ('init_top', 'init_bottom', 'final_top', 'final_bottom')}
+
+        for sect, idx in self.groups:
+            result['init_top'][..., idx] = sect.stress_t(Ni, Mi[..., idx], 0)
+            result['init_bottom'][..., idx] = sect.stress_t(Ni, Mi[..., idx], sect.h)
+            result['final_top'][..., idx] = sect.stress(Nf, Mf[..., idx], 0)
+            result['final_bottom'][..., idx] = sect.stress(Nf, Mf[..., idx], sect.h)
+
+        return result
+
+    def curvature(self, N, M, time_dependent: bool = False) -> np.ndarray:
+        """curvature at every station. See ConcreteSection.curvature()
+        :param N: normal force
+        :param M: whole moment from the top fibre. Stations along the last axis
+        :param time_dependent: use the non-cracked curvature at the instant of prestress k_t()
+        """
+        M = np.asarray(M, dtype=float)
+        k = np.empty(np.broadcast_shapes(M.shape, self.x.shape))
+        M = np.broadcast_to(M, k.shape)
+        for sect, idx in self.groups:
+            k[..., idx] = sect.k_t(N, M[..., idx]) if time_dependent else sect.curvature(N, M[..., idx])
+        return k
+
+    def creep_coefficients(self, times) -> np.ndarray:
+        """creep coefficient phi(t, t0) of the concrete at every station. t0 is the cement-adjusted prestress
+        time of each concrete. Shape (len(times), n_stations)
+        :param times: concrete ages in days
+        """
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        phi = np.empty((len(times), self.n_stations))
+        for sect, idx in self.groups:
+            phi[:, idx] = sect.phi_time(times)[:, None]
+        return phi
+
+    def initial_deflection(self, Mi) -> np.ndarray:
+        """deflection at the instant of prestress (camber) with the time-dependent modulus E_cmt
+        :param Mi: external moment at the instant of prestress
+        """
+        Ni, _ = self.normal_force()
+        Mi, _ = self.whole_moments(Mi, 0)
+        return self.deflection(self.curvature(Ni, Mi, time_dependent=True))
+
+    def long_term_deflection(self, Mf, Mqp, times) -> np.ndarray:
+        """deflection (positive downwards) at several concrete ages. The instantaneous curvature under service
+        loads and the quasi-permanent curvature are computed once (cracked or not per station). Only the creep
+        term phi(t, t0) * D @ k_qp changes between instants. Shape (len(times), n_stations)
+        :param Mf: external moment under service loads
+        :param Mqp: external moment under the quasi-permanent combination
+        :param times: concrete ages in days
+        """
+        _, Nf = self.normal_force()
+        _, Mf = self.whole_moments(0, Mf)
+        _, Mqp = self.whole_moments(0, Mqp)
+        v_inst = self.deflection(self.curvature(Nf, Mf))
+        k_qp = self.curvature(Nf, Mqp)
+
+        phi = self.creep_coefficients(times)
+        if len(self.groups) == 1:
+            # a single concrete: the creep term is a rescaled copy of the quasi-permanent deflection
+            return v_inst + phi[:, :1] * self.deflection(k_qp)
+        return v_inst + self.deflection(phi * k_qp)
+
+    def crack_width(self, Mf, **kwargs) -> np.ndarray:
+        """characteristic crack width (mm) at every station and load case. See CrackWidth
+        :param Mf: external moment under service loads. Stations along the last axis
+        :param kwargs: CrackWidth parameters (phi, c, kt...) shared by every section
+        """
+        _, Nf = self.normal_force()
+        _, Mf = self.whole_moments(0, Mf)
+        w = np.empty(Mf.shape)
+        for sect, idx in self.groups:
+            w[..., idx] = CrackWidth(sect, **kwargs).crack_width(Nf, Mf[..., idx])
+        return w
+
+    def magnel_margins(self, Mi, Mf) -> np.ndarray:
+        """magnel margins at every station. Shape (8, *stations). See ConcreteSection.magnel_margins()"""
+        Ni, Nf = self.normal_force()
+        Mi, Mf = self.whole_moments(Mi, Mf)
+        margins = np.empty((8,) + Mi.shape)
+
+        for sect, idx in self.groups:
+            margins[..., idx] = sect.magnel_margins(Ni, Mi[..., idx], Mf[..., idx], Nf)
+
+        return margins
+
+    def magnel_check(self, Mi, Mf) -> np.ndarray:
+        """True at the stations that meet every magnel stress limit"""
+        return np.all(self.magnel_margins(Mi, Mf) > 0, axis=0)
+
+    def envelope_check(self, Mi, Mf, envelope: dict) -> np.ndarray:
+        """magnel check of the service stage under a moving-load envelope. True at the stations that meet every
+        limit for both the max and the min moment
+        :param Mi: external moment at the instant of prestress
+        :param Mf: external moment under service loads without the moving loads
+        :param envelope: dictionary returned by envelope()
+        """
+        Mf = np.stack(np.broadcast_arrays(Mf + envelope['M_max'], Mf + envelope['M_min']))
+        return np.all(self.magnel_check(Mi, Mf), axis=0)
+
+
+if __name__ == '__main__':
+    L = 20000
+    beam = ConcBeam(section=RectConcSect(b=400, h=1000, Ap=1500, dp=850), L=L, n_stations=201,
+                    tendon=Tendon.parabolic(L, 500, 850, P0=1800E3, P_inf=1500E3))
+    g = beam.moment(q=10)
+    print(beam.magnel_check(g, beam.moment(q=25)).all())
@@ -0,0 +1,152 @@
+import json
+import struct
+import zipfile
+import numpy as np
+from StructEng.Materials.class_Concrete import Concrete
+from StructEng.Materials.class_ReinforcementSteel import ReinforcementSteel
+from StructEng.Materials.class_PrestressSteel import PrestressSteel
+from StructEng.Sections.class_RectConcSect import RectConcSect
+from StructEng.Sections.class_TConcSect import TConcSect
+
+
+class Project:
+    """sections and result arrays saved together in a single project file, an uncompressed zip (zip64, so
+    members can be larger than 4 GB) with:
+
+    model.json: materials, sections (referencing their materials by key, so shared materials stay shared)
+    and the shape and dtype of every result
+    results/<name>.npy: one NumPy array per result
+
+    results are stored, not deflated, so open() memory-maps them in place: opening a multi-GB sweep reads
+    only model.json and the data is paged in when it is accessed. Sections and results can be loaded
+    partially by name
+    """
+    format_name = 'StructEng project'
+    format_version = 1
+    section_types = {'RectConcSect': RectConcSect, 'TConcSect': TConcSect}
+    material_types = {'concrete': Concrete, 'steel_s': ReinforcementSteel, 'steel_p': PrestressSteel}
+    material_attrs = {'concrete': 'concrete', 'steel_s': 'passive_steel', 'steel_p': 'prestress_steel'}
+
+    def __init__(self, sections: dict = None, results: dict = None, metadata: dict = None):
+        self.sections: dict = dict(sections) if sections else {}
+        self.results: dict = dict(results) if results else {}
+        self.metadata: dict = dict(metadata) if metadata else {}
+
+    # ---------------WRITING------------------------
+    def model(self) -> dict:
+        """json-serializable description of the sections and results"""
+        materials = {kind: {} for kind in self.material_types}
+        keys = {}  # id of every material object: key in materials
+        sections = {}
+        for name, section in self.sections.items():
+            if type(section).__name__ not in self.section_types:
+                raise TypeError(f'{type(section).__name__} can not be saved. try {", ".join(self.section_types)}')
+            d = {'type': type(section).__name__, **section.geometry()}
+            if section.layers:
+                d['layers'] = section.layers_to_dicts(section.layers)
+            for kind, attr in self.material_attrs.items():
+                material = getattr(section, attr)
+                if id(material) not in keys:
+                    keys[id(material)] = f'{kind}_{len(materials[kind])}'
+                    materials[kind][keys[id(material)]] = material.to_dict()
+                d[kind] = keys[id(material)]
+            sections[name] = d
+
+        results = {}
+        for name, array in self.results.items():
+            array = np.asanyarray(array)
+            results[name] = {'member': f'results/{name}.npy', 'shape': list(array.shape), 'dtype': array.dtype.str}
+
+        return {'format': self.format_name, 'version': self.format_version, 'metadata': self.metadata,
+                'materials': materials, 'sections': sections, 'results': results}
+
+    def save(self, path: str) -> None:
+        model = self.model()
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+            zf.writestr('model.json', json.dumps(model, indent=1, default=_json_default))
+            for name, array in self.results.items():
+                # streamed member. write_array copies the array in buffered chunks, memmaps included
+                with zf.open(model['results'][name]['member'], 'w', force_zip64=True) as f:
+                    np.lib.format.write_array(f, np.asanyarray(array), allow_pickle=False)
+
+    # ---------------READING------------------------
+    @staticmethod
+    def read_model(path: str) -> dict:
+        """model.json alone"""
+        with zipfile.ZipFile(path) as zf:
+            model = json.loads(zf.read('model.json'))
+        if model.get('format') != Project.format_name:
+            raise ValueError(f'{path} is not a {Project.format_name} file')
+        if model['version'] > Project.format_version:
+            raise ValueError(f'{path} has format version {model["version"]}. '
+                             f'Supported up to {Project.format_version}')
+        return model
+
+    @classmethod
+    def open(cls, path: str, sections=None, results=None, mmap: bool = True):
+        """project saved at path
+        :param sections: names of the sections to build. All by default, () for none
+        :param results: names of the results to load. All by default, () for none
+        :param mmap: memory-map the results (read only) instead of reading them into memory
+        """
+        model = cls.read_model(path)
+        section_names = model['sections'] if sections is None else sections
+        result_names = model['results'] if results is None else results
+
+        materials = {}  # built once, shared by the sections that reference them
+        built = {}
+        for name in section_names:
+            d = dict(model['sections'][name])
+            kwargs = {}
+            if 'layers' in d:
+                kwargs['layers'] = cls.section_types[d['type']].layers_from_dicts(d.pop('layers'))
+            for kind, material_type in cls.material_types.items():
+                key = d.pop(kind)
+                if key not in materials:
+                    materials[key] = material_type.from_dict(model['materials'][kind][key])
+                kwargs[kind] = materials[key]
+            # array geometry (batches of sections) comes back from json as lists
+            geometry = {k: np.asarray(v) if isinstance(v, list) else v for k, v in d.items() if k != 'type'}
+            built[name] = cls.section_types[d['type']](**kwargs, **geometry)
+
+        arrays = {}
+        with zipfile.ZipFile(path) as zf:
+            for name in result_names:
+                arrays[name] = _read_member(path, zf, model['results'][name]['member'], mmap)
+
+        return cls(built, arrays, model.get('metadata'))
+
+
+def _json_default(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f'{type(value).__name__} is not json serializable')
+
+
+def _read_member(path: str, zf: zipfile.ZipFile, member: str, mmap: bool) -> np.ndarray:
+    """array of a .npy member. Memory-mapped at its offset in the file when the member is stored"""
+    info = zf.getinfo(member)
+    if not mmap or info.compress_type != zipfile.ZIP_STORED:
+        with zf.open(info) as f:
+            return np.lib.format.read_array(f, allow_pickle=False)
+
+    with open(path, 'rb') as f:
+        # the member data starts after its local header: 30 bytes plus the file name and extra field
+        f.seek(info.header_offset)
+        header = f.read(30)
+        if header[:4] != b'PK\x03\x04':
+            raise ValueError(f'corrupt local header of {member}')
+        name_length, extra_length = struct.unpack('<HH', header[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    if dtype.hasobject:
+        raise ValueError(f'{member} holds python objects and can not be memory-mapped')
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+import StructEng
+
+
+class ResultCache:
+    """persistent store of computed arrays, addressed by the sha256 of a canonical form of their inputs plus
+    the library version. The same inputs give the same key on any machine and in any session, so runs with
+    unchanged inputs are read back instead of computed
+
+    entries are .npz files written to a temporary file and moved into place with os.replace, so a reader never
+    sees a partial entry and concurrent writers of one key are harmless. Reading an entry refreshes its
+    modification time; when the store grows over max_bytes the least recently used entries are deleted
+    """
+    kwDefaults = {
+        'directory': None,  # $STRUCTENG_CACHE or ~/.cache/structeng by default
+        'max_bytes': 2 ** 30,
+    }
+
+    def __init__(self, **kwargs):
+        directory = kwargs.get('directory', self.kwDefaults['directory'])
+        if directory is None:
+            directory = os.environ.get('STRUCTENG_CACHE',
+                                       os.path.join(os.path.expanduser('~'), '.cache', 'structeng'))
+        self.directory: str = directory
+        self.max_bytes: int = kwargs.get('max_bytes', self.kwDefaults['max_bytes'])
+        os.makedirs(self.directory, exist_ok=True)
+
+    # ---------------KEYS------------------------
+    @staticmethod
+    def canonical(value):
+        """json-serializable form of value that does not depend on dict order or int/float spelling. Objects
+        with to_dict() (materials, sections) are described by it and arrays by their dtype, shape and a hash
+        of their data"""
+        if hasattr(value, 'to_dict'):
+            return {'__type__': type(value).__name__, **ResultCache.canonical(value.to_dict())}
+        if isinstance(value, dict):
+            return {str(k): ResultCache.canonical(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [ResultCache.canonical(v) for v in value]
+        if isinstance(value, np.ndarray):
+            data = np.ascontiguousarray(value)
+            return {'__array__': data.dtype.str, 'shape': list(data.shape),
+                    'sha256': hashlib.sha256(data.tobytes()).hexdigest()}
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, int) and not isinstance(value, bool):
+            return float(value)
+        return value
+
+    @staticmethod
+    def key(name: str, **inputs) -> str:
+        """hex digest that identifies the result of computation name with the given inputs"""
+        text = json.dumps({'name': name, 'version': StructEng.__version__,
+                           'inputs': ResultCache.canonical(inputs)}, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    # ---------------STORE------------------------
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f'{key}.npz')
+
+    def get(self, key: str):
+        """dict of arrays stored under key. None when missing"""
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                result = {name: data[name] for name in data.files}
+        except (FileNotFoundError, ValueError, OSError):  # missing, or removed while reading
+            return None
+        try:
+            os.utime(path)  # recently used
+        except OSError:
+            pass
+        return result
+
+    def put(self, key: str, result: dict) -> None:
+        """stores a dict of arrays under key"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **result)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self.evict()
+
+    def compute(self, name: str, fn, **inputs) -> dict:
+        """fn(**inputs) read from the store when its inputs were already computed. fn returns a dict of
+        arrays"""
+        key = self.key(name, **inputs)
+        result = self.get(key)
+        if result is None:
+            result = fn(**inputs)
+            self.put(key, result)
+        return result
+
+    def entries(self) -> list:
+        """(mtime, size, path) of every entry, least recently used first"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for file in files:
+                if file.endswith('.npz'):
+                    path = os.path.join(root, file)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:  # evicted by another process
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> None:
+        """deletes least recently used entries until the store fits in max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        for _, _, path in self.entries():
+            os.remove(path)
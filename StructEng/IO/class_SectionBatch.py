@@ -0,0 +1,195 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import numpy as np
+from StructEng.Materials.class_Concrete import Concrete
+from StructEng.Sections.class_RectConcSect import RectConcSect
+from StructEng.Sections.class_TConcSect import TConcSect
+
+
+class SectionBatch:
+    """section properties and magnel checks of a CSV schedule, one row per section and load case. The file is
+    read in chunks of rows straight into column arrays. Every chunk builds one section object with array
+    geometry per concrete strength and checks all its rows at once, then its results are written out and
+    dropped, so memory depends on the chunk size, not on the file size
+
+    input columns (header line, comma separated, any order): geometry of the section class (b, h, As1, As2,
+    Ap, ds1, ds2, dp and t, t1, t2 for TConcSect), fck, N, Mi, Mf and optionally N_f. Missing geometry and fck
+    columns take the class defaults, missing loads are 0. Units are mm, N and N*mm, moments are whole moments
+    from the top fibre
+    """
+    section_types = {'RectConcSect': RectConcSect, 'TConcSect': TConcSect}
+    load_columns = ('N', 'Mi', 'Mf', 'N_f')
+    output_columns = ('row', 'A', 'y_cen', 'I', 'init_top', 'init_bottom', 'final_top', 'final_bottom',
+                      'min_margin', 'ok')
+
+    def __init__(self, section_type: str = 'RectConcSect', chunk: int = 10000, delimiter: str = ','):
+        if section_type not in self.section_types:
+            raise ValueError(f'not a valid section type. try {", ".join(self.section_types)}')
+        self.section_class = self.section_types[section_type]
+        self.chunk = chunk
+        self.delimiter = delimiter
+        self.geometry_columns = tuple(self.section_class.kwDefaults)
+        if section_type == 'TConcSect':
+            self.geometry_columns += tuple(TConcSect.kwTSectDefaults)
+
+    def read(self, f):
+        """yields dicts of column arrays of at most chunk rows
+        :param f: open text file. The first line is the header
+        """
+        names = [name.strip() for name in f.readline().split(self.delimiter)]
+        while True:
+            lines = list(islice(f, self.chunk))
+            if not lines:
+                return
+            data = np.loadtxt(lines, delimiter=self.delimiter, ndmin=2)
+            yield {name: data[:, i] for i, name in enumerate(names)}
+
+    def concrete(self, fck: float) -> Concrete:
+        return Concrete.interned(fck=fck)
+
+    def check(self, columns: dict, first_row: int = 0) -> dict:
+        """output columns of one chunk
+        :param columns: input column arrays of equal length
+        :param first_row: row number of the first row of the chunk in the whole file
+        """
+        n = len(next(iter(columns.values())))
+        out = {name: np.empty(n) for name in self.output_columns}
+        out['row'] = np.arange(first_row, first_row + n)
+        out['ok'] = np.empty(n, dtype=bool)
+
+        fck = columns.get('fck', np.full(n, Concrete.kwDefaults['fck']))
+        loads = {name: columns.get(name, np.zeros(n)) for name in self.load_columns}
+        if 'N_f' not in columns:
+            loads['N_f'] = loads['N']
+
+        for value in np.unique(fck):
+            rows = fck == value
+            geometry = {k: columns[k][rows] for k in self.geometry_columns if k in columns}
+            section = self.section_class(concrete=self.concrete(float(value)), **geometry)
+            N, Mi, Mf, N_f = (loads[name][rows] for name in self.load_columns)
+
+            hmg = section.hmgSect
+            margins = section.magnel_margins(N, Mi, Mf, N_f)
+            out['A'][rows] = hmg['A']
+            out['y_cen'][rows] = hmg['y_cen']
+            out['I'][rows] = hmg['Ixo']
+            out['init_top'][rows] = section.stress_t(N, Mi, 0)
+            out['init_bottom'][rows] = section.stress_t(N, Mi, section.h)
+            out['final_top'][rows] = section.stress(N_f, Mf, 0)
+            out['final_bottom'][rows] = section.stress(N_f, Mf, section.h)
+            out['min_margin'][rows] = margins.min(axis=0)
+            out['ok'][rows] = np.all(margins > 0, axis=0)
+        return out
+
+    def run(self, source: str, target: str, workers: int = 1, fmt: str = 'csv') -> dict:
+        """checks every row of the source CSV and writes the results chunk by chunk. Returns the number of rows
+        and of rows that fail the magnel check
+        :param target: output CSV file, or directory of one .npy file per column when fmt is 'npy'
+        :param workers: processes checking chunks. At most two chunks per worker are in flight and results
+        are written in input order
+        :param fmt: 'csv' or 'npy'
+        """
+        writers = {'csv': CSVWriter, 'npy': NpyWriter}
+        if fmt not in writers:
+            raise ValueError(f'not a valid format. try {", ".join(writers)}')
+        rows = failed = 0
+        with open(source) as f, writers[fmt](target, self.output_columns, self.delimiter) as writer:
+            for out in self.__results(f, workers):
+                writer.write(out)
+                rows += len(out['row'])
+                failed += int((~out['ok']).sum())
+        return {'rows': rows, 'failed': failed}
+
+    def __results(self, f, workers: int):
+        first_row = 0
+        if workers <= 1:
+            for columns in self.read(f):
+                yield self.check(columns, first_row)
+                first_row += len(next(iter(columns.values())))
+            return
+
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as pool:
+            for columns in self.read(f):
+                pending.append(pool.submit(_check_chunk, columns, first_row))
+                first_row += len(next(iter(columns.values())))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+
+_batch = None  # SectionBatch of the current worker process
+
+
+def _init_worker(batch: SectionBatch) -> None:
+    global _batch
+    _batch = batch
+
+
+def _check_chunk(columns: dict, first_row: int) -> dict:
+    return _batch.check(columns, first_row)
+
+
+class CSVWriter:
+    """appends column dicts to a CSV file. Integer and boolean columns are written as integers"""
+
+    def __init__(self, path: str, columns: tuple, delimiter: str = ','):
+        self.path = path
+        self.columns = columns
+        self.delimiter = delimiter
+        self.f = None
+
+    def __enter__(self):
+        self.f = open(self.path, 'w')
+        self.f.write(self.delimiter.join(self.columns) + '\n')
+        return self
+
+    def __exit__(self, *exc):
+        self.f.close()
+
+    def write(self, out: dict) -> None:
+        data = np.column_stack([out[name] for name in self.columns])
+        fmt = ['%d' if out[name].dtype.kind in 'biu' else '%.6g' for name in self.columns]
+        np.savetxt(self.f, data, fmt=fmt, delimiter=self.delimiter)
+
+
+class NpyWriter:
+    """appends column dicts to one .npy file per column inside a directory. The final length is unknown while
+    writing, so every file starts with a fixed size header that is rewritten with the row count on close"""
+    header_size = 128
+
+    def __init__(self, path: str, columns: tuple, delimiter: str = None):
+        self.path = path
+        self.columns = columns
+        self.files = {}
+        self.dtypes = {}
+        self.rows = 0
+
+    def __enter__(self):
+        os.makedirs(self.path, exist_ok=True)
+        return self
+
+    def __exit__(self, *exc):
+        for name, f in self.files.items():
+            f.seek(0)
+            f.write(self.header(self.dtypes[name], self.rows))
+            f.close()
+
+    def header(self, dtype: np.dtype, rows: int) -> bytes:
+        """npy version 1.0 header padded with spaces to header_size bytes"""
+        d = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (dtype.str, rows)
+        magic = np.lib.format.magic(1, 0)
+        length = self.header_size - len(magic) - 2
+        return magic + length.to_bytes(2, 'little') + d.ljust(length - 1).encode('latin1') + b'\n'
+
+    def write(self, out: dict) -> None:
+        for name in self.columns:
+            if name not in self.files:
+                self.dtypes[name] = out[name].dtype
+                self.files[name] = open(os.path.join(self.path, f'{name}.npy'), 'wb')
+                self.files[name].write(self.header(self.dtypes[name], 0))
+            np.ascontiguousarray(out[name], dtype=self.dtypes[name]).tofile(self.files[name])
+        self.rows += len(out[self.columns[0]])
@@ -0,0 +1,57 @@
+class Action:
+    """single action (load) taking part in the load combinations. Its effects are supplied separately as arrays
+    stacked along the first axis in the same order as the actions of the LoadCombination"""
+
+    kinds = ('permanent', 'prestress', 'variable')
+    kwDefaults = {
+        'name': 'G',
+        'kind': 'permanent',  # permanent, prestress or variable
+        'gamma_sup': None,  # unfavourable ULS partial factor. 1.35 permanent, 1.0 prestress, 1.5 variable
+        'gamma_inf': None,  # favourable ULS partial factor. 1.0 permanent, 1.0 prestress, 0 variable
+        'r_sup': 1.0,  # unfavourable SLS factor of permanent and prestress actions
+        'r_inf': 1.0,  # favourable SLS factor of permanent and prestress actions
+        'psi0': 0.7,  # combination value coefficient of variable actions
+        'psi1': 0.5,  # frequent value coefficient of variable actions
+        'psi2': 0.3,  # quasi-permanent value coefficient of variable actions
+    }
+    gammaDefaults = {
+        'permanent': (1.35, 1.0),
+        'prestress': (1.0, 1.0),
+        'variable': (1.5, 0.0),
+    }
+
+    def __init__(self, **kwargs):
+        self.name = kwargs.get('name', self.kwDefaults['name'])
+        self.kind = kwargs.get('kind', self.kwDefaults['kind'])
+        if self.kind not in self.kinds:
+            raise ValueError(f'not a valid action kind. try {", ".join(self.kinds)} introduced as strings')
+
+        gamma_sup, gamma_inf = self.gammaDefaults[self.kind]
+        self.gamma_sup = kwargs.get('gamma_sup', self.kwDefaults['gamma_sup'])
+        self.gamma_inf = kwargs.get('gamma_inf', self.kwDefaults['gamma_inf'])
+        if self.gamma_sup is None:
+            self.gamma_sup = gamma_sup
+        if self.gamma_inf is None:
+            self.gamma_inf = gamma_inf
+
+        self.r_sup = kwargs.get('r_sup', self.kwDefaults['r_sup'])
+        self.r_inf = kwargs.get('r_inf', self.kwDefaults['r_inf'])
+        self.psi0 = kwargs.get('psi0', self.kwDefaults['psi0'])
+        self.psi1 = kwargs.get('psi1', self.kwDefaults['psi1'])
+        self.psi2 = kwargs.get('psi2', self.kwDefaults['psi2'])
+
+    def __str__(self):
+        string = f"""
+        {self.name}: {self.kind} action
+        gamma_sup: unfavourable ULS partial factor.................................{self.gamma_sup} -adim-
+        gamma_inf: favourable ULS partial factor...................................{self.gamma_inf} -adim-
+        r_sup: unfavourable SLS factor.............................................{self.r_sup} -adim-
+        r_inf: favourable SLS factor...............................................{self.r_inf} -adim-
+        psi0: combination value coefficient........................................{self.psi0} -adim-
+        psi1: frequent value coefficient...........................................{self.psi1} -adim-
+        psi2: quasi-permanent value coefficient....................................{self.psi2} -adim-
+        """
+        return string
+
+    def is_variable(self) -> bool:
+        return self.kind == 'variable'
@@ -0,0 +1,128 @@
+from itertools import product
+import numpy as np
+from StructEng.Loads.class_Action import Action
+
+
+class LoadCombination:
+    """combinations of actions for one limit state according to spanish structural code. The coefficient matrix
+    (one row per combination, one column per action) is built once, then applied to stacked action effects
+    with a single matrix product
+
+    limit states:
+    ULS: sum(gamma_G * G) + gamma_P * P + gamma_Q1 * Q1 + sum(gamma_Qi * psi0_i * Qi)
+    characteristic: sum(G) + P + Q1 + sum(psi0_i * Qi)
+    frequent: sum(G) + P + psi1_1 * Q1 + sum(psi2_i * Qi)
+    quasi-permanent: sum(G) + P + sum(psi2_i * Qi)
+
+    every permanent and prestress action is taken with its unfavourable and favourable factor and every
+    variable action is either present or absent, so the envelope of the combinations covers both signs
+    """
+    limit_states = ('ULS', 'characteristic', 'frequent', 'quasi-permanent')
+
+    def __init__(self, actions: list, limit_state: str = 'ULS'):
+        if limit_state not in self.limit_states:
+            raise ValueError(f'not a valid limit state. try {", ".join(self.limit_states)} introduced as strings')
+        if len({a.name for a in actions}) != len(actions):
+            raise ValueError('action names must be unique')
+
+        self.actions = list(actions)
+        self.limit_state = limit_state
+        self.C = self.coefficients()
+
+    def __str__(self):
+        return '\n'.join(self.labels())
+
+    def __len__(self):
+        return len(self.C)
+
+    def index(self, name: str) -> int:
+        """position of the action called name along the first axis of the effects"""
+        return [a.name for a in self.actions].index(name)
+
+    def __permanent_factors(self, action: Action) -> tuple:
+        if self.limit_state == 'ULS':
+            return action.gamma_sup, action.gamma_inf
+        return action.r_sup, action.r_inf
+
+    def __variable_factors(self, action: Action) -> tuple:
+        """(leading, accompanying) factors of a variable action"""
+        if self.limit_state == 'ULS':
+            return action.gamma_sup, action.gamma_sup * action.psi0
+        elif self.limit_state == 'characteristic':
+            return 1.0, action.psi0
+        elif self.limit_state == 'frequent':
+            return action.psi1, action.psi2
+        else:
+            return action.psi2, action.psi2
+
+    def coefficients(self) -> np.ndarray:
+        """combination coefficient matrix. Shape (n_combinations, n_actions). Duplicated rows are removed"""
+        choices = []  # candidate coefficients of every action
+        variables = [i for i, a in enumerate(self.actions) if a.is_variable()]
+        for a in self.actions:
+            if a.is_variable():
+                choices.append(None)
+            else:
+                choices.append(sorted(set(self.__permanent_factors(a))))
+
+        rows = []
+        leaders = variables if variables else [None]
+        for leader in leaders:
+            options = []
+            for i, a in enumerate(self.actions):
+                if not a.is_variable():
+                    options.append(choices[i])
+                else:
+                    leading, accompanying = self.__variable_factors(a)
+                    options.append([0.0, leading] if i == leader else [0.0, accompanying])
+            rows.extend(product(*options))
+
+        return np.unique(np.array(rows, dtype=float).reshape(-1, len(self.actions)), axis=0)
+
+    def labels(self) -> list:
+        """human readable expression of every combination"""
+        labels = []
+        for row in self.C:
+            terms = [f'{c:g}*{a.name}' for c, a in zip(row, self.actions) if c]
+            labels.append(' + '.join(terms) if terms else '0')
+        return labels
+
+    def apply(self, effects) -> np.ndarray:
+        """combined effects. Shape (n_combinations, ...)
+        :param effects: action effects stacked along the first axis, one entry per action
+        """
+        effects = np.asarray(effects, dtype=float)
+        if effects.shape[0] != len(self.actions):
+            raise ValueError(f'expected {len(self.actions)} action effects, got {effects.shape[0]}')
+        return np.tensordot(self.C, effects, axes=1)
+
+    def envelope(self, effects) -> tuple:
+        """(max, min) of the combined effects over all combinations"""
+        combined = self.apply(effects)
+        return combined.max(axis=0), combined.min(axis=0)
+
+    def magnel_loads(self, N, M, initial=None) -> tuple:
+        """(Ni, Mi, N_f, Mf) arrays ready for ConcreteSection.magnel_check(Ni, Mi, Mf, N_f), one entry per
+        combination. The initial loads Ni, Mi take the initial actions with unit factors, the final ones N_f, Mf
+        are the combinations
+        :param N: normal force of every action stacked along the first axis
+        :param M: whole moment from the top fibre of every action stacked along the first axis
+        :param initial: names of the actions present at the instant of prestress. Every permanent and prestress
+        action by default
+        """
+        if initial is None:
+            initial = [a.name for a in self.actions if not a.is_variable()]
+        unit = np.array([1.0 if a.name in initial else 0.0 for a in self.actions])
+
+        N_f = self.apply(N)
+        Mf = self.apply(M)
+        Ni = np.broadcast_to(np.tensordot(unit, np.asarray(N, dtype=float), axes=1), N_f.shape)
+        Mi = np.broadcast_to(np.tensordot(unit, np.asarray(M, dtype=float), axes=1), Mf.shape)
+        return Ni, Mi, N_f, Mf
+
+
+if __name__ == '__main__':
+    actions = [Action(name='G'), Action(name='P', kind='prestress'),
+               Action(name='Q_traffic', kind='variable', psi0=0.75, psi1=0.75, psi2=0),
+               Action(name='Q_wind', kind='variable', psi0=0.6, psi1=0.2, psi2=0)]
+    print(LoadCombination(actions, 'ULS'))
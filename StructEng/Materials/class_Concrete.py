@@ -1,5 +1,6 @@
+from collections import OrderedDict
+from functools import lru_cache
 from math import exp, log, sqrt
-import numpy as np
 # from StructEng.Materials.class_Material import Material
 
 
@@ -16,6 +17,7 @@ class Concrete:
         'HR': 25,
         'delayed_effects_time': 25550  # time in days to calculate delayed time effects. 70 years in days by default
     }
+    creep_cache_size = 64  # h0 values whose creep factors are kept
 
     def __init__(self, **kwargs):
         self.fck: int = kwargs.get('fck', self.kwDefaults['fck'])
@@ -30,6 +32,8 @@ class Concrete:
 
         # current stress applied to the material
         self.sigma_c = 0
+        self.frozen = False  # interned concretes are shared and can not be set
+        self.__creep_factors = OrderedDict()  # h0: (phiHR, Bfcm, B_H), least recently used first
 
         # strength attributes
         self.s = self.s_cem()
@@ -70,6 +74,31 @@ class Concrete:
 
         return string
 
+    def to_dict(self) -> dict:
+        """independent attributes. from_dict() builds an equal concrete"""
+        d = {k: self.__dict__[k] for k in self.kwDefaults}
+        d['T_data'] = list(d['T_data'])
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        d = dict(d)
+        d['T_data'] = tuple(d.get('T_data', cls.kwDefaults['T_data']))
+        return cls(**d)
+
+    @classmethod
+    def interned(cls, **kwargs):
+        """shared concrete with the given parameters (the rest take their defaults). Equal parameter sets get
+        the same instance from a bounded LRU cache, so its properties and creep factors are computed once for
+        all the sections using it. Interned concretes are frozen: set() raises
+        """
+        unknown = kwargs.keys() - cls.kwDefaults.keys()
+        if unknown:
+            raise AttributeError(f"{', '.join(unknown)} not attributes of class_Concrete")
+        params = {k: kwargs.get(k, cls.kwDefaults[k]) for k in cls.kwDefaults}
+        params['T_data'] = tuple(params['T_data'])
+        return _interned(tuple(params.items()))
+
     def __updt_dep_attrs(self) -> None:
         """update all dependent attributes"""
         self.s = self.s_cem()
@@ -86,6 +115,7 @@ class Concrete:
         # stain attrs
         self.epsilon_c2 = self.eps_c2()
         # strength modifier attrs (used in creep calculations)
+        self.__creep_factors.clear()
 
         self.__init_t_0()
 
@@ -105,6 +135,9 @@ class Concrete:
     def set(self, default: bool=False, **kwargs) -> None:
         """sets attributes to default or to the passed kwargs
         :param default: indicate if you want to set default values of not"""
+        if self.frozen:
+            raise AttributeError('interned concretes are shared and can not be set. '
+                                 'use Concrete.interned() with the new parameters')
         if default:
             for k in self.kwDefaults:
                 self.__dict__[k] = self.kwDefaults[k]
@@ -141,6 +174,9 @@ class Concrete:
 
     def fctm(self):
         """average concrete tensile strength"""
+        if getattr(self.fck, 'ndim', 0):  # array of strengths
+            import numpy as np
+            return np.where(self.fck <= 50, 0.30 * np.power(self.fck, 2 / 3), 2.12 * np.log(1 + self.f_cm * 0.1))
         if 0 < self.fck <= 50:
             return 0.30 * pow(self.fck, 2 / 3)
         elif self.fck > 50:
@@ -167,6 +203,11 @@ class Concrete:
         """time-dependent average concrete elastic modulus"""
         return pow(self.f_cmt / self.f_cm, 0.3) * self.E_cm
 
+    def Ecm_age(self, t: float) -> float:
+        """average concrete elastic modulus at age t days. E_cmt is the one at prestress_time
+        :param t: concrete age in days"""
+        return pow(exp(self.s * (1 - pow(28 / t, 0.5))), 0.3) * self.E_cm
+
     def eps_c2(self):
         """yield strain according to spanish Código Estructural parable-rectangle stress-strain model"""
         if self.fck <= 50:
@@ -191,11 +232,13 @@ class Concrete:
         :param n: can be 0.7, 0.2, 0.5"""
         return pow(35/self.f_cm, n)
 
-    def phiHR(self) -> float:
+    def phiHR(self, h0: float = None) -> float:
         """coefficient that takes into account the relative humidity over the
-        basic creep coefficient"""
+        basic creep coefficient
+        :param h0: notional size of the member (mm). self.h0 by default"""
+        h0 = self.h0 if h0 is None else h0
         num = 1 - self.HR * 0.01
-        dem = 0.1 * pow(self.h0, 1 / 3)
+        dem = 0.1 * pow(h0, 1 / 3)
 
         if 0 < self.f_cm <= 35:
             return 1 + num / dem
@@ -215,31 +258,55 @@ class Concrete:
         :param t0: time prestress after concrete pouring in days. t0 can be temperature dependent"""
         return 1 / (0.1 + pow(t0, 0.2))
 
-    def B_H(self) -> float:
+    def B_H(self, h0: float = None) -> float:
         """Coefficient depending on relative humidity (%) and the theoretical
-        element size (mm)"""
-        a = 1.5 * (1 + pow(0.012 * self.HR, 18) * self.h0)
+        element size (mm)
+        :param h0: notional size of the member (mm). self.h0 by default"""
+        h0 = self.h0 if h0 is None else h0
+        a = 1.5 * (1 + pow(0.012 * self.HR, 18) * h0)
         Bh = a + 250
         if 0 < self.f_cm <= 35:
-            if Bh <= 1500:
-                return Bh
-            else:
-                return 1500
+            limit = 1500
         elif self.f_cm > 35:
             Bh = a + 250 * self.alpha_n(0.5)
-            a = 1500 * self.alpha_n(0.5)
-            if Bh <= a:
-                return Bh
-            else:
-                return a
-
-    def Bc_t(self, t: int, t0: float) -> float:
+            limit = 1500 * self.alpha_n(0.5)
+        else:
+            raise ValueError
+        if getattr(Bh, 'ndim', 0):  # array of notional sizes
+            import numpy as np
+            return np.minimum(Bh, limit)
+        if Bh <= limit:
+            return Bh
+        else:
+            return limit
+
+    def creep_factors(self, h0: float = None) -> tuple:
+        """(phiHR, Bfcm, B_H), the creep factors that do not depend on time. Cached per h0 until set() is
+        called, keeping the creep_cache_size most recently used. Arrays of h0 (sections with array geometry)
+        are not cached
+        :param h0: notional size of the member (mm). self.h0 by default"""
+        h0 = self.h0 if h0 is None else h0
+        if getattr(h0, 'ndim', 0):
+            return self.phiHR(h0), self.Bfcm(), self.B_H(h0)
+        h0 = float(h0)
+        cache = self.__creep_factors
+        if h0 in cache:
+            cache.move_to_end(h0)
+            return cache[h0]
+        factors = (self.phiHR(h0), self.Bfcm(), self.B_H(h0))
+        cache[h0] = factors
+        if len(cache) > self.creep_cache_size:
+            cache.popitem(last=False)
+        return factors
+
+    def Bc_t(self, t: int, t0: float, h0: float = None) -> float:
         """coefficient describing creep development over time after loading
         :param t: concrete's age in days when creep is being calculated
         :param t0: concrete's age in days when load is applied
+        :param h0: notional size of the member (mm). self.h0 by default
         """
         num = t - t0
-        dem = self.B_H() + num
+        dem = self.creep_factors(h0)[2] + num
         return pow(num / dem, 0.3)
 
     def t0_cem(self, t0T: float) -> float:
@@ -262,27 +329,32 @@ class Concrete:
         (at concrete pouring) to the point at prestress application.
          :param T_data: daily temperature data during concrete curing as numpy ndarray.
          """
+        import numpy as np  # only needed with temperature data. Keeps numpy out of the module import
         np_T_data = np.array(T_data)
         exponential_vector = np.exp(-4000/(273+np_T_data)+13.65)
         return np.sum(exponential_vector).item()
 
-    def phi0(self, t0: float) -> float:
+    def phi0(self, t0: float, h0: float = None) -> float:
         """basic creep coefficient according to spanish structural code
         :param t0: concrete's age in days when load is applied
+        :param h0: notional size of the member (mm). self.h0 by default
         """
-        return self.phiHR() * self.Bfcm() * self.Bt0(t0)
+        phi_HR, B_fcm, _ = self.creep_factors(h0)
+        return phi_HR * B_fcm * self.Bt0(t0)
 
-    def phi_time(self, t: int, t0: float) -> float:
+    def phi_time(self, t: int, t0: float, h0: float = None) -> float:
         """time dependent creep coefficient
             :param t: concrete's age in days when creep is being calculated
-            :param t0: concrete's age in days when load is applied"""
-        return self.phi0(t0) * self.Bc_t(t, t0)
+            :param t0: concrete's age in days when load is applied
+            :param h0: notional size of the member (mm). self.h0 by default"""
+        return self.phi0(t0, h0) * self.Bc_t(t, t0, h0)
 
-    def phi_non_lin(self, t: int, t0: float) -> float:
+    def phi_non_lin(self, t: int, t0: float, h0: float = None) -> float:
         """time dependent non-linear creep coefficient
                 :param t: concrete's age in days when creep is being calculated
-                :param t0: concrete's age in days when load is applied"""
-        return self.phi_time(t, t0) * exp(1.5 * (self.sigma_c / self.f_ckt - 0.45))
+                :param t0: concrete's age in days when load is applied
+                :param h0: notional size of the member (mm). self.h0 by default"""
+        return self.phi_time(t, t0, h0) * exp(1.5 * (self.sigma_c / self.f_ckt - 0.45))
 
 # SHRINKAGE METHODS
 
@@ -304,6 +376,15 @@ def interpolate(data: tuple, n: int):
 
     return interpolated_data
 
+
+@lru_cache(maxsize=256)
+def _interned(params: tuple) -> Concrete:
+    """Concrete.interned() store. params are (name, value) pairs in kwDefaults order"""
+    concrete = Concrete(**dict(params))
+    concrete.frozen = True
+    return concrete
+
+
 if __name__ == '__main__':
     #attrs = {
     #    'fck': 40,
@@ -0,0 +1,132 @@
+from itertools import product
+import numpy as np
+from StructEng.Materials.class_Concrete import Concrete
+
+
+class CreepGrid:
+    """creep coefficient phi(t, t0) tabulated once over a grid of concrete strengths fck, relative humidities HR,
+    notional sizes h0, loading ages t0 and times since loading tau = t - t0, then answered for any number of
+    points by multilinear interpolation. h0, t0 and tau are interpolated in log scale, where the creep curves
+    are smoother. Points outside the grid are clamped to its border. t0 is the loading age that enters
+    Concrete.phi_time(), i.e. already adjusted to the cement type (concrete.t_0_cem)
+
+    max_error() compares the grid with the exact Concrete.phi_time() on random points, so the node counts can
+    be chosen for the accuracy needed. Axes with a single node are fixed values and need not be queried. Other
+    values along them raise ValueError instead of being answered with the node
+
+    the grid pays off when fck, HR, h0 or t0 change from point to point (sweeps, Monte Carlo samples): exact
+    values then need one Concrete per point. For one concrete and many ages phi_time() is already vectorized
+    and faster
+    """
+    axes = ('fck', 'HR', 'h0', 't0', 'tau')
+    log_axes = ('h0', 't0', 'tau')
+    kwDefaults = {
+        'fck': (Concrete.kwDefaults['fck'],),
+        'HR': (Concrete.kwDefaults['HR'],),
+        'h0': tuple(np.geomspace(50, 2000, 17)),  # mm
+        't0': tuple(np.geomspace(1, 365, 17)),  # days
+        'tau': tuple(np.geomspace(0.01, 36500, 41)),  # days
+    }
+
+    def __init__(self, **kwargs):
+        self.nodes = {name: np.asarray(kwargs.get(name, self.kwDefaults[name]), dtype=float)
+                      for name in self.axes}
+        for name, nodes in self.nodes.items():
+            if nodes.ndim != 1 or len(nodes) == 0 or np.any(np.diff(nodes) <= 0):
+                raise ValueError(f'{name} nodes must be a non empty increasing sequence')
+        # interpolation coordinates of the nodes
+        self.coords = {name: np.log(nodes) if name in self.log_axes else nodes for name, nodes in self.nodes.items()}
+        self.table = self.tabulate()
+
+    def tabulate(self) -> np.ndarray:
+        """phi at every node. Shape (n_fck, n_HR, n_h0, n_t0, n_tau)"""
+        n = self.nodes
+        table = np.empty(tuple(len(n[name]) for name in self.axes))
+        t0 = n['t0'][:, None]
+        t = t0 + n['tau'][None, :]
+        for i, fck in enumerate(n['fck']):
+            for j, HR in enumerate(n['HR']):
+                concrete = Concrete(fck=float(fck), HR=float(HR))
+                for k, h0 in enumerate(n['h0']):
+                    table[i, j, k] = concrete.phi_time(t, t0, float(h0))
+        return table
+
+    def __call__(self, t, t0, h0=None, fck=None, HR=None) -> np.ndarray:
+        """interpolated phi(t, t0). Arguments broadcast together. 0 where t <= t0
+        :param t: concrete age in days
+        :param t0: loading age in days (cement adjusted)
+        :param h0: notional size (mm). Optional when the grid has a single h0
+        :param fck: concrete characteristic strength. Optional when the grid has a single fck
+        :param HR: relative humidity (%). Optional when the grid has a single HR
+        """
+        t, t0 = np.asarray(t, dtype=float), np.asarray(t0, dtype=float)
+        tau = t - t0
+        query = {'fck': fck, 'HR': HR, 'h0': h0, 't0': t0, 'tau': np.maximum(tau, self.nodes['tau'][0])}
+        for name, value in query.items():
+            if len(self.nodes[name]) > 1:
+                if value is None:
+                    raise ValueError(f'the grid has several {name} nodes. {name} must be given')
+            elif value is None:
+                query[name] = self.nodes[name][0]
+            elif name != 'tau' and not np.allclose(value, self.nodes[name][0]):
+                raise ValueError(f'the grid has the single {name} node {self.nodes[name][0]:g} and can not answer '
+                                 f'other {name} values. Tabulate the grid over {name}')
+        values = np.broadcast_arrays(*(np.asarray(query[name], dtype=float) for name in self.axes))
+
+        index, weight = [], []
+        for name, x in zip(self.axes, values):
+            nodes = self.coords[name]
+            if len(nodes) == 1:
+                index.append(np.zeros(x.shape, dtype=np.intp))
+                weight.append(None)
+                continue
+            x = np.log(x) if name in self.log_axes else x
+            x = np.clip(x, nodes[0], nodes[-1])
+            i = np.clip(np.searchsorted(nodes, x, side='right') - 1, 0, len(nodes) - 2)
+            index.append(i)
+            weight.append((x - nodes[i]) / (nodes[i + 1] - nodes[i]))
+
+        flat = self.table.ravel()
+        phi = np.zeros(values[0].shape)
+        corners = product(*(((0,) if w is None else (0, 1)) for w in weight))
+        for corner in corners:
+            w_corner = np.ones(values[0].shape)
+            for c, w in zip(corner, weight):
+                if w is not None:
+                    w_corner = w_corner * (w if c else 1 - w)
+            idx = np.ravel_multi_index(tuple(i + c for i, c in zip(index, corner)), self.table.shape)
+            phi += w_corner * flat[idx]
+        return np.where(tau > 0, phi, 0.0)
+
+    def sample(self, n: int, seed: int = 0) -> dict:
+        """n random points inside the grid, log-uniform along the log axes"""
+        rng = np.random.default_rng(seed)
+        points = {}
+        for name in self.axes:
+            lo, hi = self.coords[name][0], self.coords[name][-1]
+            x = rng.uniform(lo, hi, n)
+            points[name] = np.exp(x) if name in self.log_axes else x
+        return points
+
+    def max_error(self, n: int = 2000, seed: int = 0) -> dict:
+        """largest absolute and relative differences with Concrete.phi_time() on n random points inside the grid
+        and the point of the largest absolute one"""
+        p = self.sample(n, seed)
+        t = p['t0'] + p['tau']
+        approx = self(t, p['t0'], p['h0'], p['fck'], p['HR'])
+        exact = np.array([Concrete(fck=float(p['fck'][i]), HR=float(p['HR'][i])).phi_time(t[i], p['t0'][i], p['h0'][i])
+                          for i in range(n)])
+        error = np.abs(approx - exact)
+        worst = int(np.argmax(error))
+        return {'abs': float(error[worst]), 'rel': float(np.max(error / np.abs(exact))),
+                'at': {name: float(p[name][worst]) for name in self.axes}}
+
+
+if __name__ == '__main__':
+    import time
+    grid = CreepGrid(fck=np.linspace(25, 50, 6), HR=np.linspace(40, 90, 6))
+    print(grid.max_error())
+    t = np.random.default_rng(1).uniform(30, 25550, 1_000_000)
+    start = time.perf_counter()
+    grid(t, 7.0, 300, 35, 60)
+    print(f'{len(t) / (time.perf_counter() - start):.3g} points/s')
@@ -21,3 +21,11 @@ class ReinforcementSteel:
         
         """
         return string
+
+    def to_dict(self) -> dict:
+        """independent attributes. from_dict() builds an equal steel"""
+        return {k: self.__dict__[k] for k in self.kwDefaults}
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        return cls(**d)
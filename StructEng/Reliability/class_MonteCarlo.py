@@ -0,0 +1,179 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.special import ndtr, ndtri
+
+
+class MonteCarlo:
+    """failure probabilities of one or more limit states by sampling. Every chunk draws all its samples as
+    arrays, evaluates the limit states once on them and keeps only running sums, so memory depends on the
+    chunk size and any number of samples can be streamed. Chunks have their own seeds spawned from seed: the
+    result is the same for any number of worker processes
+
+    variables are sampled through standard normal variables z, x = ppf(Phi(z)), so every method works with any
+    distribution:
+    mc: plain Monte Carlo
+    lhs: latin hypercube. Every chunk stratifies each variable in chunk equal probability bins
+    importance: z drawn around shift (the design point in standard normal space) and weighted by the density
+    ratio. shift is found with design_point() when not given
+
+    :param limit_states: callable taking a dict of sample arrays and returning a dict of limit state arrays.
+    Failure where g <= 0. Must be picklable to use workers
+    :param variables: name: frozen scipy.stats distribution, or a number for a fixed value
+    """
+    methods = ('mc', 'lhs', 'importance')
+    kwDefaults = {
+        'method': 'mc',
+        'chunk': 100000,  # samples per chunk
+        'seed': 0,
+        'workers': 1,  # processes evaluating chunks
+        'shift': None,  # importance sampling centre. z vector in the random variables order
+        'pilot': 20000,  # samples of the design point pilot run, used when HL-RF does not converge
+        'target': None,  # limit state whose design point is searched. The first one by default
+    }
+
+    def __init__(self, limit_states, variables: dict, **kwargs):
+        self.limit_states = limit_states
+        self.fixed = {k: v for k, v in variables.items() if np.isscalar(v)}
+        self.random = {k: v for k, v in variables.items() if not np.isscalar(v)}
+        self.method: str = kwargs.get('method', self.kwDefaults['method'])
+        if self.method not in self.methods:
+            raise ValueError(f'not a valid sampling method. try {", ".join(self.methods)}')
+        self.chunk: int = kwargs.get('chunk', self.kwDefaults['chunk'])
+        self.seed: int = kwargs.get('seed', self.kwDefaults['seed'])
+        self.workers: int = kwargs.get('workers', self.kwDefaults['workers'])
+        self.pilot: int = kwargs.get('pilot', self.kwDefaults['pilot'])
+        self.target: str = kwargs.get('target', self.kwDefaults['target'])
+        shift = kwargs.get('shift', self.kwDefaults['shift'])
+        self.shift = None if shift is None else np.asarray(shift, dtype=float)
+        if self.shift is not None and self.shift.shape != (len(self.random),):
+            raise ValueError(f'shift must have one value per random variable ({len(self.random)})')
+
+    # ---------------SAMPLING------------------------
+    def standard_normal(self, n: int, rng: np.random.Generator, method: str = None) -> tuple:
+        """(z, log_w): n standard normal points of shape (n, variables) and the log of their weights"""
+        method = self.method if method is None else method
+        d = len(self.random)
+        if method == 'lhs':
+            u = (rng.permuted(np.tile(np.arange(n), (d, 1)), axis=1).T + rng.random((n, d))) / n
+            return ndtri(u), np.zeros(n)
+        z = rng.standard_normal((n, d))
+        if method == 'importance':
+            z += self.shift
+            return z, 0.5 * self.shift @ self.shift - z @ self.shift
+        return z, np.zeros(n)
+
+    def transform(self, z: np.ndarray) -> dict:
+        """sample arrays of the variables at standard normal points z. Upper tails use isf() to keep precision"""
+        x = dict(self.fixed)
+        for i, (name, dist) in enumerate(self.random.items()):
+            zi = z[:, i]
+            x[name] = np.where(zi > 0, dist.isf(ndtr(-zi)), dist.ppf(ndtr(zi)))
+        return x
+
+    def chunk_sums(self, n: int, seed: np.random.SeedSequence, method: str = None) -> dict:
+        """name: (sum of weights of failures, sum of their squares, failures) of n samples"""
+        rng = np.random.default_rng(seed)
+        z, log_w = self.standard_normal(n, rng, method)
+        sums = {}
+        for name, g in self.limit_states(self.transform(z)).items():
+            w = np.where(np.asarray(g) <= 0, np.exp(log_w), 0.0)
+            sums[name] = (w.sum(), (w * w).sum(), int(np.count_nonzero(w)))
+        return sums
+
+    def chunks(self, n: int) -> list:
+        """(size, seed) of the chunks of n samples"""
+        sizes = [self.chunk] * (n // self.chunk) + ([n % self.chunk] if n % self.chunk else [])
+        return list(zip(sizes, np.random.SeedSequence(self.seed).spawn(len(sizes))))
+
+    # ---------------ESTIMATES------------------------
+    def design_point(self) -> np.ndarray:
+        """z of the most probable failure of the target limit state (FORM design point), found with the HL-RF
+        iteration. When it does not converge, the most probable failure among the samples of a plain Monte
+        Carlo pilot run"""
+        z = self.__hlrf()
+        if z is not None:
+            return z
+        rng = np.random.default_rng([self.seed, 1])  # not one of the chunk streams
+        z, _ = self.standard_normal(self.pilot, rng, 'mc')
+        target, g = self.__target(z)
+        failed = g <= 0
+        if not failed.any():
+            raise ValueError(f'HL-RF did not converge and no {target} failures in {self.pilot} pilot samples. '
+                             f'give shift or more pilot')
+        z = z[failed]
+        return z[np.argmin((z * z).sum(axis=1))]
+
+    def __target(self, z: np.ndarray) -> tuple:
+        """(name, g) of the target limit state at the standard normal points z"""
+        g = self.limit_states(self.transform(z))
+        target = next(iter(g)) if self.target is None else self.target
+        return target, np.broadcast_to(np.asarray(g[target], dtype=float), len(z))
+
+    def __hlrf(self, iterations: int = 50, dz: float = 1E-5, tol: float = 1E-6):
+        """HL-RF iteration from the mean point. The limit state and its central difference gradient are
+        evaluated in one call on the point and its 2 * variables shifts. None when it does not converge"""
+        d = len(self.random)
+        shifts = np.vstack((np.zeros(d), dz * np.eye(d), -dz * np.eye(d)))
+        z = np.zeros(d)
+        for _ in range(iterations):
+            g = self.__target(z + shifts)[1]
+            grad = (g[1:d + 1] - g[d + 1:]) / (2 * dz)
+            if not np.isfinite(g).all() or not grad.any():
+                return None
+            z_new = (grad @ z - g[0]) / (grad @ grad) * grad
+            if np.linalg.norm(z_new - z) <= tol * max(1.0, np.linalg.norm(z_new)):
+                return z_new
+            z = z_new
+        return None
+
+    def run(self, n: int) -> dict:
+        """failure probability estimates of every limit state from n samples. name: dict of
+        pf: failure probability
+        std: standard error of pf. For lhs it is the plain Monte Carlo one, an upper bound
+        cov: coefficient of variation of pf
+        beta: reliability index -Phi^-1(pf)
+        failures: failed samples
+        """
+        if self.method == 'importance' and self.shift is None:
+            self.shift = self.design_point()
+        totals = {}
+        for sums in self.__sums(n):
+            for name, s in sums.items():
+                totals[name] = tuple(a + b for a, b in zip(totals.get(name, (0.0, 0.0, 0)), s))
+
+        results = {}
+        for name, (s1, s2, failures) in totals.items():
+            pf = s1 / n
+            std = np.sqrt(max(s2 / n - pf * pf, 0.0) / n)
+            results[name] = {'pf': float(pf), 'std': float(std), 'cov': float(std / pf) if pf > 0 else np.inf,
+                             'beta': -float(ndtri(pf)), 'failures': failures}
+        return results
+
+    def __sums(self, n: int):
+        chunks = self.chunks(n)
+        if self.workers <= 1:
+            for size, seed in chunks:
+                yield self.chunk_sums(size, seed)
+            return
+
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self,)) as pool:
+            for size, seed in chunks:
+                pending.append(pool.submit(_chunk_sums, size, seed))
+                if len(pending) >= 2 * self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+
+_monte_carlo = None  # MonteCarlo of the current worker process
+
+
+def _init_worker(monte_carlo: MonteCarlo) -> None:
+    global _monte_carlo
+    _monte_carlo = monte_carlo
+
+
+def _chunk_sums(n: int, seed: np.random.SeedSequence) -> dict:
+    return _monte_carlo.chunk_sums(n, seed)
@@ -0,0 +1,112 @@
+import numpy as np
+from StructEng.Materials.class_Concrete import Concrete
+from StructEng.Materials.class_CreepGrid import CreepGrid
+from StructEng.Sections.class_ConcreteSection import ConcreteSection
+from StructEng.Sections.class_RectConcSect import RectConcSect
+
+
+class SampledConcrete:
+    """the concrete properties used by the sections for an array of strengths fck. The Concrete methods are
+    evaluated on the arrays, so one object stands for every sample. The time and cement parameters are those
+    of base
+    """
+
+    def __init__(self, base: Concrete, fck):
+        self.base = base
+        self.fck = np.asarray(fck, dtype=float)
+        self.HR = base.HR
+        self.t_0_cem = base.t_0_cem
+        self.delayed_effects_time = base.delayed_effects_time
+        self.B_cc = base.B_cc
+
+        self.f_cm = Concrete.fcm(self)
+        self.f_cmt = Concrete.fcm_t(self)
+        self.f_ckt = Concrete.fck_t(self)
+        self.f_ctm = Concrete.fctm(self)
+        self.f_ctmt = Concrete.fctm_t(self)
+        self.E_cm = Concrete.Ecm(self)
+        self.E_cmt = Concrete.Ecm_t(self)
+
+
+class SectionLimitStates:
+    """limit states of a prestressed section for arrays of sampled variables, for MonteCarlo. Every call
+    builds one section with array geometry and a SampledConcrete, so a whole chunk is evaluated at once
+
+    variables (any may be sampled, the rest take the values of the section or the defaults below):
+    section geometry (b, h, As1, As2, Ap, ds1, ds2, dp and t, t1, t2 for TConcSect), fck, fyk, fpk,
+    sigma_p0: tendon stress after transfer (MPa)
+    loss: time independent prestress losses at service (shrinkage, relaxation) as a fraction of sigma_p0
+    Mg: permanent external moment, acting at transfer (N*mm, sagging positive)
+    Mq: variable external moment (N*mm)
+    theta_creep: creep model uncertainty. Multiplies the creep coefficient
+
+    limit states:
+    magnel: smallest magnel stress margin (MPa) with the creep loss of the quasi-permanent load up to
+    concrete.delayed_effects_time
+    bending: ultimate moment minus Mg + Mq (N*mm). Rectangular stress block of width b with both steels
+    yielding, As1 neglected
+    """
+    kwDefaults = {
+        'sigma_p0': 1300,
+        'loss': 0.1,
+        'Mg': 0.0,
+        'Mq': 0.0,
+        'theta_creep': 1.0,
+        'psi2': 0.3,  # quasi-permanent factor of Mq for creep
+        'fck_nodes': tuple(np.linspace(12, 90, 14)),  # creep grid strengths. Must cover the sampled fck
+    }
+
+    def __init__(self, section: ConcreteSection = None, **kwargs):
+        self.section = section if section is not None else RectConcSect()
+        self.psi2: float = kwargs.get('psi2', self.kwDefaults['psi2'])
+        self.values = {**self.section.geometry(), 'fck': self.section.concrete.fck,
+                       'fyk': self.section.passive_steel.fyk, 'fpk': self.section.prestress_steel.fpk}
+        self.values.update({k: self.kwDefaults[k] for k in ('sigma_p0', 'loss', 'Mg', 'Mq', 'theta_creep')})
+        concrete = self.section.concrete
+        self.grid = CreepGrid(fck=kwargs.get('fck_nodes', self.kwDefaults['fck_nodes']), HR=(concrete.HR,),
+                              t0=(concrete.t_0_cem,))
+
+    def __call__(self, x: dict) -> dict:
+        unknown = x.keys() - self.values.keys()
+        if unknown:
+            raise ValueError(f"{', '.join(unknown)} not variables of the section limit states")
+        v = {**self.values, **x}
+        geometry = {k: v[k] for k in self.section.geometry()}
+        concrete = SampledConcrete(self.section.concrete, v['fck'])
+        section = type(self.section)(concrete=concrete, steel_s=self.section.passive_steel,
+                                     steel_p=self.section.prestress_steel, **geometry)
+        Ap, dp, Mg, Mq = v['Ap'], v['dp'], v['Mg'], v['Mq']
+
+        # service: prestress after transfer, then creep and time independent losses
+        N = -Ap * v['sigma_p0']
+        phi = v['theta_creep'] * self.grid(concrete.delayed_effects_time, concrete.t_0_cem, section.h0,
+                                           concrete.fck)
+        creep_loss = -section.prestress_steel.Ep * section.eps(N, Mg + self.psi2 * Mq + N * dp, dp) * phi
+        N_f = N * (1 - v['loss']) + Ap * creep_loss
+        magnel = section.magnel_margins(N, Mg + N * dp, Mg + Mq + N_f * dp, N_f).min(axis=0)
+
+        # ultimate: tendon and tension steel yield, compression block 0.8x deep at 0.85fck
+        Fp, Fs = Ap * v['fpk'], v['As2'] * v['fyk']
+        x_u = (Fp + Fs) / (0.68 * concrete.fck * v['b'])
+        Mu = Fp * (dp - 0.4 * x_u) + Fs * (v['ds2'] - 0.4 * x_u)
+        return {'magnel': magnel, 'bending': Mu - Mg - Mq}
+
+
+if __name__ == '__main__':
+    import time
+    from scipy import stats
+    from StructEng.Reliability.class_MonteCarlo import MonteCarlo
+    limit_states = SectionLimitStates(RectConcSect(b=400, h=1000, Ap=1400, As2=1000, dp=850, ds2=950))
+    variables = {
+        'fck': stats.lognorm(0.12, scale=38),
+        'Ap': stats.norm(1400, 20),
+        'dp': stats.norm(850, 10),
+        'sigma_p0': stats.norm(1300, 40),
+        'Mg': stats.norm(450E6, 25E6),
+        'Mq': stats.gumbel_r(300E6, 60E6),
+        'theta_creep': stats.lognorm(0.2),
+    }
+    for method in MonteCarlo.methods:
+        start = time.perf_counter()
+        print(method, MonteCarlo(limit_states, variables, method=method, target='magnel').run(200000),
+              f'{time.perf_counter() - start:.2f} s')
@@ -0,0 +1,124 @@
+import numpy as np
+from StructEng.Sections.class_ConcreteSection import _rows
+
+"""
+---------UNITS--------------------
+length: mm
+force: N
+moment: N*mm
+---------ORIGIN-----------------
+y is measured downwards from the top fibre of the composite section. Moments are whole moments about y = 0,
+sagging positive, as in ConcreteSection
+"""
+
+
+class CompositeSection:
+    """section made of several bonded concrete parts (precast girder and in situ slab...), each a
+    ConcreteSection with its own Concrete, reinforcement and age. Everything is homogenized to the concrete of
+    the reference part: a part of modulus E counts with m = E / E_ref and its steels with Es / E_ref - m
+
+    part geometry and depths can be arrays (slab widths, topping thicknesses...): the sums of every part are
+    stacked and added at once, so all the variants are evaluated together
+
+    :param parts: name: (section, y) or (section, y, age). y is the depth of the part top fibre and age the
+    concrete age in days (Concrete.Ecm_age). E_cm when not given
+    :param reference: part whose concrete is the homogenization reference. The first one by default
+    """
+
+    def __init__(self, parts: dict, reference: str = None):
+        self.parts = {}
+        for name, part in parts.items():
+            section, y, age = (tuple(part) + (None,))[:3]
+            E = section.concrete.E_cm if age is None else section.concrete.Ecm_age(age)
+            self.parts[name] = {'section': section, 'y': y, 'age': age, 'E': E}
+        self.reference = reference if reference is not None else next(iter(self.parts))
+        self.E_ref = self.parts[self.reference]['E']
+        self.m = {name: part['E'] / self.E_ref for name, part in self.parts.items()}
+        self.h = np.max(np.broadcast_arrays(*(p['y'] + p['section'].h for p in self.parts.values())), axis=0)
+        self.hmgSect = self.hmgSection()
+
+    # HOMOGENIZED SECTION METHODS
+    def part_sums(self, name: str) -> np.ndarray:
+        """(A, Q, I) of part name from the composite top fibre, homogenized to the reference concrete, along the
+        last axis"""
+        part = self.parts[name]
+        s, y, m = part['section'], part['y'], self.m[name]
+        A, Q, I = s.Ac, s.Q_xtop, s.I_xtop
+        sums = m * _moments(A, Q + A * y, I + 2 * y * Q + A * y * y)
+        # bonded rows in reference concrete units, over the part concrete they replace
+        r = s.rebar
+        ndim = max(np.ndim(y), r['d'].ndim - 1)
+        a, d = _rows(r['A_bonded'] * (r['E'] / self.E_ref - m), ndim), _rows(r['d'], ndim) + y
+        return sums + _moments(a.sum(axis=0), (a * d).sum(axis=0), (a * d * d).sum(axis=0))
+
+    def hmgSection(self) -> dict:
+        """ConcreteSection.hmgSection() of the composite section in reference concrete units. y_cen is the centroid
+        of the homogenized section"""
+        A, Q, I = np.moveaxis(np.sum(np.broadcast_arrays(*(self.part_sums(name) for name in self.parts)), axis=0),
+                              -1, 0)
+        y_cen = Q / A
+        Ixo = I - A * y_cen * y_cen
+        return {'A': A, 'Q': Q, 'I': I, 'Ixo': Ixo, 'y_cen': y_cen, 'Wxo1': Ixo / y_cen,
+                'Wxo2': Ixo / (self.h - y_cen)}
+
+    # -----------STRAIN SECTION METHODS ------------------
+    def k(self, N, M):
+        """signed curvature
+        :param N: normal force
+        :param M: whole moment applied to the section
+        """
+        hmg = self.hmgSect
+        return (N * hmg['Q'] - M * hmg['A']) / (self.E_ref * (hmg['Q'] * hmg['Q'] - hmg['A'] * hmg['I']))
+
+    def eps_0(self, N, M):
+        """signed strain at y = 0
+        :param N: normal force
+        :param M: whole moment applied to the section
+        """
+        hmg = self.hmgSect
+        return (M * hmg['Q'] - hmg['I'] * N) / (self.E_ref * (hmg['Q'] * hmg['Q'] - hmg['A'] * hmg['I']))
+
+    def eps(self, N, M, y):
+        """strain at depth y
+        :param N: normal force
+        :param M: whole moment applied to the section
+        :param y: distance from top fibre to evaluate strain at
+        """
+        return self.eps_0(N, M) + self.k(N, M) * y
+
+    # STRESS METHODS
+    def stress(self, N, M, y, part: str):
+        """concrete stress of part at depth y
+        :param N: normal force
+        :param M: whole moment applied to the section
+        :param y: distance from top fibre to evaluate stress at
+        :param part: name of the part y belongs to
+        """
+        return self.eps(N, M, y) * self.parts[part]['E']
+
+    def stresses(self, N, M) -> dict:
+        """{part: {'top': stress, 'bottom': stress}} at the top and bottom fibres of every part"""
+        eps_0, k = self.eps_0(N, M), self.k(N, M)
+        stresses = {}
+        for name, part in self.parts.items():
+            top = part['y']
+            stresses[name] = {'top': part['E'] * (eps_0 + k * top),
+                              'bottom': part['E'] * (eps_0 + k * (top + part['section'].h))}
+        return stresses
+
+
+def _moments(A, Q, I) -> np.ndarray:
+    """A, Q and I stacked along a last axis, so that parts of different shapes broadcast"""
+    return np.stack(np.broadcast_arrays(A, Q, I), axis=-1)
+
+
+if __name__ == '__main__':
+    from StructEng.Materials.class_Concrete import Concrete
+    from StructEng.Sections.class_RectConcSect import RectConcSect
+    from StructEng.Sections.class_TConcSect import TConcSect
+    girder = TConcSect(concrete=Concrete(fck=50), b=600, h=1200, t=200, t1=150, t2=100, Ap=2800, dp=1100)
+    # every slab width and topping thickness at once
+    b, t = np.meshgrid(np.linspace(1500, 3000, 7), np.linspace(150, 300, 4))
+    slab = RectConcSect(concrete=Concrete(fck=30), b=b, h=t, ds1=40, As1=1000, ds2=t - 40, Ap=0)
+    composite = CompositeSection({'girder': (girder, t, 365), 'slab': (slab, 0.0, 300)})
+    print(composite.stresses(0, 2E9)['slab']['top'].round(2))
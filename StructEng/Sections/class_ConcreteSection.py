@@ -1,13 +1,48 @@
+from abc import abstractmethod
+import numpy as np
 from StructEng.Sections.class_Section import Section
 from StructEng.Materials.class_Concrete import Concrete
 from StructEng.Materials.class_ReinforcementSteel import ReinforcementSteel
 from StructEng.Materials.class_PrestressSteel import PrestressSteel
 
 
+class _LazyDefault:
+    """class attribute built on first access and then cached on the class that declares it, so every section
+    shares the same default material and importing the module builds none"""
+
+    def __init__(self, factory):
+        self.factory = factory
+
+    def __set_name__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        value = self.factory()
+        setattr(self.owner, self.name, value)  # replaces the descriptor
+        return value
+
+
+class _Rows(dict):
+    """reinforcement rows as arrays. Equal when all their arrays are"""
+
+    def __eq__(self, other):
+        return isinstance(other, dict) and self.keys() == other.keys() and \
+            all(np.array_equal(v, other[k]) for k, v in self.items())
+
+    __hash__ = None
+
+
+def _rows(x: np.ndarray, ndim: int) -> np.ndarray:
+    """x, with the reinforcement rows along its first axis, with axes of length 1 after the first so that it
+    broadcasts against ndim dimensional arrays"""
+    return x.reshape(x.shape[:1] + (1,) * (ndim + 1 - x.ndim) + x.shape[1:])
+
+
 class ConcreteSection(Section):
-    concrete_default = Concrete()
-    passive_steel_default = ReinforcementSteel()
-    prestress_steel_default = PrestressSteel()
+    concrete_default = _LazyDefault(Concrete.interned)
+    passive_steel_default = _LazyDefault(ReinforcementSteel)
+    prestress_steel_default = _LazyDefault(PrestressSteel)
     kwDefaults = {
         'As1': 0,
         'As2': 0,
@@ -19,15 +54,15 @@ class ConcreteSection(Section):
         'dp': 850,
     }
 
-    def __init__(self, concrete: Concrete = concrete_default,
-                 steel_s: ReinforcementSteel = passive_steel_default,
-                 steel_p: PrestressSteel = prestress_steel_default,
+    def __init__(self, concrete: Concrete = None,
+                 steel_s: ReinforcementSteel = None,
+                 steel_p: PrestressSteel = None,
                  **kwargs):
 
-        # MATERIAL
-        self.concrete = concrete
-        self.passive_steel = steel_s
-        self.prestress_steel = steel_p
+        # MATERIAL. Shared defaults when not given
+        self.concrete = concrete if concrete is not None else self.concrete_default
+        self.passive_steel = steel_s if steel_s is not None else self.passive_steel_default
+        self.prestress_steel = steel_p if steel_p is not None else self.prestress_steel_default
 
         self.ns = self.passive_steel.Es / self.concrete.E_cm
         self.n_st = self.passive_steel.Es / self.concrete.E_cmt
@@ -44,7 +79,7 @@ class ConcreteSection(Section):
         self.h = kwargs.get('h', self.kwDefaults['h'])
         self.Ac = self.bruteArea()
 
-        self.__init_h0()  # initialize concrete.h0 with actual section values
+        self.__init_h0()  # notional size of the section for creep. The concrete is not modified
 
         self.Q_xtop = self.Qx_top()
         self.y_cen = self.ycentroid()
@@ -58,6 +93,10 @@ class ConcreteSection(Section):
         self.ds2 = kwargs.get('ds2', self.kwDefaults['ds2'])
         self.dp = kwargs.get('dp', self.kwDefaults['dp'])
 
+        # MORE REINFORCEMENT ROWS: (area, depth, steel) or (area, depth, steel, bonded)
+        self.layers = tuple(kwargs.get('layers', ()))
+        self._rebar = None  # reinforcement() rows. Lazily computed
+
         self.ecc = self.e()  # active reinforcement eccentricity
 
         # HOMOGENIZED SECTION
@@ -90,6 +129,7 @@ class ConcreteSection(Section):
         As1: passive steel area in the compression part of the beam................{self.As1} mm2
         As2: passive steel area in the tension part of the beam....................{self.As2} mm2
         Ap: pre-stress steel area..................................................{self.Ap} mm2
+        layers: more reinforcement rows (area, depth, steel, bonded)...............{len(self.layers)}
         
         -------------------------------SECTION GEOMETRY-----------------------------------------
         b: width of the smallest bounding box that contains the section............{self.b} mm
@@ -129,6 +169,102 @@ class ConcreteSection(Section):
         """
         return string
 
+    def geometry(self) -> dict:
+        """independent geometric attributes: dimensions, reinforcement areas and positions"""
+        return {k: self.__dict__[k] for k in self.kwDefaults}
+
+    def to_dict(self) -> dict:
+        """geometry plus the materials as nested dicts. from_dict() builds an equal section"""
+        d = {'type': type(self).__name__, **self.geometry(),
+             'concrete': self.concrete.to_dict(),
+             'steel_s': self.passive_steel.to_dict(),
+             'steel_p': self.prestress_steel.to_dict()}
+        if self.layers:
+            d['layers'] = self.layers_to_dicts(self.layers)
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict, concrete: Concrete = None, steel_s: ReinforcementSteel = None,
+                  steel_p: PrestressSteel = None):
+        """section of class cls from a to_dict() dict. Materials given as objects replace the nested dicts,
+        so several sections can share them
+        """
+        geometry = {k: d[k] for k in d if k not in ('type', 'concrete', 'steel_s', 'steel_p', 'layers')}
+        if d.get('layers'):
+            geometry['layers'] = cls.layers_from_dicts(d['layers'])
+        if concrete is None and isinstance(d.get('concrete'), dict):
+            concrete = Concrete.from_dict(d['concrete'])
+        if steel_s is None and isinstance(d.get('steel_s'), dict):
+            steel_s = ReinforcementSteel.from_dict(d['steel_s'])
+        if steel_p is None and isinstance(d.get('steel_p'), dict):
+            steel_p = PrestressSteel.from_dict(d['steel_p'])
+        return cls(concrete=concrete, steel_s=steel_s, steel_p=steel_p, **geometry)
+
+    @staticmethod
+    def layers_to_dicts(layers) -> list:
+        """reinforcement layers as dicts {'A', 'd', 'steel': steel class name, steel attributes..., 'bonded'}"""
+        return [{'A': layer[0], 'd': layer[1], 'steel': type(layer[2]).__name__, **layer[2].to_dict(),
+                 'bonded': bool(layer[3]) if len(layer) > 3 else True} for layer in layers]
+
+    @staticmethod
+    def layers_from_dicts(dicts) -> list:
+        """reinforcement layers of layers_to_dicts() dicts"""
+        steels = {'ReinforcementSteel': ReinforcementSteel, 'PrestressSteel': PrestressSteel}
+        return [(d['A'], d['d'], steels[d['steel']].from_dict({k: d[k] for k in steels[d['steel']].kwDefaults}),
+                 d['bonded']) for d in dicts]
+
+    def gradient(self, wrt: tuple = ('b', 'h', 'Ap', 'dp', 'fck')) -> 'SectionGradient':
+        """derivatives of the homogenized properties, strains, stresses and magnel margins with respect to the
+        geometric attributes and fck named in wrt. See SectionGradient"""
+        from StructEng.Sections.class_SectionGradient import SectionGradient  # only imported by gradients
+        return SectionGradient(self, wrt)
+
+    @abstractmethod
+    def brute_derivatives(self) -> dict:
+        """{'A': {attribute: derivative}, 'Q': ..., 'I': ...}: derivatives of the brute area and of its static
+        moment and moment of inertia from the top fibre with respect to the geometric attributes they use.
+        Every section class gives them in closed form, next to Ac, Q_xtop and I_xtop. gradient() builds its
+        jacobian from them"""
+        pass
+
+    def reinforcement(self) -> dict:
+        """every reinforcement row along the first axis: As1, As2, Ap and then the layers.
+        {'A': areas, 'd': depths from the top fibre, 'E': moduli, 'bonded': bool, 'prestress': bool,
+        'A_bonded': areas of the bonded rows, 0 for the others}
+        unbonded (debonded or unbonded tendon) rows do not follow the strain of the concrete. They are left out
+        of the homogenized section"""
+        rows = ((self.As1, self.ds1, self.passive_steel), (self.As2, self.ds2, self.passive_steel),
+                (self.Ap, self.dp, self.prestress_steel)) + self.layers
+        A, d = [row[0] for row in rows], [row[1] for row in rows]
+        if any(isinstance(x, np.ndarray) for x in A + d):  # section variants
+            values = np.broadcast_arrays(*A, *d)
+            A, d = np.stack(values[:len(rows)], dtype=float), np.stack(values[len(rows):], dtype=float)
+        else:
+            A, d = np.array(A, dtype=float), np.array(d, dtype=float)
+        ndim = A.ndim - 1
+        prestress = _rows(np.array([isinstance(row[2], PrestressSteel) for row in rows]), ndim)
+        bonded = _rows(np.array([len(row) < 4 or bool(row[3]) for row in rows]), ndim)
+        E = _rows(np.array([row[2].Ep if isinstance(row[2], PrestressSteel) else row[2].Es for row in rows]), ndim)
+        return _Rows(A=A, d=d, E=E, bonded=bonded, prestress=prestress, A_bonded=A * bonded)
+
+    @property
+    def rebar(self) -> dict:
+        """reinforcement() rows, built on first use. Sections without layers never need them to be built"""
+        if self._rebar is None:
+            self._rebar = self.reinforcement()
+        return self._rebar
+
+    def tendons(self) -> tuple:
+        """(area, depth of the centroid) of all the prestressing rows, Ap and the prestressing layers. The
+        centroid is dp where there is no prestressing steel"""
+        if not self.layers:
+            return self.Ap, self.dp
+        r = self.rebar
+        Ap = r['A'] * r['prestress']
+        area = Ap.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return area, np.where(area > 0, (Ap * r['d']).sum(axis=0) / area, self.dp)[()]
+
     def __updt_dep__attrs(self) -> None:
         """updates dependent attrs"""
         self.ns = self.passive_steel.Es / self.concrete.E_cm
@@ -146,17 +282,19 @@ class ConcreteSection(Section):
         self.Ixo = self.Ix0()
         self.Wxo1 = self.Wx01()
         self.Wxo2 = self.Wx02()
+        self.layers = tuple(self.layers)
+        self._rebar = None
         self.ecc = self.e()
 
         self.hmgSect = self.hmgSection()
         self.hmgSect_t = self.hmgSection_t()
 
     def __init_h0(self):
-        self.concrete.h0 = self.Ac / (self.h + self.b)
+        self.h0 = self.Ac / (self.h + self.b)
 
-    def set(self, default: bool=False, concrete: Concrete = concrete_default,
-            passive_steel: ReinforcementSteel = passive_steel_default,
-            prestress_steel: PrestressSteel = prestress_steel_default,
+    def set(self, default: bool=False, concrete: Concrete = None,
+            passive_steel: ReinforcementSteel = None,
+            prestress_steel: PrestressSteel = None,
             **kwargs):
         """sets attributes to the values passed in a dict"""
         if default:
@@ -229,8 +367,8 @@ class ConcreteSection(Section):
     # ------------CONCRETE METHODS---------------------
 
     def e(self):
-        """distance from the centroid to the pre-tensioned steel centroid"""
-        return self.dp - self.y_cen
+        """distance from the centroid to the pre-tensioned steel centroid (Ap and the prestressing layers)"""
+        return self.tendons()[1] - self.y_cen
 
     # -----------STRAIN SECTION METHODS ------------------
 
@@ -258,8 +396,9 @@ class ConcreteSection(Section):
         :param M: whole moment applied to the section
         :param y0: depth of non-cracked part of the section
         """
-        num = N * self.hmgSection_y(y0)['Q'] - M * self.hmgSection_y(y0)['A']
-        dem = self.concrete.E_cm * (pow(self.hmgSection_y(y0)['Q'], 2) - self.hmgSection_y(y0)['A'] * self.hmgSection_y(y0)['I'])
+        hmg = self.hmgSection_y(y0)
+        num = N * hmg['Q'] - M * hmg['A']
+        dem = self.concrete.E_cm * (pow(hmg['Q'], 2) - hmg['A'] * hmg['I'])
         return num / dem
 
     def eps_0(self, N, M):  # test
@@ -286,8 +425,9 @@ class ConcreteSection(Section):
         :param M: whole moment applied to the section
         :param y0:  depth of non-cracked part of the section
         """
-        num = self.hmgSection_y(y0)['Q'] * M - self.hmgSection_y(y0)['I'] * N
-        dem = self.concrete.E_cm * (pow(self.hmgSection_y(y0)['Q'], 2) - self.hmgSection_y(y0)['A'] * self.hmgSection_y(y0)['I'])
+        hmg = self.hmgSection_y(y0)
+        num = hmg['Q'] * M - hmg['I'] * N
+        dem = self.concrete.E_cm * (pow(hmg['Q'], 2) - hmg['A'] * hmg['I'])
         return num / dem
 
     def eps(self, N, M, y):
@@ -317,6 +457,59 @@ class ConcreteSection(Section):
         """
         return self.eps_0_cr(N, M, y0) + self.k_cr(N, M, y0) * y
 
+    def y0_cr(self, N, M, iterations: int = 60):
+        """depth of the non-cracked part of the section (neutral axis of the cracked section, measured from the
+        top fibre) for bottom-fibre cracking. Solved by bisection of eps_cr(N, M, y0, y0) = 0 for all the
+        elements of N and M at once. nan where there is no neutral axis within the section
+        :param N: normal force
+        :param M: whole moment applied to the section
+        :param iterations: bisection steps. Each one halves the uncertainty of y0
+        """
+        N, M = np.broadcast_arrays(np.asarray(N, dtype=float), np.asarray(M, dtype=float))
+
+        def f(y0):
+            # numerator of eps_cr(N, M, y0, y0). The denominator Q^2 - A*I is always negative
+            hmg = self.hmgSection_y(y0)
+            return hmg['Q'] * M - hmg['I'] * N + (N * hmg['Q'] - M * hmg['A']) * y0
+
+        lo = np.full(N.shape, 1E-6 * self.h)
+        hi = np.full(N.shape, float(self.h))
+        f_lo = f(lo)
+        valid = np.sign(f_lo) != np.sign(f(hi))
+        for _ in range(iterations):
+            mid = (lo + hi) / 2
+            f_mid = f(mid)
+            left = np.sign(f_mid) == np.sign(f_lo)
+            lo = np.where(left, mid, lo)
+            f_lo = np.where(left, f_mid, f_lo)
+            hi = np.where(left, hi, mid)
+
+        y0 = np.where(valid, (lo + hi) / 2, np.nan)
+        return y0 if y0.ndim else y0.item()
+
+    def is_cracked(self, N, M):
+        """True where the bottom fibre stress of the non-cracked section exceeds the concrete tensile strength
+        :param N: normal force
+        :param M: whole moment applied to the section
+        """
+        return self.stress(N, M, self.h) > self.concrete.f_ctm
+
+    def curvature(self, N, M):
+        """signed curvature of the section. k() where the section is not cracked, k_cr() at the neutral axis
+        depth y0_cr() where the bottom fibre cracks. Top-fibre cracking is not taken into account
+        :param N: normal force
+        :param M: whole moment applied to the section
+        """
+        k = np.asarray(self.k(N, M), dtype=float)
+        cracked = np.broadcast_to(self.is_cracked(N, M), k.shape)
+        if np.any(cracked):
+            N_cr = np.broadcast_to(N, k.shape)[cracked]
+            M_cr = np.broadcast_to(M, k.shape)[cracked]
+            y0 = self.y0_cr(N_cr, M_cr)
+            k = k.copy()
+            k[cracked] = np.where(np.isnan(y0), k[cracked], self.k_cr(N_cr, M_cr, np.nan_to_num(y0, nan=self.h)))
+        return k
+
     # STRESS METHODS
     def stress(self, N, M, y):
         """stress at any point y to section's height
@@ -334,52 +527,44 @@ class ConcreteSection(Section):
         """
         return self.eps_t(N, M, y) * self.concrete.E_cmt
 
+    def bar_stresses(self, N, M):
+        """stress change of every reinforcement row (reinforcement() order, along the first axis) with the
+        strain of the uncracked section at its depth. 0 for the unbonded rows
+        :param N: normal force
+        :param M: whole moment applied to the section
+        """
+        r = self.rebar
+        eps_0, k = self.eps_0(N, M), self.k(N, M)
+        ndim = max(np.ndim(eps_0), r['d'].ndim - 1)
+        return _rows(r['E'] * r['bonded'], ndim) * (eps_0 + k * _rows(r['d'], ndim))
+
+    def phi_time(self, t, t0: float = None, grid=None):
+        """creep coefficient of the section concrete for the section notional size h0. Ages before t0 give 0
+        :param t: concrete age in days. Scalar or array
+        :param t0: loading age. concrete.t_0_cem by default
+        :param grid: CreepGrid to interpolate from instead of the exact expression
+        """
+        t0 = self.concrete.t_0_cem if t0 is None else t0
+        if grid is not None:
+            return grid(t, t0, self.h0, self.concrete.fck, self.concrete.HR)
+        return self.concrete.phi_time(np.maximum(t, t0), t0, self.h0)
+
+    def creep_loss(self, N, M, t):
+        """prestress steel stress lost by creep of the concrete at the tendons centroid (tendons()) up to
+        concrete age t (MPa).
+        Linear creep under the permanent loads N, M applied at the prestress time. Relaxation and shrinkage
+        are not included
+        :param N: quasi-permanent normal force
+        :param M: quasi-permanent whole moment
+        :param t: concrete age in days. Scalar or array
+        """
+        return -self.prestress_steel.Ep * self.eps(N, M, self.tendons()[1]) * self.phi_time(t)
+
     # HOMOGENIZED SECTION METHODS
     def hmgSection(self) -> dict:
         """dictionary {area, first moment of inertia, second moment of inertia}
         from the top fibre of the homogenized section"""
-
-        hmg = dict()
-        hmgA = self.Ac
-        hmgAc1 = self.As1 * (self.ns - 1)
-        hmgAc2 = self.As2 * (self.ns - 1)
-        hmgAcp = self.Ap * (self.np - 1)
-        hmgArea = hmgA + hmgAc1 + hmgAc2 + hmgAcp
-
-        # brure section static moment
-        hmgQA = self.Q_xtop
-        # reinforcement static moment
-        hmgQc1 = hmgAc1 * self.ds1
-        hmgQc2 = hmgAc2 * self.ds2
-        hmgQcp = hmgAcp * self.dp
-        hmgQ = hmgQA + hmgQc1 + hmgQc2 + hmgQcp
-
-        hmgIA = self.I_xtop
-        hmgIc1 = hmgQc1 * self.ds1
-        hmgIc2 = hmgQc2 * self.ds2
-        hmgIcp = hmgQcp * self.dp
-        hmgI = hmgIA + hmgIc1 + hmgIc2 + hmgIcp
-
-        # homogenized section's centroid
-        hmg_y_cen = hmgQ / hmgA
-        # homogenized active reinforcement eccentricity
-        hmg_ecc = self.dp - hmg_y_cen
-        # homogenized section's inertia from centroid
-        hmgI0 = hmgI - hmgA * pow(hmg_y_cen, 2)
-        # homogenized section's elastic modulus
-        hmg_W01 = hmgI0 / hmg_y_cen
-        hmg_W02 = hmgI0 / (self.h - hmg_y_cen)
-
-        hmg['A'] = hmgArea
-        hmg['Q'] = hmgQ
-        hmg['I'] = hmgI
-        hmg['Ixo'] = hmgI0
-        hmg['y_cen'] = hmg_y_cen
-        hmg['ecc'] = hmg_ecc
-        hmg['Wxo1'] = hmg_W01
-        hmg['Wxo2'] = hmg_W02
-
-        return hmg
+        return self.__hmg(self.Ac, self.Q_xtop, self.I_xtop, self.concrete.E_cm)
 
     def hmgSection_y(self, y) -> dict:
         """dictionary {Area, First moment of inertia, Second moment of inertia}
@@ -387,79 +572,52 @@ class ConcreteSection(Section):
         of the homogenized section. All homogenized area of steel reinforcement (passive and active)
         is taken into account whatever the param y. that is because this function is used in cracked section
         checks"""
-
-        hmg = dict()
         # only brute area properties A,Q,I and derived results  is affected by the param y
-        hmgA = self.A_y(y)
-        hmgAc1 = self.As1 * (self.ns - 1)
-        hmgAc2 = self.As2 * (self.ns - 1)
-        hmgAcp = self.Ap * (self.np - 1)
-        hmgArea = hmgA + hmgAc1 + hmgAc2 + hmgAcp
-
-        # brute section's static moment
-        hmgQA = self.Q_y(y)
-        # reinforcement's static moment
-        hmgQc1 = hmgAc1 * self.ds1
-        hmgQc2 = hmgAc2 * self.ds2
-        hmgQcp = hmgAcp * self.dp
-        hmgQ = hmgQA + hmgQc1 + hmgQc2 + hmgQcp
-
-        hmgIA = self.I_y(y)
-        hmgIc1 = hmgQc1 * self.ds1
-        hmgIc2 = hmgQc2 * self.ds2
-        hmgIcp = hmgQcp * self.dp
-        hmgI = hmgIA + hmgIc1 + hmgIc2 + hmgIcp
-
-        # homogenized section's centroid
-        hmg_y_cen = hmgQ / hmgA
-        # homogenized active reinforcement eccentricity
-        hmg_ecc = self.dp - hmg_y_cen
-        # homogenized section's inertia from centroid
-        hmgI0 = hmgI - hmgA * pow(hmg_y_cen, 2)
-        # homogenized section's elastic modulus
-        hmg_W01 = hmgI0 / hmg_y_cen
-        hmg_W02 = hmgI0 / (self.h - hmg_y_cen)
-
-        hmg['A'] = hmgArea
-        hmg['Q'] = hmgQ
-        hmg['I'] = hmgI
-        hmg['Ixo'] = hmgI0
-        hmg['y_cen'] = hmg_y_cen
-        hmg['ecc'] = hmg_ecc
-        hmg['Wxo1'] = hmg_W01
-        hmg['Wxo2'] = hmg_W02
-
-        return hmg
+        return self.__hmg(self.A_y(y), self.Q_y(y), self.I_y(y), self.concrete.E_cm)
 
     def hmgSection_t(self) -> dict:
         """dictionary {area, first moment of inertia, second moment of inertia}
         from the top fibre  of the homogenized section"""
-
+        return self.__hmg(self.Ac, self.Q_xtop, self.I_xtop, self.concrete.E_cmt)
+
+    def __hmg(self, hmgA, hmgQA, hmgIA, E_c) -> dict:
+        """homogenized section of the brute area hmgA, static moment hmgQA and inertia hmgIA from the top fibre.
+        Every bonded reinforcement row adds A * (E / E_c - 1): the sums are taken over the rows at once"""
+        if not self.layers:
+            return self.__hmg_bars(hmgA, hmgQA, hmgIA, E_c)
+        r = self.rebar
+        E = _rows(r['E'], E_c.ndim) if isinstance(E_c, np.ndarray) else r['E']
+        hmgAc = r['A_bonded'] * (E / E_c - 1)
+        shape = np.broadcast(hmgA, hmgQA, hmgIA, hmgAc[0]).shape
+        d = r['d']
+        if hmgAc.ndim <= len(shape):  # fibres y or concrete samples beyond the section variants
+            hmgAc = _rows(hmgAc, len(shape))
+        if d.ndim <= len(shape):
+            d = _rows(d, len(shape))
+        # brute term first, so the rows are added in the order of the reinforcement
+        terms = np.empty((3, 1 + len(hmgAc)) + shape)
+        terms[0, 0], terms[1, 0], terms[2, 0] = hmgA, hmgQA, hmgIA
+        terms[0, 1:] = hmgAc
+        np.multiply(hmgAc, d, out=terms[1, 1:])
+        np.multiply(terms[1, 1:], d, out=terms[2, 1:])
+        sums = terms.sum(axis=1)
+        return self.__hmg_dict(hmgA, sums[0], sums[1], sums[2])
+
+    def __hmg_bars(self, hmgA, hmgQA, hmgIA, E_c) -> dict:
+        """__hmg() of the three bars As1, As2 and Ap alone, without building the reinforcement rows"""
+        n_s = self.passive_steel.Es / E_c - 1
+        n_p = self.prestress_steel.Ep / E_c - 1
+        hmgAc1, hmgAc2, hmgAcp = self.As1 * n_s, self.As2 * n_s, self.Ap * n_p
+        hmgQc1, hmgQc2, hmgQcp = hmgAc1 * self.ds1, hmgAc2 * self.ds2, hmgAcp * self.dp
+        return self.__hmg_dict(hmgA, hmgA + hmgAc1 + hmgAc2 + hmgAcp, hmgQA + hmgQc1 + hmgQc2 + hmgQcp,
+                               hmgIA + hmgQc1 * self.ds1 + hmgQc2 * self.ds2 + hmgQcp * self.dp)
+
+    def __hmg_dict(self, hmgA, hmgArea, hmgQ, hmgI) -> dict:
         hmg = dict()
-        hmgA = self.Ac
-        hmgAc1 = self.As1 * (self.n_st - 1)
-        hmgAc2 = self.As2 * (self.n_st - 1)
-        hmgAcp = self.Ap * (self.n_pt - 1)
-        hmgArea = hmgA + hmgAc1 + hmgAc2 + hmgAcp
-
-        # brure section static moment
-        hmgQA = self.Q_xtop
-        # reinforcement static moment
-        hmgQc1 = hmgAc1 * self.ds1
-        hmgQc2 = hmgAc2 * self.ds2
-        hmgQcp = hmgAcp * self.dp
-        hmgQ = hmgQA + hmgQc1 + hmgQc2 + hmgQcp
-
-        hmgIA = self.I_xtop
-        hmgIc1 = hmgQc1 * self.ds1
-        hmgIc2 = hmgQc2 * self.ds2
-        hmgIcp = hmgQcp * self.dp
-        hmgI = hmgIA + hmgIc1 + hmgIc2 + hmgIcp
-
         # homogenized section's centroid
         hmg_y_cen = hmgQ / hmgA
         # homogenized active reinforcement eccentricity
-        hmg_ecc = self.dp - hmg_y_cen
+        hmg_ecc = self.tendons()[1] - hmg_y_cen
         # homogenized section's inertia from centroid
         hmgI0 = hmgI - hmgA * pow(hmg_y_cen, 2)
         # homogenized section's elastic modulus
@@ -487,20 +645,42 @@ class ConcreteSection(Section):
         # security coefficients must already been taken into account
         # loads introduced must be the total loads applied to the section (sum all your moments and normal forces)
         # moments must be calculated from the top fibre
+        return bool(np.all(self.magnel_check(N, Mi, Mf)))
+
+    def magnel_margins(self, N, Mi, Mf, N_f=None) -> np.ndarray:
+        """signed distance from the top and bottom fibre stresses to the magnel stress limits. N, Mi and Mf
+        can be scalars or arrays of any broadcastable shape, the result has shape (8, *shape). Rows are the
+        compression and tension margins of the initial top, initial bottom, final top and final bottom
+        fibres. A margin is positive when the limit is met
+        :param N: normal force at the instant of prestress
+        :param Mi: mm*N initial whole moment (external + prestress moments from top fibre)
+        :param Mf: mm*N complete moment under service loads
+        :param N_f: normal force under service loads (prestress losses already subtracted). N by default
+        """
+        if N_f is None:
+            N_f = N
         # initial load case stress
         init_top_stress = self.stress_t(N, Mi, 0)
         init_bottom_stress = self.stress_t(N, Mi, self.h)
 
         # final load case stress
-        final_top_stress = self.stress(N, Mf, 0)
-        final_bottom_stress = self.stress(N, Mf, self.h)
-
-        init_top_check = (-0.45 * self.concrete.f_ckt) < init_top_stress < self.concrete.f_ctmt
-        init_bottom_check = (-0.45 * self.concrete.f_ckt) < init_bottom_stress < self.concrete.f_ctmt
-        final_top_check = (-0.45 * self.concrete.fck) < final_top_stress < self.concrete.f_ctm
-        final_bottom_check = (-0.45 * self.concrete.fck) < final_bottom_stress < self.concrete.f_ctm
-
-        return init_top_check and init_bottom_check and final_top_check and final_bottom_check
+        final_top_stress = self.stress(N_f, Mf, 0)
+        final_bottom_stress = self.stress(N_f, Mf, self.h)
+
+        init_comp = -0.45 * self.concrete.f_ckt
+        final_comp = -0.45 * self.concrete.fck
+        margins = np.broadcast_arrays(
+            init_top_stress - init_comp, self.concrete.f_ctmt - init_top_stress,
+            init_bottom_stress - init_comp, self.concrete.f_ctmt - init_bottom_stress,
+            final_top_stress - final_comp, self.concrete.f_ctm - final_top_stress,
+            final_bottom_stress - final_comp, self.concrete.f_ctm - final_bottom_stress)
+
+        return np.stack(margins)
+
+    def magnel_check(self, N, Mi, Mf, N_f=None) -> np.ndarray:
+        """vectorized magnel stress limit check. Returns a boolean array with the broadcast shape
+        of N, Mi and Mf. True where every limit is met. See magnel_margins()"""
+        return np.all(self.magnel_margins(N, Mi, Mf, N_f) > 0, axis=0)
 
     # ----------SECTION MODULUS------------
     def Wx01(self) -> float():  # text
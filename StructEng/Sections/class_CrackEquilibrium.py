@@ -0,0 +1,82 @@
+import numpy as np
+from StructEng.Sections.class_ConcreteSection import ConcreteSection
+
+
+class CrackEquilibrium:
+    """moment equilibrium of a ConcreteSection cracked at the bottom as a function of the top fibre strain eps
+    and the depth y of the non-cracked part. The stress at y equals the concrete tensile strength, which fixes
+    the curvature k(eps, y) = (fctm - eps * Ecm) / (y * Ecm). eqM(eps, y) is the moment of the internal stresses
+    from the top fibre plus the external moment M. Its zero contour is the set of strain states in equilibrium
+    with M.
+
+    material and reinforcement constants are hoisted at init, so the surface and its zero contour are pure
+    array expressions of eps and y. Call update() after changing the section
+    """
+
+    def __init__(self, section: ConcreteSection, M: float = 0.0):
+        self.section = section
+        self.M = M
+        self.update()
+
+    def update(self) -> None:
+        """read the section constants again"""
+        sect = self.section
+        self.E_cm = sect.concrete.E_cm
+        self.f_ctm = sect.concrete.f_ctm
+        rebar = sect.rebar
+        # axial stiffness times lever arm of every bonded reinforcement row (As1, As2, Ap and the layers)
+        self.EAd = rebar['E'] * rebar['A_bonded'] * rebar['d']
+        self.d = rebar['d']
+        # sum(E*A*d) and sum(E*A*d^2) over the rows: the steel moment is eps * EAd_sum + k * EAd2_sum
+        self.EAd_sum = self.EAd.sum(axis=0)
+        self.EAd2_sum = (self.EAd * self.d).sum(axis=0)
+
+    def k(self, eps, y):
+        """curvature that makes the stress at depth y equal to the concrete tensile strength"""
+        return (self.f_ctm - eps * self.E_cm) / (y * self.E_cm)
+
+    def eqM(self, eps, y):
+        """moment equilibrium residual. Concrete of the non-cracked part plus every reinforcement layer plus M
+        :param eps: top fibre strain
+        :param y: depth of the non-cracked part
+        """
+        k = self.k(eps, y)
+        concrete = self.E_cm * (eps * self.section.Q_y(y) + k * self.section.I_y(y))
+        steel = eps * self.EAd_sum + k * self.EAd2_sum
+        return concrete + steel + self.M
+
+    def surface(self, eps_lim: tuple = (-0.02, 0), y_lim: tuple = None, n: int = 100) -> tuple:
+        """(EPS, Y, Z) meshgrid of eqM
+        :param eps_lim: top fibre strain range
+        :param y_lim: non-cracked depth range. (0.2 * h, h) by default
+        :param n: number of points along each axis
+        """
+        if y_lim is None:
+            y_lim = (0.2 * self.section.h, self.section.h)
+        EPS, Y = np.meshgrid(np.linspace(*eps_lim, n), np.linspace(*y_lim, n))
+        return EPS, Y, self.eqM(EPS, Y)
+
+    def zero_contour(self, EPS, Y, Z=None, iterations: int = 50) -> tuple:
+        """(eps, y) points of the eqM = 0 curve. Every sign change of Z along y brackets a root that is refined
+        by bisection, all brackets at once
+        :param EPS: meshgrid of strains returned by surface(). Strains along the columns
+        :param Y: meshgrid of depths. Depths along the rows
+        :param Z: eqM over the meshgrid. Computed when not given
+        :param iterations: bisection steps
+        """
+        if Z is None:
+            Z = self.eqM(EPS, Y)
+        row, col = np.nonzero(np.sign(Z[:-1]) != np.sign(Z[1:]))
+        eps = EPS[row, col]
+        lo, hi = Y[row, col], Y[row + 1, col]
+        f_lo = Z[row, col]
+        for _ in range(iterations):
+            mid = (lo + hi) / 2
+            f_mid = self.eqM(eps, mid)
+            left = np.sign(f_mid) == np.sign(f_lo)
+            lo = np.where(left, mid, lo)
+            f_lo = np.where(left, f_mid, f_lo)
+            hi = np.where(left, hi, mid)
+
+        order = np.argsort(eps, kind='stable')
+        return eps[order], ((lo + hi) / 2)[order]
@@ -0,0 +1,99 @@
+import numpy as np
+from StructEng.Sections.class_ConcreteSection import ConcreteSection
+
+
+class CrackWidth:
+    """crack spacing and crack width of a ConcreteSection cracked at the bottom fibre according to spanish
+    structural code (EN 1992-1-1 7.3.4). N and M can be scalars or arrays of any broadcastable shape (load
+    cases, stations...). Every method returns arrays with that shape. The cracked section solution (y0_cr,
+    eps_cr) gives the neutral axis depth and the stress in As2
+
+    w_k = s_r_max * (eps_sm - eps_cm)
+    s_r_max = k3 * c + k1 * k2 * k4 * phi / rho_p_eff
+    eps_sm - eps_cm = max((sigma_s - kt * fctm / rho_p_eff * (1 + ns * rho_p_eff)) / Es, 0.6 * sigma_s / Es)
+    """
+    kwDefaults = {
+        'phi': 16,  # As2 bar diameter (mm)
+        'c': 35,  # As2 concrete cover (mm)
+        'spacing': None,  # As2 bar spacing (mm). Only needed to check the 5 * (c + phi / 2) limit
+        'k1': 0.8,  # bond coefficient. 0.8 high bond bars, 1.6 plain bars
+        'k2': 0.5,  # strain distribution coefficient. 0.5 bending, 1.0 pure tension
+        'k3': 3.4,
+        'k4': 0.425,
+        'kt': 0.4,  # load duration coefficient. 0.6 short term, 0.4 long term
+        'xi1': 0.5,  # bond ratio of the prestress tendons to the bars. Tendons count as xi1^2 * Ap
+    }
+
+    def __init__(self, section: ConcreteSection, **kwargs):
+        if section.layers:
+            raise ValueError('CrackWidth only takes As2 and Ap. Sections with reinforcement layers are not supported')
+        self.section = section
+        self.phi = kwargs.get('phi', self.kwDefaults['phi'])
+        self.c = kwargs.get('c', self.kwDefaults['c'])
+        self.spacing = kwargs.get('spacing', self.kwDefaults['spacing'])
+        self.k1 = kwargs.get('k1', self.kwDefaults['k1'])
+        self.k2 = kwargs.get('k2', self.kwDefaults['k2'])
+        self.k3 = kwargs.get('k3', self.kwDefaults['k3'])
+        self.k4 = kwargs.get('k4', self.kwDefaults['k4'])
+        self.kt = kwargs.get('kt', self.kwDefaults['kt'])
+        self.xi1 = kwargs.get('xi1', self.kwDefaults['xi1'])
+
+    def cracked_state(self, N, M) -> dict:
+        """cracked section solution shared by every crack width method
+        :param N: normal force
+        :param M: whole moment applied to the section
+        """
+        sect = self.section
+        N, M = np.broadcast_arrays(np.asarray(N, dtype=float), np.asarray(M, dtype=float))
+        cracked = np.asarray(sect.is_cracked(N, M) & (sect.As2 > 0))
+        # neutral axis solved only where the section cracks
+        x = np.full(N.shape, np.nan)
+        x[cracked] = sect.y0_cr(N[cracked], M[cracked])
+        cracked = cracked & ~np.isnan(x)
+        x = np.where(cracked, x, sect.h / 2)  # any valid depth, discarded where not cracked
+
+        sigma_s = sect.passive_steel.Es * sect.eps_cr(N, M, x, sect.ds2)
+        h_cef = np.minimum(np.minimum(2.5 * (sect.h - sect.ds2), (sect.h - x) / 3), sect.h / 2)
+        A_cef = sect.A_y(sect.h) - sect.A_y(sect.h - h_cef)
+        # tendons inside the effective tension area
+        Ap_eff = np.where(sect.h - sect.dp < h_cef, pow(self.xi1, 2) * sect.Ap, 0)
+        rho = (sect.As2 + Ap_eff) / A_cef
+
+        return {'cracked': cracked, 'x': x, 'sigma_s': sigma_s, 'h_cef': h_cef, 'A_cef': A_cef, 'rho': rho}
+
+    def crack_spacing(self, N, M, state: dict = None) -> np.ndarray:
+        """maximum crack spacing s_r_max (mm). nan where the section is not cracked"""
+        state = state if state is not None else self.cracked_state(N, M)
+        s_r = self.k3 * self.c + self.k1 * self.k2 * self.k4 * self.phi / state['rho']
+        if self.spacing is not None and self.spacing > 5 * (self.c + self.phi / 2):
+            s_r = 1.3 * (self.section.h - state['x'])
+        return np.where(state['cracked'], s_r, np.nan)
+
+    def strain_difference(self, N, M, state: dict = None) -> np.ndarray:
+        """mean steel strain minus mean concrete strain between cracks. 0 where the section is not cracked"""
+        state = state if state is not None else self.cracked_state(N, M)
+        sect = self.section
+        Es = sect.passive_steel.Es
+        sigma_s, rho = state['sigma_s'], state['rho']
+        eps = (sigma_s - self.kt * sect.concrete.f_ctm / rho * (1 + sect.ns * rho)) / Es
+        eps = np.maximum(eps, 0.6 * sigma_s / Es)
+        return np.where(state['cracked'], eps, 0)
+
+    def crack_width(self, N, M) -> np.ndarray:
+        """characteristic crack width w_k (mm). 0 where the section is not cracked
+        :param N: normal force
+        :param M: whole moment applied to the section
+        """
+        state = self.cracked_state(N, M)
+        s_r = self.crack_spacing(N, M, state)
+        return np.where(state['cracked'], np.nan_to_num(s_r) * self.strain_difference(N, M, state), 0)
+
+    def check(self, N, M, w_max: float = 0.2) -> np.ndarray:
+        """True where the crack width does not exceed w_max (mm)"""
+        return self.crack_width(N, M) <= w_max
+
+
+if __name__ == '__main__':
+    from StructEng.Sections.class_RectConcSect import RectConcSect
+    sect = RectConcSect(b=300, h=800, As2=1800, ds2=740)
+    print(CrackWidth(sect, phi=20, c=40).crack_width(0, np.linspace(100E6, 500E6, 5)))
@@ -0,0 +1,279 @@
+import numpy as np
+
+
+class Dual:
+    """number or array carrying its derivatives with respect to a set of variables (forward mode automatic
+    differentiation). Arithmetic, pow() and the numpy functions used by the sections propagate value and
+    derivatives together, so any result of a section built from Dual attributes comes with its gradient
+    in the same pass. Derivatives are stored along a last extra axis, one entry per variable
+
+    value: the plain result
+    grad: {variable: derivative of value}, arrays of the shape of value
+    """
+    __array_priority__ = 100
+
+    def __init__(self, value, d, names: tuple):
+        self.value = np.asarray(value, dtype=float)
+        self.d = np.asarray(d, dtype=float)  # shape broadcastable to value.shape + (len(names),)
+        self.names = names
+
+    @classmethod
+    def variables(cls, **values) -> dict:
+        """name: Dual seeded with unit derivative along its own name. Values can be scalars or arrays"""
+        names = tuple(values)
+        seeded = {}
+        for i, (name, value) in enumerate(values.items()):
+            value = np.asarray(value, dtype=float)
+            d = np.zeros(value.shape + (len(names),))
+            d[..., i] = 1
+            seeded[name] = cls(value, d, names)
+        return seeded
+
+    @property
+    def grad(self) -> dict:
+        d = self.full_d()
+        return {name: d[..., i] for i, name in enumerate(self.names)}
+
+    def full_d(self) -> np.ndarray:
+        return np.broadcast_to(self.d, self.value.shape + (len(self.names),))
+
+    def __repr__(self):
+        return f'Dual({self.value!r}, grad={self.grad!r})'
+
+    # ---------------ARRAY INTERFACE------------------------
+    @property
+    def shape(self) -> tuple:
+        return self.value.shape
+
+    @property
+    def ndim(self) -> int:
+        return self.value.ndim
+
+    def __len__(self):
+        return len(self.value)
+
+    def __getitem__(self, index):
+        return Dual(self.value[index], self.full_d()[index], self.names)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def min(self, axis=None):
+        return self.__select(np.argmin, axis)
+
+    def max(self, axis=None):
+        return self.__select(np.argmax, axis)
+
+    def __select(self, arg, axis):
+        if axis is None:
+            flat = Dual(self.value.ravel(), self.full_d().reshape(-1, len(self.names)), self.names)
+            return flat[arg(flat.value)]
+        i = np.expand_dims(arg(self.value, axis=axis), axis)
+        value = np.take_along_axis(self.value, i, axis).squeeze(axis)
+        axis = axis % self.ndim
+        d = np.take_along_axis(self.full_d(), i[..., None], axis).squeeze(axis)
+        return Dual(value, d, self.names)
+
+    # ---------------NUMPY DISPATCH------------------------
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs:
+            return NotImplemented
+        values = [x.value if isinstance(x, Dual) else np.asarray(x) for x in inputs]
+        if ufunc in _value_only:
+            return ufunc(*values)
+        if ufunc not in _rules:
+            return NotImplemented
+        names = next(x.names for x in inputs if isinstance(x, Dual))
+        ds = [x.d if isinstance(x, Dual) else None for x in inputs]
+        value = ufunc(*values)
+        return Dual(value, _rules[ufunc](value, *values, *ds), names)
+
+    def __array_function__(self, func, types, args, kwargs):
+        if func not in _functions:
+            return NotImplemented
+        return _functions[func](*args, **kwargs)
+
+    # ---------------OPERATORS------------------------
+    # sums and products with Duals and numbers skip the ufunc dispatch, they are most of the operations
+
+    def __add__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value + other.value, self.d + other.d, self.names)
+        if isinstance(other, (int, float)):
+            return Dual(self.value + other, self.d, self.names)
+        return np.add(self, other)
+
+    def __radd__(self, other):
+        if isinstance(other, (int, float)):
+            return Dual(other + self.value, self.d, self.names)
+        return np.add(other, self)
+
+    def __sub__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value - other.value, self.d - other.d, self.names)
+        if isinstance(other, (int, float)):
+            return Dual(self.value - other, self.d, self.names)
+        return np.subtract(self, other)
+
+    def __rsub__(self, other):
+        if isinstance(other, (int, float)):
+            return Dual(other - self.value, -self.d, self.names)
+        return np.subtract(other, self)
+
+    def __mul__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.value * other.value, self.d * other.value[..., None] + other.d * self.value[..., None],
+                        self.names)
+        if isinstance(other, (int, float)):
+            return Dual(self.value * other, self.d * other, self.names)
+        return np.multiply(self, other)
+
+    def __rmul__(self, other):
+        if isinstance(other, (int, float)):
+            return Dual(other * self.value, other * self.d, self.names)
+        return np.multiply(other, self)
+
+    def __truediv__(self, other):
+        if isinstance(other, Dual):
+            value = self.value / other.value
+            return Dual(value, (self.d - other.d * value[..., None]) / other.value[..., None], self.names)
+        if isinstance(other, (int, float)):
+            return Dual(self.value / other, self.d / other, self.names)
+        return np.true_divide(self, other)
+
+    def __rtruediv__(self, other):
+        if isinstance(other, (int, float)):
+            value = other / self.value
+            return Dual(value, self.d * (-value / self.value)[..., None], self.names)
+        return np.true_divide(other, self)
+
+    def __pow__(self, other):
+        return np.power(self, other)
+
+    def __rpow__(self, other):
+        return np.power(other, self)
+
+    def __neg__(self):
+        return np.negative(self)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return np.absolute(self)
+
+    def __lt__(self, other):
+        return np.less(self, other)
+
+    def __le__(self, other):
+        return np.less_equal(self, other)
+
+    def __gt__(self, other):
+        return np.greater(self, other)
+
+    def __ge__(self, other):
+        return np.greater_equal(self, other)
+
+
+def _e(x):
+    """x with a trailing axis to scale derivatives"""
+    return np.asarray(x)[..., None]
+
+
+def _sum(*terms):
+    """sum of the derivative terms that are not None. At least one is not"""
+    terms = [t for t in terms if t is not None]
+    total = terms[0]
+    for t in terms[1:]:
+        total = total + t
+    return total
+
+
+def _scale(d, factor):
+    return None if d is None else d * _e(factor)
+
+
+def _power(v, a, b, da, db):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _sum(_scale(da, b * np.power(a, b - 1.0)), None if db is None else _scale(db, v * np.log(a)))
+
+
+def _extreme(v, a, b, da, db):
+    """maximum and minimum take the derivatives of the selected argument"""
+    return np.where(_e(v == a), 0.0 if da is None else da, 0.0 if db is None else db)
+
+
+_rules = {
+    np.add: lambda v, a, b, da, db: _sum(da, db),
+    np.subtract: lambda v, a, b, da, db: _sum(da, None if db is None else -db),
+    np.multiply: lambda v, a, b, da, db: _sum(_scale(da, b), _scale(db, a)),
+    np.true_divide: lambda v, a, b, da, db: _sum(_scale(da, 1 / b), _scale(db, -v / b)),
+    np.power: _power,
+    np.maximum: _extreme,
+    np.minimum: _extreme,
+    np.negative: lambda v, a, da: -da,
+    np.positive: lambda v, a, da: da,
+    np.absolute: lambda v, a, da: _scale(da, np.sign(a)),
+    np.sqrt: lambda v, a, da: _scale(da, 0.5 / v),
+    np.square: lambda v, a, da: _scale(da, 2 * a),
+    np.log: lambda v, a, da: _scale(da, 1 / a),
+    np.exp: lambda v, a, da: _scale(da, v),
+}
+
+_value_only = {np.less, np.less_equal, np.greater, np.greater_equal, np.equal, np.not_equal, np.sign,
+               np.isnan, np.isfinite}
+
+
+def _parts(x, shape, names):
+    """value and derivatives of a Dual or a constant, broadcast to shape"""
+    if isinstance(x, Dual):
+        return np.broadcast_to(x.value, shape), np.broadcast_to(x.d, shape + (len(names),))
+    return np.broadcast_to(x, shape), np.zeros(shape + (len(names),))
+
+
+def _names(*args):
+    return next(x.names for x in args if isinstance(x, Dual))
+
+
+def _broadcast_arrays(*args):
+    shape = np.broadcast_shapes(*(np.shape(x.value if isinstance(x, Dual) else x) for x in args))
+    return [Dual(*_parts(x, shape, x.names), x.names) if isinstance(x, Dual) else np.broadcast_to(x, shape)
+            for x in args]
+
+
+def _stack(arrays, axis=0):
+    arrays = list(arrays)
+    names = _names(*arrays)
+    shape = np.broadcast_shapes(*(np.shape(x.value if isinstance(x, Dual) else x) for x in arrays))
+    value = np.empty((len(arrays),) + shape)
+    d = np.zeros((len(arrays),) + shape + (len(names),))
+    for i, x in enumerate(arrays):  # assignments broadcast
+        if isinstance(x, Dual):
+            value[i], d[i] = x.value, x.d
+        else:
+            value[i] = x
+    axis = axis % (len(shape) + 1)
+    return Dual(np.moveaxis(value, 0, axis), np.moveaxis(d, 0, axis), names)
+
+
+def _where(condition, x, y):
+    names = _names(x, y)
+    condition = condition.value if isinstance(condition, Dual) else np.asarray(condition)
+    shape = np.broadcast_shapes(np.shape(condition), np.shape(x.value if isinstance(x, Dual) else x),
+                                np.shape(y.value if isinstance(y, Dual) else y))
+    (xv, xd), (yv, yd) = _parts(x, shape, names), _parts(y, shape, names)
+    return Dual(np.where(condition, xv, yv), np.where(_e(condition), xd, yd), names)
+
+
+def _values(func):
+    return lambda a, *args, **kwargs: func(a.value if isinstance(a, Dual) else a, *args, **kwargs)
+
+
+_functions = {
+    np.broadcast_arrays: _broadcast_arrays,
+    np.stack: _stack,
+    np.where: _where,
+    np.all: _values(np.all),
+    np.any: _values(np.any),
+    np.shape: _values(np.shape),
+}
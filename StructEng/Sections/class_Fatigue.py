@@ -0,0 +1,196 @@
+import numpy as np
+from StructEng.Sections.class_ConcreteSection import ConcreteSection, _rows
+
+
+class Rainflow:
+    """streaming rainflow counter (four point method). push() takes a history in pieces of any size and
+    returns the ranges of the cycles they close. Only the residue, the reversals not closed yet, is kept
+    between pieces, so memory depends on the piece size and not on the history length. The residue counts as
+    half cycles at the end of the history (half_cycles())
+
+    four point rule: reversals a, b, c, d close the cycle b-c when |c - b| <= |b - a| and |c - b| <= |d - c|.
+    Every pass removes all the cycles that satisfy it at once. They never share reversals except on ties,
+    and removing one does not break the rule for the others, so the result is that of the sequential
+    algorithm
+    """
+
+    def __init__(self):
+        self.residue = np.empty(0)  # reversals not closed. The last one is the latest value, maybe not a reversal
+
+    @staticmethod
+    def reversals(x: np.ndarray) -> np.ndarray:
+        """first and last values of x and its peaks and valleys. Plateaus count once"""
+        x = np.asarray(x, dtype=float).ravel()
+        if x.size < 3:
+            return x
+        x = x[np.r_[True, np.diff(x) != 0]]
+        slope = np.sign(np.diff(x))
+        return x[np.r_[True, slope[1:] != slope[:-1], True]]
+
+    def push(self, x) -> np.ndarray:
+        """ranges of the full cycles closed by the next piece x of the history"""
+        s = self.reversals(np.concatenate((self.residue, np.asarray(x, dtype=float).ravel())))
+        closed = []
+        while s.size >= 4:
+            r = np.abs(np.diff(s))
+            inner = np.zeros(r.size, dtype=bool)
+            inner[1:-1] = (r[1:-1] <= r[:-2]) & (r[1:-1] <= r[2:])
+            inner[1:] &= ~inner[:-1]  # equal neighbouring ranges share a reversal. The other goes next pass
+            if not inner.any():
+                break
+            closed.append(r[inner])
+            keep = np.ones(s.size, dtype=bool)
+            i = np.flatnonzero(inner)
+            keep[i] = keep[i + 1] = False
+            s = s[keep]
+        self.residue = s
+        return np.concatenate(closed) if closed else np.empty(0)
+
+    def half_cycles(self) -> np.ndarray:
+        """ranges of the half cycles left in the residue"""
+        return np.abs(np.diff(self.residue))
+
+    @classmethod
+    def count(cls, x) -> tuple:
+        """(ranges, counts) of a whole history. Full cycles count 1, the residue 0.5"""
+        counter = cls()
+        full = counter.push(x)
+        half = counter.half_cycles()
+        return np.concatenate((full, half)), np.r_[np.ones(full.size), np.full(half.size, 0.5)]
+
+
+class SNCurve:
+    """S-N curve of a reinforcing or prestressing steel (EN 1992-1-1 6.8.4). Number of cycles to failure
+    N = N_star * (dsigma_Rsk / gamma_s_fat / (gamma_F_fat * dsigma)) ** k, k = k1 above the knee and k2 below
+    """
+    kwDefaults = {
+        'N_star': 1E6,
+        'k1': 5,
+        'k2': 9,
+        'dsigma_Rsk': 162.5,  # MPa. Straight and bent bars
+        'gamma_s_fat': 1.15,
+        'gamma_F_fat': 1.0,
+    }
+
+    def __init__(self, **kwargs):
+        self.N_star = kwargs.get('N_star', self.kwDefaults['N_star'])
+        self.k1 = kwargs.get('k1', self.kwDefaults['k1'])
+        self.k2 = kwargs.get('k2', self.kwDefaults['k2'])
+        self.dsigma_Rsk = kwargs.get('dsigma_Rsk', self.kwDefaults['dsigma_Rsk'])
+        self.gamma_s_fat = kwargs.get('gamma_s_fat', self.kwDefaults['gamma_s_fat'])
+        self.gamma_F_fat = kwargs.get('gamma_F_fat', self.kwDefaults['gamma_F_fat'])
+
+    def cycles(self, dsigma) -> np.ndarray:
+        """cycles to failure of the stress ranges dsigma (MPa). inf for null ranges"""
+        ratio = self.dsigma_Rsk / self.gamma_s_fat / (self.gamma_F_fat * np.asarray(dsigma, dtype=float))
+        with np.errstate(divide='ignore', over='ignore'):
+            return self.N_star * np.power(ratio, np.where(ratio <= 1, self.k1, self.k2))
+
+    def damage(self, dsigma, counts=1.0) -> float:
+        """palmgren-miner sum of counts cycles of ranges dsigma"""
+        with np.errstate(divide='ignore'):
+            return float(np.sum(np.asarray(counts) / self.cycles(dsigma)))
+
+
+class Fatigue:
+    """fatigue damage of the passive steel As2 and the bonded tendons Ap of a ConcreteSection under long N, M
+    histories (EN 1992-1-1 6.8). Steel stresses come from the cracked section with the concrete tensile
+    strength neglected (6.8.3) wherever the bottom fibre is in tension, from the uncracked one elsewhere.
+    Histories are processed in chunks: the stresses of a chunk are evaluated at once and fed to streaming
+    rainflow counters, and only the damage sums and the counter residues are kept
+
+    Ap stresses are the changes of the tendon stress with the strain of the concrete at dp. The constant
+    prestress does not change the ranges
+    """
+    kwDefaults = {
+        'sn_s': None,  # SNCurve of As2. Straight bars by default
+        'sn_p': None,  # SNCurve of Ap. Pre-tensioned strands by default
+        'chunk': 1000000,  # history values evaluated at once
+    }
+
+    def __init__(self, section: ConcreteSection, **kwargs):
+        if section.layers:
+            raise ValueError('Fatigue only takes As2 and Ap. Sections with reinforcement layers are not supported')
+        self.section = section
+        sn_s = kwargs.get('sn_s', self.kwDefaults['sn_s'])
+        sn_p = kwargs.get('sn_p', self.kwDefaults['sn_p'])
+        self.sn_s: SNCurve = sn_s if sn_s is not None else SNCurve()
+        self.sn_p: SNCurve = sn_p if sn_p is not None else SNCurve(dsigma_Rsk=185)
+        self.chunk: int = kwargs.get('chunk', self.kwDefaults['chunk'])
+
+    def steel_stresses(self, N, M) -> dict:
+        """{'As2': stress in As2, 'Ap': stress change in Ap} (MPa, tension positive) for every N, M. Cracked
+        sections without a neutral axis within the depth are fully in tension: the bonded steels alone carry N, M
+        :param N: normal force
+        :param M: whole moment applied to the section
+        """
+        sect = self.section
+        N, M = np.broadcast_arrays(np.asarray(N, dtype=float), np.asarray(M, dtype=float))
+        eps = {'As2': np.array(sect.eps(N, M, sect.ds2), dtype=float),
+               'Ap': np.array(sect.eps(N, M, sect.dp), dtype=float)}
+        cracked = np.asarray(sect.stress(N, M, sect.h) > 0)
+        if cracked.any():
+            y0 = sect.y0_cr(N[cracked], M[cracked])
+            found = ~np.isnan(y0)
+            where = tuple(i[found] for i in np.nonzero(cracked))
+            for key, y in (('As2', sect.ds2), ('Ap', sect.dp)):
+                eps[key][where] = sect.eps_cr(N[where], M[where], y0[found], y)
+            tension = tuple(i[~found] for i in np.nonzero(cracked))
+            if tension[0].size:
+                eps_0, k = self.steel_strains(N, M, tension)
+                for key, y in (('As2', sect.ds2), ('Ap', sect.dp)):
+                    eps[key][tension] = eps_0 + k * np.broadcast_to(y, N.shape)[tension]
+        return {'As2': sect.passive_steel.Es * eps['As2'], 'Ap': sect.prestress_steel.Ep * eps['Ap']}
+
+    def steel_strains(self, N, M, where) -> tuple:
+        """(eps_0, k) of the fully cracked section, where only the bonded steels carry N, M. nan with a single
+        steel row, which can not take a moment about itself
+        :param N: normal force, broadcast with the section
+        :param M: whole moment, broadcast with the section
+        :param where: index of the N, M to solve
+        """
+        rebar = self.section.rebar
+        EA = _rows(rebar['E'], rebar['d'].ndim - 1) * rebar['A_bonded']
+        A, Q, I = (np.broadcast_to((EA * rebar['d'] ** p).sum(axis=0), N.shape)[where] for p in range(3))
+        N, M = N[where], M[where]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            D = Q * Q - A * I
+            return (M * Q - I * N) / D, (N * Q - M * A) / D
+
+    def damage_stream(self, histories) -> dict:
+        """{'As2': damage, 'Ap': damage} of one history given in consecutive (N, M) pieces
+        :param histories: iterable of (N, M) pairs of 1d arrays
+        """
+        counters = {'As2': Rainflow(), 'Ap': Rainflow()}
+        curves = {'As2': self.sn_s, 'Ap': self.sn_p}
+        damage = {'As2': 0.0, 'Ap': 0.0}
+        for N, M in histories:
+            for key, sigma in self.steel_stresses(N, M).items():
+                damage[key] += curves[key].damage(counters[key].push(sigma))
+        for key, counter in counters.items():
+            damage[key] += curves[key].damage(counter.half_cycles(), 0.5)
+        return damage
+
+    def damage(self, N, M) -> dict:
+        """{'As2': damage, 'Ap': damage} of the history N, M, evaluated chunk by chunk
+        :param N: normal force. Scalar or 1d array
+        :param M: whole moment. 1d array
+        """
+        N, M = np.broadcast_arrays(np.asarray(N, dtype=float), np.asarray(M, dtype=float))
+        return self.damage_stream((N[i:i + self.chunk], M[i:i + self.chunk]) for i in range(0, M.size, self.chunk))
+
+    def check(self, N, M) -> dict:
+        """{'As2': bool, 'Ap': bool}: True where the damage does not exceed 1"""
+        return {key: d <= 1 for key, d in self.damage(N, M).items()}
+
+
+if __name__ == '__main__':
+    import time
+    from StructEng.Sections.class_RectConcSect import RectConcSect
+    sect = RectConcSect(b=400, h=1000, Ap=1400, As2=1500, dp=850, ds2=950)
+    rng = np.random.default_rng(0)
+    n = 2000000
+    N = -1.8E6
+    M = 350E6 + N * sect.dp + 150E6 * np.abs(rng.standard_normal(n)) * (rng.random(n) < 0.1)
+    start = time.perf_counter()
+    print(Fatigue(sect, chunk=200000).damage(N, M), f'{time.perf_counter() - start:.2f} s')
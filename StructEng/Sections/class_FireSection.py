@@ -0,0 +1,352 @@
+from functools import lru_cache
+import numpy as np
+from StructEng.Sections.class_ConcreteSection import ConcreteSection
+
+"""
+---------UNITS--------------------
+length: mm (m inside the heat solver)
+time: minutes (s inside the heat solver)
+temperature: celsius
+"""
+
+# EN 1992-1-2 strength reduction factors. Concrete table 3.1 (siliceous aggregates), reinforcing steel table
+# 3.2a (hot rolled, class N) and prestressing steel table 3.3 (cold worked, class A)
+_THETA = np.arange(0, 1300, 100, dtype=float)
+_K_C = (1.0, 1.0, 0.95, 0.85, 0.75, 0.60, 0.45, 0.30, 0.15, 0.08, 0.04, 0.01, 0.0)
+_K_S = (1.0, 1.0, 1.0, 1.0, 1.0, 0.78, 0.47, 0.23, 0.11, 0.06, 0.04, 0.02, 0.0)
+_K_P = (1.0, 1.0, 0.87, 0.70, 0.50, 0.30, 0.14, 0.06, 0.04, 0.02, 0.0, 0.0, 0.0)
+
+# EN 1991-1-2 3.1 boundary conditions
+_ALPHA_FIRE = 25.0  # W/m2K
+_ALPHA_AMBIENT = 9.0  # unexposed faces, radiation included
+_EMISSIVITY = 0.7
+_SIGMA = 5.67E-8
+
+
+def iso834(t):
+    """standard fire gas temperature (EN 1991-1-2 3.2.1) at t minutes"""
+    return 20 + 345 * np.log10(8 * np.asarray(t, dtype=float) + 1)
+
+
+class FireSection:
+    """transient temperature field of a ConcreteSection exposed to fire and its bending capacity over time
+    (EN 1992-1-2). The heat equation is solved by finite volumes on a grid of dx cells over the depth (1d:
+    slabs and wide members, per metre of width) or over half the cross section (2d, the axis of symmetry is
+    adiabatic; the section shape comes from b_y()). Thermal properties depend on temperature (3.3), the exposed
+    faces take convection and radiation from the fire and the rest lose heat to the 20 C ambient
+
+    every implicit (backward euler) step starts from a linear prediction and is solved by chord iterations with
+    a factorized jacobian, refactorized only when the iterations slow down: a fire of a few hours needs a
+    handful of factorizations for hundreds of steps. The step history is stored per section type, geometry and
+    settings (solution()), so members sharing a section share it and any times are interpolated from it
+
+    array sections: every member (members, C order) gets its own grid and all of them are solved at once as one
+    block system. temperatures() and grid() return one item per member, the capacities have the section shape
+    after the times axis
+
+    capacity: plastic fibres, one per grid row. Concrete at k_c(T) * fck above the neutral axis, As2 and Ap
+    yielding at k_s(T) * fyk and k_p(T) * fpk at their temperature, As1 neglected. Material safety factors are 1
+    """
+    exposures = ('bottom', 'top', 'sides')
+    kwDefaults = {
+        'dimension': 2,
+        'exposure': ('bottom', 'sides'),
+        'dx': 5,  # grid cell size (mm)
+        'dt': 30,  # time step (s)
+        'moisture': 1.5,  # concrete moisture content (% of weight). Sets the specific heat peak at 115 C
+        'conductivity': 'lower',  # 'lower' or 'upper' limit of EN 1992-1-2 3.3.3
+        'fire': iso834,  # gas temperature (C) as a function of the time (minutes)
+        'z_s': None,  # distance of the governing As2 bar from the axis of symmetry. Corner bar by default
+        'z_p': 0.0,  # distance of the tendon from the axis of symmetry
+        'tol': 0.01,  # temperature change (C) that ends the iterations of a step
+    }
+
+    def __init__(self, section: ConcreteSection, **kwargs):
+        if section.layers:
+            raise ValueError('FireSection only takes As2 and Ap. Sections with reinforcement layers are not supported')
+        self.section = section
+        self.dimension: int = kwargs.get('dimension', self.kwDefaults['dimension'])
+        self.exposure: tuple = tuple(kwargs.get('exposure', self.kwDefaults['exposure']))
+        unknown = set(self.exposure) - set(self.exposures)
+        if unknown or self.dimension not in (1, 2):
+            raise ValueError(f'not a valid fire exposure. dimension 1 or 2, exposure among {", ".join(self.exposures)}')
+        self.dx: float = kwargs.get('dx', self.kwDefaults['dx'])
+        self.dt: float = kwargs.get('dt', self.kwDefaults['dt'])
+        self.moisture: float = kwargs.get('moisture', self.kwDefaults['moisture'])
+        self.conductivity: str = kwargs.get('conductivity', self.kwDefaults['conductivity'])
+        self.fire = kwargs.get('fire', self.kwDefaults['fire'])
+        self.tol: float = kwargs.get('tol', self.kwDefaults['tol'])
+        geometry = section.geometry()
+        self.shape: tuple = np.broadcast(*geometry.values()).shape
+        if self.shape:
+            z = {k: np.broadcast_to(kwargs.get(k, self.kwDefaults[k]), self.shape) for k in ('z_s', 'z_p')}
+            self.members = [FireSection(type(section)(concrete=section.concrete, steel_s=section.passive_steel,
+                                                      steel_p=section.prestress_steel,
+                                                      **{k: np.broadcast_to(v, self.shape)[i]
+                                                         for k, v in geometry.items()}),
+                                        **{**kwargs, 'z_s': z['z_s'][i], 'z_p': z['z_p'][i]})
+                            for i in np.ndindex(self.shape)]
+            self.z_s = np.reshape([m.z_s for m in self.members], self.shape)
+            self.z_p = np.reshape([m.z_p for m in self.members], self.shape)
+            return
+        self.members = [self]
+        z_s = kwargs.get('z_s', self.kwDefaults['z_s'])
+        self.z_s: float = z_s if z_s is not None else \
+            float(section.b_y(section.ds2)) / 2 - (section.h - section.ds2)
+        self.z_p: float = kwargs.get('z_p', self.kwDefaults['z_p'])
+
+    # ---------------TEMPERATURES------------------------
+    def grid(self):
+        """cell centres y (ny,) and z (nz,) in mm and inside, the (ny, nz) mask of the cells in the section.
+        In 1d there is one column of 1000 mm. A list of them for array sections"""
+        grids = [_grid(*m.__grid_key()) for m in self.members]
+        return grids if self.shape else grids[0]
+
+    def solution(self) -> '_HeatSolution':
+        """step history of the heat equation of the section (of all its members), shared by every FireSection
+        with the same geometry and settings. It grows as later times are asked for"""
+        return _solution(tuple(m.__grid_key() for m in self.members), float(self.dt), float(self.moisture),
+                         self.conductivity, self.fire, float(self.tol))
+
+    def temperatures(self, times):
+        """temperature fields (C) at times (minutes), shape (len(times), ny, nz). nan outside the section. A list
+        of them for array sections"""
+        solution = self.solution()
+        values = solution.at(times)
+        fields = []
+        for grid, start, end in zip(solution.grids, solution.offsets[:-1], solution.offsets[1:]):
+            field = np.full((len(values),) + grid['inside'].shape, np.nan)
+            field[:, grid['inside']] = values[:, start:end]
+            fields.append(field)
+        return fields if self.shape else fields[0]
+
+    def temperature_at(self, fields: np.ndarray, y: float, z: float = 0.0) -> np.ndarray:
+        """temperature at the point (y, z) of every field, bilinear between cell centres. Fields of a scalar
+        section (members[i] for array sections)"""
+        grid = self.grid()
+        weights = [_linear(grid['y'], y), _linear(grid['z'], z) if self.dimension == 2 else ((0, 1.0), (0, 0.0))]
+        return sum(wy * wz * fields[:, iy, iz] for iy, wy in weights[0] for iz, wz in weights[1] if wy * wz)
+
+    def __grid_key(self) -> tuple:
+        sect = self.section
+        widths = tuple(float(b) for b in np.broadcast_to(sect.b_y(self.__rows(sect.h)), (self.__ny(),)))
+        return float(sect.h), widths, self.dimension, float(self.dx), tuple(sorted(self.exposure))
+
+    def __ny(self) -> int:
+        return max(int(np.ceil(self.section.h / self.dx)), 3)
+
+    def __rows(self, h: float) -> np.ndarray:
+        return (np.arange(self.__ny()) + 0.5) * h / self.__ny()
+
+    # ---------------CAPACITY------------------------
+    def moment_capacity(self, times) -> np.ndarray:
+        """ultimate sagging moment (N*mm) at times (minutes), shape (len(times),) + section shape"""
+        fields = self.temperatures(times)
+        if not self.shape:
+            return self.__capacity(fields)
+        return np.stack([m.__capacity(f) for m, f in zip(self.members, fields)], axis=-1).reshape(
+            (len(fields[0]),) + self.shape)
+
+    def __capacity(self, fields: np.ndarray) -> np.ndarray:
+        sect = self.section
+        grid = self.grid()
+        y = grid['y']
+        dy = y[1] - y[0]
+        dz = 1000.0 if self.dimension == 1 else grid['z'][1] - grid['z'][0]
+        # area of the cells of a row. In 2d the grid covers half the section
+        cell = dy * (sect.b_y(y) / 1000.0 * dz if self.dimension == 1 else 2 * dz)
+
+        k_c = np.interp(np.nan_to_num(fields, nan=0.0), _THETA, _K_C) * grid['inside']
+        rows = sect.concrete.fck * np.asarray(cell)[..., None] * k_c  # (times, ny, nz)
+        rows = rows.sum(axis=2) if self.dimension == 2 else rows[..., 0]
+        Fs = sect.As2 * sect.passive_steel.fyk * np.interp(self.temperature_at(fields, sect.ds2, self.z_s),
+                                                           _THETA, _K_S)
+        Fp = sect.Ap * sect.prestress_steel.fpk * np.interp(self.temperature_at(fields, sect.dp, self.z_p),
+                                                            _THETA, _K_P)
+        tension = Fs + Fp
+
+        # neutral axis: compression of the full rows above it plus part of the next one
+        top = np.cumsum(rows, axis=1) - rows
+        full = np.minimum(np.sum(top <= tension[:, None], axis=1) - 1, len(y) - 1)
+        t = np.arange(len(tension))
+        part = np.clip((tension - top[t, full]) / np.where(rows[t, full] > 0, rows[t, full], np.inf), 0, 1)
+        y_top = y[full] - dy / 2
+        moment = np.where(np.arange(len(y)) < full[:, None], rows * y, 0).sum(axis=1) + \
+            part * rows[t, full] * (y_top + part * dy / 2)
+        return Fs * sect.ds2 + Fp * sect.dp - moment
+
+    def check(self, M_Ed, times) -> np.ndarray:
+        """True where the capacity at times (minutes) is not below the fire design moment M_Ed"""
+        return self.moment_capacity(times) >= M_Ed
+
+    def resistance_time(self, M_Ed, times):
+        """first of times (minutes) when the capacity falls below M_Ed. inf if it never does. An array of the
+        section shape for array sections"""
+        failed = ~self.check(M_Ed, times)
+        first = np.where(failed.any(axis=0), np.asarray(times, dtype=float)[np.argmax(failed, axis=0)], np.inf)
+        return first if self.shape else float(first)
+
+
+def _linear(nodes: np.ndarray, x: float) -> tuple:
+    """(index, weight) pairs of the linear interpolation of x between nodes, constant outside"""
+    i = int(np.clip(np.searchsorted(nodes, x) - 1, 0, len(nodes) - 2)) if len(nodes) > 1 else 0
+    if len(nodes) == 1:
+        return (0, 1.0), (0, 0.0)
+    w = float(np.clip((x - nodes[i]) / (nodes[i + 1] - nodes[i]), 0, 1))
+    return (i, 1 - w), (i + 1, w)
+
+
+@lru_cache(maxsize=64)
+def _grid(h: float, widths: tuple, dimension: int, dx: float, exposure: tuple) -> dict:
+    """cell grid and its finite volume terms: volume, conductance factors of the edges between inside cells
+    and face lengths open to the fire and to the ambient (m)"""
+    ny = len(widths)
+    dy = h / ny
+    y = (np.arange(ny) + 0.5) * dy
+    widths = np.asarray(widths)
+    if dimension == 1:
+        nz, dz = 1, 1000.0
+        inside = np.ones((ny, 1), dtype=bool)
+    else:
+        nz = max(int(np.ceil(widths.max() / 2 / dx)), 2)
+        dz = widths.max() / 2 / nz
+        inside = (np.arange(nz) + 0.5)[None, :] * dz <= widths[:, None] / 2
+    z = (np.arange(nz) + 0.5) * dz
+    index = np.full(inside.shape, -1)
+    index[inside] = np.arange(inside.sum())
+
+    padded = np.pad(inside, 1)  # outside the grid is outside the section
+    open_faces = {'top': (~padded[:-2, 1:-1], dz), 'bottom': (~padded[2:, 1:-1], dz)}
+    if dimension == 2:
+        open_faces['sides'] = (~padded[1:-1, 2:], dy)  # z = 0 is the axis of symmetry
+    fire = np.zeros(inside.shape)
+    ambient = np.zeros(inside.shape)
+    for side, (is_open, length) in open_faces.items():
+        (fire if side in exposure else ambient)[...] += is_open * length / 1000
+
+    edges = [(index[:-1][inside[:-1] & inside[1:]], index[1:][inside[:-1] & inside[1:]], dz / dy)]
+    if dimension == 2:
+        both = inside[:, :-1] & inside[:, 1:]
+        edges.append((index[:, :-1][both], index[:, 1:][both], dy / dz))
+    i, j, g = (np.concatenate(x) for x in zip(*((a, b, np.full(a.size, g)) for a, b, g in edges)))
+    return {'y': y, 'z': z, 'inside': inside, 'volume': np.full(inside.sum(), dy * dz / 1E6),
+            'fire': fire[inside], 'ambient': ambient[inside], 'i': i, 'j': j, 'g': g}
+
+
+@lru_cache(maxsize=8)
+def _heat_table(moisture: float) -> tuple:
+    """(theta, rho * c_p, enthalpy from 0 C) per 1 C, EN 1992-1-2 3.3.2 with the moisture peak at 115 C"""
+    theta = np.arange(0, 1401, dtype=float)
+    c_p = np.interp(theta, (100, 200, 400), (900, 1000, 1100))
+    peak = np.interp(moisture, (0, 1.5, 3), (900, 1470, 2020))
+    c_p = np.where((theta > 100) & (theta <= 200), np.interp(theta, (100, 115, 200), (900, peak, 1000)), c_p)
+    rho = 2300 * np.interp(theta, (115, 200, 400, 1200), (1, 0.98, 0.95, 0.88))
+    rho_c = rho * c_p
+    enthalpy = np.r_[0, np.cumsum((rho_c[1:] + rho_c[:-1]) / 2)]
+    return theta, rho_c, enthalpy
+
+
+def _lambda(theta, limit: str) -> np.ndarray:
+    """thermal conductivity (W/mK), EN 1992-1-2 3.3.3"""
+    x = np.clip(theta, 20, 1200) / 100
+    if limit == 'upper':
+        return 2 - 0.2451 * x + 0.0107 * x * x
+    return 1.36 - 0.136 * x + 0.0057 * x * x
+
+
+class _HeatSolution:
+    """backward euler steps of dt seconds of the heat equation of one or more cell grids, solved as one block
+    system. Steps are added as later times are asked for
+
+    offsets: first cell of every grid in the system, and the number of cells last
+    history: temperatures of every cell after every step, 20 C first
+    factorizations: jacobian factorizations so far
+    """
+
+    def __init__(self, grids: tuple, dt: float, moisture: float, conductivity: str, fire, tol: float):
+        self.grids, self.dt, self.conductivity, self.fire, self.tol = grids, dt, conductivity, fire, tol
+        self.heat = _heat_table(moisture)
+        self.offsets = np.cumsum([0] + [grid['volume'].size for grid in grids])
+        self.V, self.fire_faces, self.ambient_faces, self.g = (np.concatenate([grid[k] for grid in grids])
+                                                               for k in ('volume', 'fire', 'ambient', 'g'))
+        self.i, self.j = (np.concatenate([grid[k] + offset for grid, offset in zip(grids, self.offsets)])
+                          for k in ('i', 'j'))
+        self.history = [np.full(self.offsets[-1], 20.0)]
+        self.factorizations = 0
+        self.lu = None
+
+    def at(self, times) -> np.ndarray:
+        """temperatures of every cell at times (minutes), shape (len(times), cells). Linear between steps"""
+        s = np.atleast_1d(np.asarray(times, dtype=float)) * 60 / self.dt
+        self.advance(int(np.ceil(s.max())))
+        lo = np.floor(s).astype(int)
+        hi = np.minimum(lo + 1, len(self.history) - 1)
+        f = (s - lo)[:, None]
+        return (1 - f) * np.array([self.history[k] for k in lo]) + f * np.array([self.history[k] for k in hi])
+
+    def advance(self, steps: int) -> None:
+        """solve the steps up to steps. ValueError when the iterations of a step do not converge"""
+        theta, rho_c, enthalpy = self.heat
+        history = self.history
+        if self.lu is None:
+            self.lu, self.factorizations = self.factorize(history[0]), 1
+        while len(history) <= steps:
+            k = len(history)
+            T = history[-1]
+            H_old = np.interp(T, theta, enthalpy)
+            gas = self.fire(k * self.dt / 60)
+            T = 2 * T - history[-2] if k > 1 else T  # linear prediction from the last two steps
+            for iteration in range(50):
+                delta = self.lu.solve(self.residual(T, H_old, gas))
+                T = T - delta
+                if np.abs(delta).max() < self.tol:
+                    break
+                if iteration == 5:  # slow chord iterations: jacobian at the current temperatures
+                    self.lu, self.factorizations = self.factorize(T), self.factorizations + 1
+            else:
+                raise ValueError(f'fire step at {k * self.dt / 60:g} min did not converge in 50 iterations '
+                                 f'(last change {np.abs(delta).max():.3g} C). try a smaller dt or a larger tol')
+            history.append(T)
+
+    def residual(self, T: np.ndarray, H_old: np.ndarray, gas: float) -> np.ndarray:
+        theta, rho_c, enthalpy = self.heat
+        i, j, n = self.i, self.j, T.size
+        w = self.g * _lambda((T[i] + T[j]) / 2, self.conductivity) * (T[j] - T[i])
+        flow = np.bincount(i, w, n) - np.bincount(j, w, n)
+        flow += self.fire_faces * (_ALPHA_FIRE * (gas - T) + _EMISSIVITY * _SIGMA * ((gas + 273) ** 4 -
+                                                                                      (T + 273) ** 4))
+        flow += self.ambient_faces * _ALPHA_AMBIENT * (20 - T)
+        return self.V * (np.interp(T, theta, enthalpy) - H_old) / self.dt - flow
+
+    def factorize(self, T: np.ndarray):
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.linalg import splu  # scipy is only imported by fire analyses
+        theta, rho_c, enthalpy = self.heat
+        i, j, n = self.i, self.j, T.size
+        w = self.g * _lambda((T[i] + T[j]) / 2, self.conductivity)
+        diagonal = self.V * np.interp(T, theta, rho_c) / self.dt + self.fire_faces * (
+            _ALPHA_FIRE + 4 * _EMISSIVITY * _SIGMA * (T + 273) ** 3) + self.ambient_faces * _ALPHA_AMBIENT
+        diagonal += np.bincount(i, w, n) + np.bincount(j, w, n)
+        rows = np.r_[np.arange(n), i, j]
+        cols = np.r_[np.arange(n), j, i]
+        A = coo_matrix((np.r_[diagonal, -w, -w], (rows, cols)), shape=(n, n)).tocsc()
+        # symmetric positive definite: symmetric ordering and no pivoting
+        return splu(A, permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0, options={'SymmetricMode': True})
+
+
+@lru_cache(maxsize=64)
+def _solution(grids: tuple, dt: float, moisture: float, conductivity: str, fire, tol: float) -> _HeatSolution:
+    """FireSection.solution() store. grids: _grid() arguments of every member"""
+    return _HeatSolution(tuple(_grid(*key) for key in grids), dt, moisture, conductivity, fire, tol)
+
+
+if __name__ == '__main__':
+    import time
+    from StructEng.Sections.class_RectConcSect import RectConcSect
+    from StructEng.Sections.class_TConcSect import TConcSect
+    for sect in (RectConcSect(b=300, h=600, Ap=0, As2=1500, ds2=550),
+                 TConcSect(b=1200, h=1000, t=300, t1=150, t2=100, Ap=1400, dp=850, As2=2000, ds2=950)):
+        start = time.perf_counter()
+        fire = FireSection(sect)
+        print(type(sect).__name__, fire.moment_capacity([0, 30, 60, 90, 120]) / 1E6,
+              f'{time.perf_counter() - start:.2f} s, {fire.solution().factorizations} factorizations')
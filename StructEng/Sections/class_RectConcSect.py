@@ -49,6 +49,11 @@ class RectConcSect(ConcreteSection):
     def Ix_top(self):
         return self.b * pow(self.h, 3) / 3
 
+    def brute_derivatives(self) -> dict:
+        return {'A': {'b': self.h, 'h': self.b},
+                'Q': {'b': pow(self.h, 2) * 0.5, 'h': self.b * self.h},
+                'I': {'b': pow(self.h, 3) / 3, 'h': self.b * pow(self.h, 2)}}
+
     def b_y(self, y):
         return self.b
 
@@ -0,0 +1,271 @@
+import numpy as np
+from StructEng.Sections.class_Dual import Dual
+from StructEng.Sections.class_ConcreteSection import _rows
+
+
+class SectionGradient:
+    """derivatives of the uncracked results of a section with respect to design variables wrt (geometric
+    attributes and fck), in closed form and in the same pass as the values
+
+    the homogenized sums A, Q and I are linear in the reinforcement terms: their jacobian is assembled once
+    from the brute_derivatives() of the section class and the steel terms. Every strain and stress is
+    f0 + y * fk with f0 and fk the numerators of eps_0 and k over Q ** 2 - A * I, so their gradients are the
+    jacobian rows weighted by a few coefficients, and both fibres of a magnel check share them
+
+    results are Duals: .value is the section result and .grad[name] its derivative. Loads can be Duals too,
+    built from variables: N * grad.variables['dp'] is the prestress moment with its derivative. Values and
+    derivatives are kept as plain arrays inside and every result is wrapped in a Dual once, so scalar sections
+    do not pay the cost of Dual arithmetic per operation
+    """
+
+    def __init__(self, section, wrt: tuple = ('b', 'h', 'Ap', 'dp', 'fck')):
+        geometry = section.geometry()
+        unknown = set(wrt) - geometry.keys() - {'fck'}
+        if unknown:
+            raise AttributeError(f"{', '.join(unknown)} not differentiable attributes of {type(section).__name__}")
+        self.section = section
+        self.names = tuple(wrt)
+        self.values = {**geometry, 'fck': section.concrete.fck}
+        self.__variables = None
+        self.concrete = self.__concrete(section.concrete)
+        self.E_ratio = section.concrete.E_cmt / section.concrete.E_cm  # does not depend on fck
+
+        self.hmg = self.__sums(section.ns, section.np)
+        self.hmg_t = self.__sums(section.n_st, section.n_pt)
+
+    @property
+    def variables(self) -> dict:
+        """name: Dual of every geometric attribute and fck, seeded along wrt. Built on first access"""
+        if self.__variables is None:
+            seeded = Dual.variables(**{k: self.values[k] for k in self.names})
+            zero = np.zeros(len(self.names))
+            self.__variables = {k: seeded.get(k, Dual(v, zero, self.names)) for k, v in self.values.items()}
+        return self.__variables
+
+    def __unit(self, name: str) -> np.ndarray:
+        """derivatives of the variable name: one along name, zero when it is not in wrt"""
+        e = np.zeros(len(self.names))
+        if name in self.names:
+            e[self.names.index(name)] = 1
+        return e
+
+    def __concrete(self, concrete) -> dict:
+        """name: (value, derivatives) of the concrete properties used by the section. Only fck changes them"""
+        if 'fck' not in self.names:
+            zero = np.zeros(len(self.names))
+            return {name: (getattr(concrete, name), zero)
+                    for name in ('fck', 'f_ckt', 'f_ctm', 'f_ctmt', 'E_cm', 'E_cmt')}
+        derivatives = {
+            'fck': 1.0,
+            'f_ckt': concrete.B_cc,
+            'f_ctm': np.where(concrete.fck <= 50, 0.2 * np.power(concrete.fck, -1 / 3),
+                              0.212 / (1 + concrete.f_cm * 0.1)),
+            'E_cm': 0.3 * concrete.E_cm / concrete.f_cm,  # f_cmt / f_cm does not depend on fck
+            'E_cmt': 0.3 * concrete.E_cmt / concrete.f_cm,
+        }
+        derivatives['f_ctmt'] = concrete.B_cc * derivatives['f_ctm']
+        e = self.__unit('fck')
+        return {name: (getattr(concrete, name), _e(dx) * e) for name, dx in derivatives.items()}
+
+    def __sums(self, ns, np_) -> dict:
+        """(value, derivatives) of the brute area Ac and of the homogenized A, Q and I from the top fibre, and J,
+        the jacobian of (A, Q, I) with shape (..., 3, variables)"""
+        s = self.section
+        brute = s.brute_derivatives()
+        # E_cm is proportional to f_cm ** 0.3 and E_cmt / E_cm does not depend on fck
+        dn_n = -0.3 / (s.concrete.fck + 8)
+        steel = {'As1': (ns, s.ds1), 'As2': (ns, s.ds2), 'Ap': (np_, s.dp)}
+        position = {'ds1': 'As1', 'ds2': 'As2', 'dp': 'Ap'}
+
+        a1, a2, ap = s.As1 * (ns - 1), s.As2 * (ns - 1), s.Ap * (np_ - 1)
+        values = {'A': s.Ac + a1 + a2 + ap,
+                  'Q': s.Q_xtop + a1 * s.ds1 + a2 * s.ds2 + ap * s.dp,
+                  'I': s.I_xtop + a1 * s.ds1 ** 2 + a2 * s.ds2 ** 2 + ap * s.dp ** 2}
+        # layers: constant areas and depths, their ratios E / E_c change with fck
+        layers = {k: v[3:] for k, v in s.rebar.items()}
+        if len(layers['A']):
+            n_layers = _rows(layers['E'], np.ndim(ns)) * (ns / s.passive_steel.Es)
+            a_layers = layers['A_bonded'] * (n_layers - 1)
+            values['A'] = values['A'] + a_layers.sum(axis=0)
+            values['Q'] = values['Q'] + (a_layers * layers['d']).sum(axis=0)
+            values['I'] = values['I'] + (a_layers * layers['d'] ** 2).sum(axis=0)
+        shape = np.broadcast_shapes(*(np.shape(v) for v in values.values()))
+        J = np.zeros((4, len(self.names)) + shape)  # Ac, A, Q, I. Filled by contiguous rows
+        for j, name in enumerate(self.names):
+            if name in brute['A']:
+                J[0, j] = J[1, j] = brute['A'][name]
+                J[2, j] = brute['Q'][name]
+                J[3, j] = brute['I'][name]
+            if name in steel:
+                n, y = steel[name]
+                J[1, j] += n - 1
+                J[2, j] += (n - 1) * y
+                J[3, j] += (n - 1) * y * y
+            elif name in position:
+                n, y = steel[position[name]]
+                area = getattr(s, position[name]) * (n - 1)
+                J[2, j] += area
+                J[3, j] += 2 * area * y
+            elif name == 'fck':
+                for area, (n, y) in zip((s.As1, s.As2, s.Ap), steel.values()):
+                    J[1, j] += area * n * dn_n
+                    J[2, j] += area * n * dn_n * y
+                    J[3, j] += area * n * dn_n * y * y
+                if len(layers['A']):
+                    da = layers['A_bonded'] * n_layers * dn_n
+                    J[1, j] += da.sum(axis=0)
+                    J[2, j] += (da * layers['d']).sum(axis=0)
+                    J[3, j] += (da * layers['d'] ** 2).sum(axis=0)
+        J = _last(J)
+
+        sums = {'Ac': (s.Ac, J[..., 0, :])}
+        sums.update({x: (values[x], J[..., i + 1, :]) for i, x in enumerate(values)})
+        sums['J'] = J[..., 1:, :]
+        return sums
+
+    # ---------------HOMOGENIZED SECTION------------------------
+    def hmgSection(self) -> dict:
+        """ConcreteSection.hmgSection() with derivatives"""
+        return self.__hmg(self.hmg)
+
+    def hmgSection_t(self) -> dict:
+        """ConcreteSection.hmgSection_t() with derivatives"""
+        return self.__hmg(self.hmg_t)
+
+    def __hmg(self, sums: dict) -> dict:
+        (Ac, dAc), (Q, dQ), (I, dI) = sums['Ac'], sums['Q'], sums['I']
+        h, dh = self.values['h'], self.__unit('h')
+        y_cen = Q / Ac  # same centroid as hmgSection()
+        dy = (dQ - _e(y_cen) * dAc) / _e(Ac)
+        Ixo = I - Ac * y_cen * y_cen
+        dIxo = dI - _e(y_cen * y_cen) * dAc - _e(2 * Ac * y_cen) * dy
+        tendons, dt = self.__tendons()
+        W1, W2 = Ixo / y_cen, Ixo / (h - y_cen)
+        results = {'A': sums['A'], 'Q': sums['Q'], 'I': sums['I'], 'Ixo': (Ixo, dIxo), 'y_cen': (y_cen, dy),
+                   'ecc': (tendons - y_cen, dt - dy), 'Wxo1': (W1, (dIxo - _e(W1) * dy) / _e(y_cen)),
+                   'Wxo2': (W2, (dIxo - _e(W2) * (dh - dy)) / _e(h - y_cen))}
+        return {name: Dual(value, d, self.names) for name, (value, d) in results.items()}
+
+    def __tendons(self) -> tuple:
+        """(value, derivatives) of the centroid of Ap and the prestressing layers, as ConcreteSection.tendons()"""
+        r = self.section.rebar
+        Ap, dp, dAp, ddp = self.values['Ap'], self.values['dp'], self.__unit('Ap'), self.__unit('dp')
+        area = r['A'][3:] * r['prestress'][3:]
+        if not np.any(area):
+            return dp, ddp
+        total = Ap + area.sum(axis=0)
+        centroid = (Ap * dp + (area * r['d'][3:]).sum(axis=0)) / total
+        return centroid, (_e(dp - centroid) * dAp + _e(Ap) * ddp) / _e(total)
+
+    # ---------------STRAINS AND STRESSES------------------------
+    def __terms(self, N, M, alpha, sums: dict) -> tuple:
+        """(f0, fk, df0, dfk): f0 = alpha * (M * Q - I * N) / D and fk = (N * Q - M * A) / D with
+        D = Q ** 2 - A * I, the numerators of eps_0 and k over their common denominator, and their derivatives.
+        D * df0 = f0 * I dA + (alpha * M - 2 * f0 * Q) dQ + (f0 * A - alpha * N) dI + alpha * Q dM - alpha * I dN
+        D * dfk = (fk * I - M) dA + (N - 2 * fk * Q) dQ + fk * A dI - A dM + Q dN
+        both are one contraction of the coefficients with the jacobian rows of A, Q, I (and of the loads when
+        they are Duals)
+        """
+        A, Q, I = sums['A'][0], sums['Q'][0], sums['I'][0]
+        (N, dN), (M, dM) = _split(N), _split(M)
+        D = Q * Q - A * I
+        f0 = alpha * (M * Q - I * N) / D
+        fk = (N * Q - M * A) / D
+        coefficients = ((f0 * I, alpha * M - 2 * f0 * Q, f0 * A - alpha * N), (fk * I - M, N - 2 * fk * Q, fk * A))
+        shape = np.broadcast(*coefficients[0], *coefficients[1]).shape
+        if shape:
+            c = np.empty((2, 3) + shape)
+            for i, row in enumerate(coefficients):
+                for j, x in enumerate(row):
+                    c[i, j] = x
+        else:  # scalar section and loads
+            c = np.array(coefficients, dtype=float)
+        c /= D
+        d = _last(c) @ sums['J']
+        for dx, a0, ak in ((dM, alpha * Q, -A), (dN, -alpha * I, Q)):
+            if dx is not None:
+                d[..., 0, :] += dx * _e(a0 / D)
+                d[..., 1, :] += dx * _e(ak / D)
+        return f0, fk, d[..., 0, :], d[..., 1, :]
+
+    @staticmethod
+    def __fibre(terms: tuple, y, dy=None) -> tuple:
+        """(value, derivatives) of f0 + y * fk"""
+        f0, fk, df0, dfk = terms
+        d = df0 + dfk * _e(y)
+        if dy is not None:
+            d = d + dy * _e(fk)
+        return f0 + y * fk, d
+
+    def __over(self, value, d, name: str) -> Dual:
+        """value over the concrete property name"""
+        E, dE = self.concrete[name]
+        q = value / E
+        return Dual(q, (d - _e(q) * dE) / _e(E), self.names)
+
+    def k(self, N, M) -> Dual:
+        _, fk, _, dfk = self.__terms(N, M, 1, self.hmg)
+        return self.__over(fk, dfk, 'E_cm')
+
+    def k_t(self, N, M) -> Dual:
+        _, fk, _, dfk = self.__terms(N, M, 1, self.hmg_t)
+        return self.__over(fk, dfk, 'E_cmt')
+
+    def eps_0(self, N, M) -> Dual:
+        f0, _, df0, _ = self.__terms(N, M, 1, self.hmg)
+        return self.__over(f0, df0, 'E_cm')
+
+    def eps_0_t(self, N, M) -> Dual:
+        f0, _, df0, _ = self.__terms(N, M, 1, self.hmg_t)
+        return self.__over(f0, df0, 'E_cm')  # E_cm as in ConcreteSection.eps_0_t()
+
+    def eps(self, N, M, y) -> Dual:
+        return self.__over(*self.__fibre(self.__terms(N, M, 1, self.hmg), *_split(y)), 'E_cm')
+
+    def eps_t(self, N, M, y) -> Dual:
+        return self.__over(*self.__fibre(self.__terms(N, M, self.E_ratio, self.hmg_t), *_split(y)), 'E_cmt')
+
+    def stress(self, N, M, y) -> Dual:
+        # the elastic modulus cancels
+        return Dual(*self.__fibre(self.__terms(N, M, 1, self.hmg), *_split(y)), self.names)
+
+    def stress_t(self, N, M, y) -> Dual:
+        # E_cmt * (eps_0_t + k_t * y), where eps_0_t uses E_cm
+        return Dual(*self.__fibre(self.__terms(N, M, self.E_ratio, self.hmg_t), *_split(y)), self.names)
+
+    def magnel_margins(self, N, Mi, Mf, N_f=None) -> Dual:
+        """ConcreteSection.magnel_margins() with derivatives"""
+        if N_f is None:
+            N_f = N
+        h, dh, c = self.values['h'], self.__unit('h'), self.concrete
+        initial = self.__terms(N, Mi, self.E_ratio, self.hmg_t)
+        final = self.__terms(N_f, Mf, 1, self.hmg)
+        stresses = ((initial[0], initial[2]), self.__fibre(initial, h, dh),
+                    (final[0], final[2]), self.__fibre(final, h, dh))
+        comp = (c['f_ckt'],) * 2 + (c['fck'],) * 2  # compression limits are -0.45 of them
+        tens = (c['f_ctmt'],) * 2 + (c['f_ctm'],) * 2
+
+        shape = np.broadcast(*(stress for stress, _ in stresses)).shape
+        value = np.empty((8,) + shape)
+        d = np.empty((8,) + shape + (len(self.names),))
+        for i, (stress, ds) in enumerate(stresses):
+            value[2 * i] = stress + 0.45 * comp[i][0]
+            value[2 * i + 1] = tens[i][0] - stress
+            d[2 * i] = ds + 0.45 * comp[i][1]
+            d[2 * i + 1] = tens[i][1] - ds
+        return Dual(value, d, self.names)
+
+
+def _e(x):
+    """x with a trailing axis to scale derivatives"""
+    return np.asarray(x)[..., None]
+
+
+def _last(x: np.ndarray) -> np.ndarray:
+    """x with its first two axes moved to the end, as a view"""
+    return x.transpose(tuple(range(2, x.ndim)) + (0, 1))
+
+
+def _split(x) -> tuple:
+    """value and derivatives (None for constants) of a Dual or a constant"""
+    return (x.value, x.d) if isinstance(x, Dual) else (np.asarray(x), None)
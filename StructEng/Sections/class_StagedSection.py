@@ -0,0 +1,233 @@
+import numpy as np
+from StructEng.Sections.class_ConcreteSection import ConcreteSection
+from StructEng.Materials.class_PrestressSteel import PrestressSteel
+
+"""
+---------UNITS--------------------
+length: mm
+force: N
+moment: N*mm
+time: days from the casting of the first part
+---------ORIGIN-----------------
+y is measured downwards from the top fibre of the final section. Moments are whole moments about y = 0,
+sagging positive, as in ConcreteSection
+"""
+
+
+class StagedSection:
+    """cross section built and loaded in stages (precast girders with a cast in place topping, several prestress
+    stages...). Parts are ConcreteSections with their own concrete, placed at depth y and cast at day cast. Parts
+    are bonded, so once active they share the strain plane increments of every later stage
+
+    the state carried between stages is the stress plane of every active part (sigma = a + b * y, kept as the
+    list of increments and the age they were applied at, for creep) and the stress of every bonded steel. A
+    stage only adds increments to it, earlier stages are never computed again
+
+    stage() order: creep of the existing stresses since the previous stage (age-adjusted effective modulus,
+    restrained by the bonded parts and steels), activation of new parts, prestress transfer, loads. Elastic
+    increments use the modulus of each concrete at its age (Concrete.Ecm_age)
+    """
+    kwDefaults = {
+        'chi': 0.8,  # ageing coefficient of the age-adjusted effective modulus
+    }
+
+    def __init__(self, **kwargs):
+        self.chi: float = kwargs.get('chi', self.kwDefaults['chi'])
+        self.parts = {}  # name: {'section', 'y', 'cast', 'active'}
+        self.tendons = {}  # name: {'part', 'Ap', 'y', 'steel', 'bonded'}
+        self.increments = {}  # part: list of (t, a, b) stress plane increments
+        self.planes = {}  # part: (a, b) current stress plane
+        self.steel = {}  # bonded steel name: stress (MPa)
+        self.t = None  # time of the last stage
+
+    # ---------------DEFINITION------------------------
+    def add_part(self, name: str, section: ConcreteSection, y: float = 0.0, cast: float = 0.0) -> None:
+        """part of the section, active from the stage that lists it. The tendons of section (Ap) are pre-tensioned:
+        bonded when the part becomes active, with the force given to prestress() under the part name
+        :param y: depth of the top fibre of the part
+        :param cast: casting day of the part concrete
+        """
+        if section.layers:
+            raise ValueError('parts only take As1, As2 and Ap. Sections with reinforcement layers are not supported')
+        self.parts[name] = {'section': section, 'y': y, 'cast': cast, 'active': False}
+        if section.Ap:
+            self.tendons[name] = {'part': name, 'Ap': section.Ap, 'y': y + section.dp,
+                                  'steel': section.prestress_steel, 'bonded': False}
+
+    def add_tendon(self, name: str, part: str, Ap: float, dp: float, steel: PrestressSteel = None) -> None:
+        """post-tensioned tendon in part at depth dp from the part top fibre. Bonded after its prestress stage"""
+        steel = steel if steel is not None else self.parts[part]['section'].prestress_steel
+        self.tendons[name] = {'part': part, 'Ap': Ap, 'y': self.parts[part]['y'] + dp, 'steel': steel,
+                              'bonded': False}
+
+    # ---------------STAGES------------------------
+    def stage(self, t: float, activate: tuple = (), prestress: dict = None, N=0.0, M=0.0) -> dict:
+        """advances the section to day t and returns its state()
+        :param activate: names of the parts that start to work
+        :param prestress: name: force P (N, tension positive) of the tendons stressed at this stage
+        :param N: normal force increment on the section
+        :param M: whole moment increment about y = 0
+        """
+        if self.t is not None and t < self.t:
+            raise ValueError(f'stages must follow each other in time. {t} is before {self.t}')
+        for name in activate:
+            if t <= self.parts[name]['cast']:
+                raise ValueError(f'{name} is cast on day {self.parts[name]["cast"]} and can not work on day {t}')
+        if self.t is not None and t > self.t and self.planes:
+            self.__creep(self.t, t)
+        self.t = t
+        for name in activate:
+            part = self.parts[name]
+            part['active'] = True
+            self.increments[name] = []
+            self.planes[name] = (0.0, 0.0)
+            for key in self.__bars(name):
+                self.steel[key] = 0.0
+            if name in self.tendons:
+                self.__bond(name, 0.0)
+
+        prestress = prestress if prestress is not None else {}
+        if prestress:
+            self.__apply(-sum(prestress.values()), -sum(P * self.tendons[k]['y'] for k, P in prestress.items()))
+            for name, P in prestress.items():
+                tendon = self.tendons[name]
+                if tendon['bonded']:  # pre-tensioned: released on the section it is bonded to
+                    self.steel[name] += P / tendon['Ap']
+                else:
+                    self.__bond(name, P / tendon['Ap'])
+        if np.any(N) or np.any(M):
+            self.__apply(N, M)
+        return self.state()
+
+    def state(self) -> dict:
+        """{'t': day, 'parts': {name: {'top': stress, 'bottom': stress}}, 'steel': {name: stress}}. Concrete
+        stresses at the top and bottom fibres of every active part, compression negative"""
+        parts = {}
+        for name, (a, b) in self.planes.items():
+            part = self.parts[name]
+            parts[name] = {'top': a + b * part['y'], 'bottom': a + b * (part['y'] + part['section'].h)}
+        return {'t': self.t, 'parts': parts, 'steel': dict(self.steel)}
+
+    def stress(self, part: str, y):
+        """concrete stress of part at depth y"""
+        a, b = self.planes[part]
+        return a + b * y
+
+    # ---------------SOLUTION------------------------
+    def __bars(self, name: str) -> dict:
+        """passive steels of part name: key: (area, depth)"""
+        part = self.parts[name]
+        s = part['section']
+        bars = {f'{name}.As1': (s.As1, part['y'] + s.ds1), f'{name}.As2': (s.As2, part['y'] + s.ds2)}
+        return {key: bar for key, bar in bars.items() if np.any(bar[0])}
+
+    def __bond(self, name: str, stress) -> None:
+        self.tendons[name]['bonded'] = True
+        self.steel[name] = stress
+
+    def __steels(self) -> list:
+        """(key, part, area, depth, E) of the bonded steels"""
+        steels = []
+        for name, part in self.parts.items():
+            if part['active']:
+                Es = part['section'].passive_steel.Es
+                steels += [(key, name, A, y, Es) for key, (A, y) in self.__bars(name).items()]
+        steels += [(key, t['part'], t['Ap'], t['y'], t['steel'].Ep) for key, t in self.tendons.items() if t['bonded']]
+        return steels
+
+    def __moduli(self, t: float) -> dict:
+        """part: concrete modulus at its age on day t"""
+        return {name: part['section'].concrete.Ecm_age(t - part['cast'])
+                for name, part in self.parts.items() if part['active']}
+
+    def __sums(self, name: str) -> tuple:
+        """brute area of part name and its first and second moments about y = 0"""
+        part = self.parts[name]
+        s, y = part['section'], part['y']
+        return s.Ac, s.Q_xtop + s.Ac * y, s.I_xtop + 2 * y * s.Q_xtop + s.Ac * y * y
+
+    def __stiffness(self, E: dict) -> tuple:
+        """(EA, EQ, EI) of the active parts with concrete moduli E and the bonded steels, homogenized as in
+        ConcreteSection: steels take the place of the concrete of their part"""
+        EA = EQ = EI = 0.0
+        for name, Ec in E.items():
+            A, Q, I = self.__sums(name)
+            EA, EQ, EI = EA + Ec * A, EQ + Ec * Q, EI + Ec * I
+        for _, part, A, y, Es in self.__steels():
+            dE = (Es - E[part]) * A
+            EA, EQ, EI = EA + dE, EQ + dE * y, EI + dE * y * y
+        return EA, EQ, EI
+
+    @staticmethod
+    def __plane(stiffness: tuple, N, M) -> tuple:
+        """strain plane (eps_0, k) of the forces N, M about y = 0"""
+        EA, EQ, EI = stiffness
+        det = EA * EI - EQ * EQ
+        return (EI * N - EQ * M) / det, (EA * M - EQ * N) / det
+
+    def __apply(self, N, M) -> None:
+        """elastic increment of the loads N, M on the active section at the current day"""
+        E = self.__moduli(self.t)
+        eps_0, k = self.__plane(self.__stiffness(E), N, M)
+        self.__add(E, eps_0, k, {}, self.t)
+
+    def __add(self, E: dict, eps_0, k, free: dict, t: float) -> None:
+        """adds the stresses of the strain plane increment (eps_0, k), minus the free strains of the parts"""
+        for name, Ec in E.items():
+            e0, kf = free.get(name, (0.0, 0.0))
+            a, b = Ec * (eps_0 - e0), Ec * (k - kf)
+            self.increments[name].append((t, a, b))
+            A, B = self.planes[name]
+            self.planes[name] = (A + a, B + b)
+        for key, _, _, y, Es in self.__steels():
+            self.steel[key] = self.steel[key] + Es * (eps_0 + k * y)
+
+    def __creep(self, t0: float, t1: float) -> None:
+        """stress redistribution by creep between days t0 and t1. Every stress increment creeps freely by
+        sigma / E_cm * (phi(t1, t_j) - phi(t0, t_j)); the bonded section restrains those strains with the
+        age-adjusted moduli E(t0) / (1 + chi * phi(t1, t0))"""
+        E, free = {}, {}
+        E0 = self.__moduli(t0)
+        for name in E0:
+            part = self.parts[name]
+            s, cast = part['section'], part['cast']
+
+            def phi(t, tj):
+                return s.phi_time(t - cast, s.concrete.t0_cem(tj - cast)) if t > tj else 0.0
+
+            e0 = kf = 0.0
+            for tj, a, b in self.increments[name]:
+                dphi = phi(t1, tj) - phi(t0, tj)
+                e0, kf = e0 + a * dphi, kf + b * dphi
+            free[name] = (e0 / s.concrete.E_cm, kf / s.concrete.E_cm)
+            E[name] = E0[name] / (1 + self.chi * phi(t1, t0))
+
+        # forces that hold the free creep strains back, released on the restraining section
+        N = M = 0.0
+        for name, (e0, kf) in free.items():
+            A, Q, I = self.__sums(name)
+            N, M = N + E[name] * (A * e0 + Q * kf), M + E[name] * (Q * e0 + I * kf)
+        for _, name, A, y, _ in self.__steels():  # no concrete where the steels are
+            e0, kf = free[name]
+            force = E[name] * A * (e0 + kf * y)
+            N, M = N - force, M - force * y
+        eps_0, k = self.__plane(self.__stiffness(E), N, M)
+        self.__add(E, eps_0, k, free, t0)
+
+
+if __name__ == '__main__':
+    from StructEng.Materials.class_Concrete import Concrete
+    from StructEng.Sections.class_RectConcSect import RectConcSect
+    from StructEng.Sections.class_TConcSect import TConcSect
+    girder = TConcSect(concrete=Concrete(fck=45), b=600, h=1200, t=200, t1=150, t2=100, Ap=2800, dp=1100,
+                       As2=0, As1=0)
+    staged = StagedSection()
+    staged.add_part('slab', RectConcSect(concrete=Concrete(fck=30), b=2400, h=200, Ap=0, As1=0, As2=0), cast=60)
+    staged.add_part('girder', girder, y=200)
+    staged.add_tendon('continuity', 'slab', Ap=1500, dp=100)
+    for state in (staged.stage(3, activate=('girder',), prestress={'girder': 3.9E6}, M=1.2E9),  # transfer, own weight
+                  staged.stage(60, M=0.6E9),  # wet topping on the girder
+                  staged.stage(67, activate=('slab',)),
+                  staged.stage(90, prestress={'continuity': 1.8E6}),
+                  staged.stage(25550, M=1.5E9)):
+        print(state)
@@ -1,3 +1,4 @@
+import numpy as np
 from StructEng.Sections.class_ConcreteSection import ConcreteSection
 
 
@@ -35,6 +36,9 @@ class TConcSect(ConcreteSection):
 
         super().set(default, **kwargs)
 
+    def geometry(self) -> dict:
+        return {**super().geometry(), **{k: self.__dict__[k] for k in self.kwTSectDefaults}}
+
     def bruteArea(self):
         # top rectangle area
         A1 = self.b * self.t1
@@ -72,64 +76,64 @@ class TConcSect(ConcreteSection):
         I_3 = self.t * (pow(self.h, 3) - pow(self.t1 + self.t2, 3)) / 3
         return I_1 + I_2 + I_3
 
+    def brute_derivatives(self) -> dict:
+        b, h, t, t1, t2 = self.b, self.h, self.t, self.t1, self.t2
+        return {
+            'A': {'b': t1 + t2 / 2, 'h': t, 't': t2 / 2 + h - t1 - t2, 't1': b - t, 't2': (b - t) / 2},
+            'Q': {'b': pow(t1, 2) / 2 + t2 * (3 * t1 + t2) / 6,
+                  'h': t * h,
+                  't': t2 * (3 * t1 + 2 * t2) / 6 + (pow(h, 2) - pow(t1 + t2, 2)) / 2,
+                  't1': b * t1 + t2 * (b + t) / 2 - t * (t1 + t2),
+                  't2': (3 * t1 * (b + t) + 2 * t2 * (b + 2 * t)) / 6 - t * (t1 + t2)},
+            'I': {'b': pow(t1, 3) / 3 + t2 * (6 * pow(t1, 2) + 4 * t1 * t2 + pow(t2, 2)) / 12,
+                  'h': t * pow(h, 2),
+                  't': t2 * (6 * pow(t1, 2) + 8 * t1 * t2 + 3 * pow(t2, 2)) / 12 + (pow(h, 3) - pow(t1 + t2, 3)) / 3,
+                  't1': b * pow(t1, 2) + t2 * (3 * t1 * (b + t) + t2 * (b + 2 * t)) / 3 - t * pow(t1 + t2, 2),
+                  't2': (6 * pow(t1, 2) * (b + t) + 8 * t1 * t2 * (b + 2 * t) + 3 * pow(t2, 2) * (b + 3 * t)) / 12
+                        - t * pow(t1 + t2, 2)},
+        }
+
 #---------------- y DEPENDENT FUNCTIONS---------------------------
+    # y can be a scalar or an array. Every portion of the section contributes up to min(y, portion end)
+
+    def __check_y(self, y) -> None:
+        if np.any((np.asarray(y) < 0) | (np.asarray(y) > self.h)):
+            raise ValueError('y must lie between the top and the bottom fibre')
+
+    def __portions(self, y) -> tuple:
+        """y clipped to the flange, flange slope and web portions of the section"""
+        y1 = np.minimum(y, self.t1)
+        y2 = np.clip(y, self.t1, self.t1 + self.t2)
+        y3 = np.maximum(y, self.t1 + self.t2)
+        return y1, y2, y3
+
     def b_y(self, y):
-        if 0 < y < self.t1:
-            return self.b
-        elif self.t1 < y < self.t1 + self.t2:
-            a = (y - self.t1) / self.t2
-            return self.b + a * (self.t - self.b)
-        elif self.t1 + self.t2 < y < self.h:
-            return self.t
-        else:
-            raise ValueError
+        self.__check_y(y)
+        a = (np.clip(y, self.t1, self.t1 + self.t2) - self.t1) / self.t2 if 0 < self.t2 else 0
+        return np.where(y <= self.t1, self.b, self.b + a * (self.t - self.b))
 
     def A_y(self, y):
-        if 0 < y <= self.t1:
-            return self.b * y
-        elif self.t1 < y < self.t1 + self.t2:
-            return self.b * self.t1 + ConcreteSection.A_yg(y, self.b, self.t, self.t1, self.t2) - \
-                    ConcreteSection.A_yg(self.t1, self.b, self.t, self.t1, self.t2)
-        elif self.t1 + self.t2 < y < self.h:
-            return self.b * self.t1 + ConcreteSection.A_yg(self.t1 + self.t2, self.b, self.t, self.t1, self.t2) - \
-                    ConcreteSection.A_yg(self.t1, self.b, self.t, self.t1, self.t2) + self.t * (y - self.t1 - self.t2)
-        else:
-            raise ValueError
+        self.__check_y(y)
+        y1, y2, y3 = self.__portions(y)
+        return self.b * y1 + ConcreteSection.A_yg(y2, self.b, self.t, self.t1, self.t2) - \
+            ConcreteSection.A_yg(self.t1, self.b, self.t, self.t1, self.t2) + self.t * (y3 - self.t1 - self.t2)
 
     def Q_y(self, y):
-        if y < self.t1:
-            return self.b * pow(y, 2) * 0.5
-        elif self.t1 < y < self.t1 + self.t2:
-            # value of Q(t1) used in integration result Q(y) - Q(t1)
-            Q_t1 = ConcreteSection.Q_yg(self.t1, self.b, self.t, self.t1, self.t2)
-            # value of Q(y) used in integration result Q(y) - Q(t1)
-            Qy = ConcreteSection.Q_yg(y, self.b, self.t, self.t1, self.t2)
-            return self.b * pow(self.t1, 2) * 0.5 + Qy - Q_t1
-        elif self.t1 + self.t2 < y < self.h:
-            # value of Q(t1) used in integration result Q(y) - Q(t1)
-            Q_t1 = ConcreteSection.Q_yg(self.t1, self.b, self.t, self.t1, self.t2)
-            # value of Q(y) used in integration result Q(y) - Q(t1)
-            Qy = ConcreteSection.Q_yg(self.t1 + self.t2, self.b, self.t, self.t1, self.t2)
-            return self.b * pow(self.t1, 2) * 0.5 + Qy - Q_t1 + self.t * (pow(y, 2) - pow(self.t1 + self.t2, 2)) * 0.5
-        else:
-            raise ValueError
+        self.__check_y(y)
+        y1, y2, y3 = self.__portions(y)
+        # value of Q(t1) used in integration result Q(y) - Q(t1)
+        Q_t1 = ConcreteSection.Q_yg(self.t1, self.b, self.t, self.t1, self.t2)
+        Qy = ConcreteSection.Q_yg(y2, self.b, self.t, self.t1, self.t2)
+        return self.b * pow(y1, 2) * 0.5 + Qy - Q_t1 + self.t * (pow(y3, 2) - pow(self.t1 + self.t2, 2)) * 0.5
 
     def I_y(self, y):
-        if 0 < y <= self.t1:
-            return self.b * pow(y, 3) / 3
-        elif self.t1 < y < self.t1 + self.t2:
-            I_1 = self.b * pow(self.t1, 3) / 3
-            I_2 = ConcreteSection.I_yg(y, self.b, self.t, self.t1, self.t2) - \
-                  ConcreteSection.I_yg(self.t1, self.b, self.t, self.t1, self.t2)
-            return I_1 + I_2
-        elif self.t1 + self.t2 < y < self.h:
-            I_1 = self.b * pow(self.t1, 3) / 3
-            I_2 = ConcreteSection.I_yg(self.t1 + self.t2, self.b, self.t, self.t1, self.t2) - \
-                  ConcreteSection.I_yg(self.t1, self.b, self.t, self.t1, self.t2)
-            I_3 = self.t / 3 * (pow(y, 3) - pow(self.t1 + self.t2, 3))
-            return I_1 + I_2 + I_3
-        else:
-            raise ValueError
+        self.__check_y(y)
+        y1, y2, y3 = self.__portions(y)
+        I_1 = self.b * pow(y1, 3) / 3
+        I_2 = ConcreteSection.I_yg(y2, self.b, self.t, self.t1, self.t2) - \
+            ConcreteSection.I_yg(self.t1, self.b, self.t, self.t1, self.t2)
+        I_3 = self.t / 3 * (pow(y3, 3) - pow(self.t1 + self.t2, 3))
+        return I_1 + I_2 + I_3
 
     def ycentroid_y(self, y):
         return self.Q_y(y) / self.A_y(y)
@@ -0,0 +1,48 @@
+from importlib import import_module
+
+"""
+public classes are importable from the package root (from StructEng import RectConcSect) but their modules
+are only imported on first access, so importing StructEng is free and a script pays only for what it uses
+"""
+
+__version__ = '0.1.0'  # part of the result cache keys: change it when results change
+
+_lazy_attrs = {
+    'Concrete': 'StructEng.Materials.class_Concrete',
+    'CreepGrid': 'StructEng.Materials.class_CreepGrid',
+    'MonteCarlo': 'StructEng.Reliability.class_MonteCarlo',
+    'SectionLimitStates': 'StructEng.Reliability.class_SectionLimitStates',
+    'ReinforcementSteel': 'StructEng.Materials.class_ReinforcementSteel',
+    'PrestressSteel': 'StructEng.Materials.class_PrestressSteel',
+    'ConcreteSection': 'StructEng.Sections.class_ConcreteSection',
+    'RectConcSect': 'StructEng.Sections.class_RectConcSect',
+    'TConcSect': 'StructEng.Sections.class_TConcSect',
+    'CrackWidth': 'StructEng.Sections.class_CrackWidth',
+    'CrackEquilibrium': 'StructEng.Sections.class_CrackEquilibrium',
+    'SectionGradient': 'StructEng.Sections.class_SectionGradient',
+    'Fatigue': 'StructEng.Sections.class_Fatigue',
+    'FireSection': 'StructEng.Sections.class_FireSection',
+    'StagedSection': 'StructEng.Sections.class_StagedSection',
+    'CompositeSection': 'StructEng.Sections.class_CompositeSection',
+    'Beam': 'StructEng.Beam',
+    'ConcBeam': 'StructEng.Beam',
+    'Tendon': 'StructEng.Beam',
+    'Action': 'StructEng.Loads.class_Action',
+    'LoadCombination': 'StructEng.Loads.class_LoadCombination',
+    'Project': 'StructEng.IO.class_Project',
+    'ResultCache': 'StructEng.IO.class_ResultCache',
+}
+
+__all__ = list(_lazy_attrs)
+
+
+def __getattr__(name: str):
+    if name in _lazy_attrs:
+        value = getattr(import_module(_lazy_attrs[name]), name)
+        globals()[name] = value  # next accesses do not go through __getattr__
+        return value
+    raise AttributeError(f"module 'StructEng' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,4 @@
+import sys
+from StructEng.cli import main
+
+sys.exit(main())
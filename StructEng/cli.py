@@ -0,0 +1,162 @@
+import argparse
+import json
+import sys
+import time
+import numpy as np
+
+"""
+headless batch runner. python -m StructEng <command> --help
+
+section job.json                  section report
+magnel schedule.csv -o out.csv    magnel checks of a CSV schedule (see SectionBatch for the columns)
+creep job.json -o creep.csv       creep coefficient history of the concrete
+loss job.json -o loss.csv         creep loss history of the prestress
+
+job files are json: {"section": {"type": "RectConcSect", "b": 500, ..., "concrete": {"fck": 35}},
+"N": -1350E3, "M": -500E6}. creep accepts {"concrete": {...}} alone. creep and loss take --cache DIR.
+--workers and --chunk split the rows of a magnel schedule. The other commands compute one vectorized history
+and reject them
+Throughput and peak memory are reported on stderr at the end
+"""
+
+
+def read_job(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def job_section(job: dict):
+    from StructEng.IO.class_SectionBatch import SectionBatch
+    d = dict(job['section'])
+    section_type = d.pop('type', 'RectConcSect')
+    if section_type not in SectionBatch.section_types:
+        raise ValueError(f'not a valid section type. try {", ".join(SectionBatch.section_types)}')
+    return SectionBatch.section_types[section_type].from_dict(d)
+
+
+def job_times(concrete, points: int) -> np.ndarray:
+    """concrete ages from the prestress time to the delayed effects time, log spaced"""
+    t0 = concrete.t_0_cem
+    return t0 + np.logspace(-2, np.log10(concrete.delayed_effects_time - t0), points)
+
+
+def write_columns(path: str, columns: dict, fmt: str) -> None:
+    if fmt == 'csv':
+        np.savetxt(path, np.column_stack(list(columns.values())), delimiter=',', header=','.join(columns),
+                   comments='', fmt='%.8g')
+    else:
+        np.savez(path, **columns)
+
+
+def run_cached(args, name: str, fn, **inputs) -> dict:
+    """fn(**inputs), read from the result cache when --cache is given"""
+    if args.cache is None:
+        return fn(**inputs)
+    from StructEng.IO.class_ResultCache import ResultCache
+    return ResultCache(directory=args.cache).compute(name, fn, **inputs)
+
+
+def creep_history(concrete, t, h0=None) -> dict:
+    return {'t': t, 'phi': concrete.phi_time(t, concrete.t_0_cem, h0)}
+
+
+def loss_history(section, N, M, t) -> dict:
+    return {'t': t, 'loss': section.creep_loss(N, M, t)}
+
+
+def cmd_section(args) -> int:
+    section = job_section(read_job(args.job))
+    text = str(section)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 1
+
+
+def cmd_magnel(args) -> int:
+    from StructEng.IO.class_SectionBatch import SectionBatch
+    batch = SectionBatch(args.type, chunk=args.chunk)
+    summary = batch.run(args.schedule, args.output, workers=args.workers, fmt=args.format)
+    print(f"{summary['failed']} of {summary['rows']} rows fail the magnel check", file=sys.stderr)
+    return summary['rows']
+
+
+def cmd_creep(args) -> int:
+    job = read_job(args.job)
+    h0 = None  # the concrete h0 unless a section gives its own
+    if 'section' in job:
+        section = job_section(job)
+        concrete, h0 = section.concrete, section.h0
+    else:
+        from StructEng.Materials.class_Concrete import Concrete
+        concrete = Concrete.from_dict(job.get('concrete', {}))
+    t = job_times(concrete, args.points)
+    write_columns(args.output, run_cached(args, 'creep', creep_history, concrete=concrete, t=t, h0=h0), args.format)
+    return len(t)
+
+
+def cmd_loss(args) -> int:
+    job = read_job(args.job)
+    section = job_section(job)
+    t = job_times(section.concrete, args.points)
+    result = run_cached(args, 'loss', loss_history, section=section, N=job.get('N', 0.0), M=job.get('M', 0.0), t=t)
+    write_columns(args.output, result, args.format)
+    return len(t)
+
+
+def peak_memory() -> str:
+    """peak resident memory of this process and its finished children"""
+    try:
+        import resource
+    except ImportError:  # windows
+        return 'n/a'
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    scale = 1 if sys.platform == 'darwin' else 1024  # bytes on macOS, kB elsewhere
+    return f'{peak * scale / 2 ** 20:.1f} MB'
+
+
+def parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog='python -m StructEng', description='StructEng batch runner')
+    sub = p.add_subparsers(dest='command', required=True)
+
+    s = sub.add_parser('section', help='section report from a job file')
+    s.add_argument('job')
+    s.add_argument('-o', '--output', help='text file. stdout by default')
+    s.set_defaults(run=cmd_section)
+
+    s = sub.add_parser('magnel', help='magnel checks of a CSV schedule')
+    s.add_argument('schedule')
+    s.add_argument('-o', '--output', required=True, help='CSV file, or directory of .npy columns')
+    s.add_argument('--type', default='RectConcSect', choices=('RectConcSect', 'TConcSect'))
+    s.add_argument('--workers', type=int, default=1, help='worker processes')
+    s.add_argument('--chunk', type=int, default=10000, help='rows per chunk')
+    s.add_argument('--format', default='csv', choices=('csv', 'npy'))
+    s.set_defaults(run=cmd_magnel)
+
+    for name, run, help_text in (('creep', cmd_creep, 'creep coefficient history'),
+                                 ('loss', cmd_loss, 'creep loss history of the prestress')):
+        s = sub.add_parser(name, help=help_text)
+        s.add_argument('job')
+        s.add_argument('-o', '--output', required=True)
+        s.add_argument('--points', type=int, default=1000, help='number of concrete ages')
+        s.add_argument('--format', default='csv', choices=('csv', 'npz'))
+        s.add_argument('--cache', help='result cache directory. Unchanged jobs are read from it')
+        s.set_defaults(run=run)
+    return p
+
+
+def main(argv=None) -> int:
+    args = parser().parse_args(argv)
+    start = time.perf_counter()
+    try:
+        rows = args.run(args)
+    except (OSError, ValueError, KeyError) as error:
+        print(f'error: {error!r}', file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f'{rows} rows in {elapsed:.2f} s ({rows / max(elapsed, 1E-9):.0f} rows/s), '
+          f'peak memory {peak_memory()}', file=sys.stderr)
+    return 0
@@ -0,0 +1,193 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from StructEng.Sections.class_ConcreteSection import ConcreteSection
+
+"""
+headless calculation sheets. One figure per process is created on the Agg canvas (no pyplot, no GUI backend)
+and reused for every member: only the data of its artists change between members. Batches are split among
+a process pool, each worker keeping its own renderer
+"""
+
+
+class CalcSheetRenderer:
+    """calculation sheet with the stress diagram, the magnel diagram and the creep curve of a section"""
+    kwDefaults = {
+        'figsize': (11.69, 8.27),  # A4 landscape (inches)
+        'dpi': 100,
+        'n_points': 200,  # points of the magnel and creep curves
+        'creep_time': 25550,  # last concrete age of the creep curve (days)
+    }
+
+    def __init__(self, **kwargs):
+        self.figsize = kwargs.get('figsize', self.kwDefaults['figsize'])
+        self.dpi = kwargs.get('dpi', self.kwDefaults['dpi'])
+        self.n_points = kwargs.get('n_points', self.kwDefaults['n_points'])
+        self.creep_time = kwargs.get('creep_time', self.kwDefaults['creep_time'])
+
+        self.fig = Figure(figsize=self.figsize, dpi=self.dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax_stress = self.fig.add_subplot(2, 2, 1)
+        self.ax_magnel = self.fig.add_subplot(2, 2, 2)
+        self.ax_creep = self.fig.add_subplot(2, 2, 3)
+        self.ax_text = self.fig.add_subplot(2, 2, 4)
+        self.__init_artists()
+
+    def __init_artists(self) -> None:
+        """every artist is created once, empty. update() only changes its data"""
+        ax = self.ax_stress
+        self.stress_lines = {
+            'init': ax.plot([], [], 'b-', label='initial')[0],
+            'final': ax.plot([], [], 'r-', label='final')[0],
+        }
+        self.stress_limits = [ax.axvline(0, color=c, ls=':', lw=0.8) for c in ('b', 'b', 'r', 'r')]
+        ax.axvline(0, color='k', lw=0.5)
+        ax.invert_yaxis()
+        ax.set_xlabel('stress (MPa)')
+        ax.set_ylabel('depth from top fibre (mm)')
+        ax.set_title('stress diagram')
+        ax.legend(loc='lower right', fontsize='small')
+
+        ax = self.ax_magnel
+        names = ('initial top', 'initial bottom', 'final top', 'final bottom')
+        self.magnel_lines = [ax.plot([], [], label=name)[0] for name in names]
+        self.magnel_point = ax.plot([], [], 'ko')[0]
+        ax.set_xlabel('tendon depth dp (mm)')
+        ax.set_ylabel('1 / P (1/N)')
+        ax.set_title('magnel diagram')
+        ax.legend(loc='upper left', fontsize='small')
+
+        ax = self.ax_creep
+        self.creep_line = ax.semilogx([1, 2], [0, 0], 'g-')[0]
+        ax.set_xlabel('concrete age t (days)')
+        ax.set_ylabel('phi(t, t0)')
+        ax.set_title('creep coefficient')
+
+        self.ax_text.axis('off')
+        self.text = self.ax_text.text(0, 1, '', va='top', family='monospace', fontsize='small')
+        self.title = self.fig.suptitle('')
+        self.fig.tight_layout(rect=(0, 0, 1, 0.95))  # once: the layout is kept between members
+
+    @staticmethod
+    def magnel_curves(section: ConcreteSection, Mi: float, Mf: float, dp) -> np.ndarray:
+        """limit values of 1/P along dp for the four fibre limits (initial top tension, initial bottom
+        compression, final top compression, final bottom tension). Stresses are linear in P:
+        stress = P * a(dp) + b, so each limit f gives 1/P = a(dp) / (f - b). Shape (4, len(dp))
+        :param Mi: external moment at the instant of prestress
+        :param Mf: external moment under service loads
+        """
+        conc = section.concrete
+        fibres = (
+            (section.stress_t, Mi, 0, conc.f_ctmt),
+            (section.stress_t, Mi, section.h, -0.45 * conc.f_ckt),
+            (section.stress, Mf, 0, -0.45 * conc.fck),
+            (section.stress, Mf, section.h, conc.f_ctm),
+        )
+        curves = []
+        for stress, M, y, f in fibres:
+            a = stress(-1.0, -dp, y)
+            b = stress(0.0, M, y)
+            curves.append(a / (f - b))
+        return np.array(curves)
+
+    def update(self, section: ConcreteSection, N: float, Mi: float, Mf: float, name: str = '') -> None:
+        """changes the data of every artist to the given member
+        :param N: normal force
+        :param Mi: whole moment at the instant of prestress
+        :param Mf: whole moment under service loads
+        """
+        conc = section.concrete
+        depth = np.array((0.0, section.h))
+        self.stress_lines['init'].set_data(section.stress_t(N, Mi, depth), depth)
+        self.stress_lines['final'].set_data(section.stress(N, Mf, depth), depth)
+        for line, f in zip(self.stress_limits, (conc.f_ctmt, -0.45 * conc.f_ckt, conc.f_ctm, -0.45 * conc.fck)):
+            line.set_xdata([f, f])
+
+        # external moments are the whole moments minus the prestress moment N * dp
+        dp = np.linspace(0.05 * section.h, 0.95 * section.h, self.n_points)
+        curves = self.magnel_curves(section, Mi - N * section.dp, Mf - N * section.dp, dp)
+        for line, curve in zip(self.magnel_lines, curves):
+            line.set_data(dp, np.where(np.isfinite(curve), curve, np.nan))
+        self.magnel_point.set_data([section.dp], [-1 / N if N else np.nan])
+
+        t0 = conc.t_0_cem
+        t = t0 + np.logspace(-1, np.log10(self.creep_time - t0), self.n_points)
+        self.creep_line.set_data(t, section.phi_time(t))
+
+        check = section.magnel_stress_limit(N, Mi, Mf)
+        self.text.set_text(f"N  = {N / 1E3:12.1f} kN\n"
+                           f"Mi = {Mi / 1E6:12.1f} kN*m\n"
+                           f"Mf = {Mf / 1E6:12.1f} kN*m\n"
+                           f"b x h = {section.b} x {section.h} mm\n"
+                           f"Ap = {section.Ap} mm2   dp = {section.dp} mm\n"
+                           f"fck = {conc.fck} MPa\n\n"
+                           f"magnel stress limits: {'OK' if check else 'NOT MET'}")
+        self.title.set_text(name)
+
+        for ax in (self.ax_stress, self.ax_magnel, self.ax_creep):
+            ax.relim()
+            ax.autoscale_view()
+        self.ax_stress.set_ylim(section.h, 0)
+
+    def render(self, path: str, section: ConcreteSection, N: float, Mi: float, Mf: float, name: str = '') -> str:
+        """updates the sheet and saves it. The format is taken from the path extension (png, pdf, svg...)"""
+        self.update(section, N, Mi, Mf, name)
+        self.fig.savefig(path)
+        return path
+
+
+# ---------------PROCESS POOL------------------------
+_renderer = None  # renderer of the current worker process
+
+
+def _init_worker(kwargs: dict) -> None:
+    global _renderer
+    _renderer = CalcSheetRenderer(**kwargs)
+
+
+def _render_job(job: tuple) -> str:
+    path, section, N, Mi, Mf, name = job
+    return _renderer.render(path, section, N, Mi, Mf, name)
+
+
+def render_batch(members, out_dir: str, fmt: str = 'png', workers: int = None, chunksize: int = 16,
+                 **kwargs) -> list:
+    """renders one calculation sheet per member. Returns the paths of the files written
+    :param members: iterable of (name, section, N, Mi, Mf) tuples
+    :param out_dir: output directory. Created if it does not exist
+    :param fmt: file format (png, pdf, svg...)
+    :param workers: number of processes. os.cpu_count() by default, 1 renders in this process
+    :param chunksize: members sent to a worker at a time
+    :param kwargs: CalcSheetRenderer parameters
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(os.path.join(out_dir, f'{name}.{fmt}'), section, N, Mi, Mf, name)
+            for name, section, N, Mi, Mf in members]
+
+    workers = workers if workers is not None else os.cpu_count()
+    if workers <= 1:
+        _init_worker(kwargs)
+        return [_render_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(kwargs,)) as pool:
+        return list(pool.map(_render_job, jobs, chunksize=chunksize))
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    from StructEng.Sections.class_RectConcSect import RectConcSect
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    N = -1350E3
+    members = []
+    for i in range(n):
+        section = RectConcSect(b=500, h=1000 + 10 * i, Ap=1000, dp=600 + 5 * i)
+        members.append((f'member_{i:04d}', section, N, 100E6 + N * section.dp, 500E6 + N * section.dp))
+
+    start = time.perf_counter()
+    render_batch(members, 'sheets')
+    print(f'{n} sheets in {time.perf_counter() - start:.2f} s')
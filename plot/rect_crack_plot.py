@@ -1,87 +1,42 @@
 # Import necessary libraries
-from math import log
 import numpy as np
 import matplotlib.pyplot as plt
-#from mpl_toolkits.mplot3d import Axes3D
 
-#from StructEng.Materials.class_Concrete import Concrete
-#define the concrete instance
-#concrete = Concrete(fck=40)
-# Define the component functions Ud_c, Ud_s1, Ud_s2, Ud_p as functions of eps and y
-fck = 35
-b=500
-h=1000
-d_s1=60
-d_s2=960
-d_p=800
-E_s=200E3
-E_p=195E3
-A_s1=500
-A_s2=2000
-A_p=1000
-M = 5
-def fctm():
-    if 0 < fck <= 50:
-        return 0.30 * pow(fck, 2 / 3)
-    elif fck > 50:
-        return 2.12 * log(1 + (fck + 8) * 0.1)
-    else:
-        raise ValueError
+from StructEng.Materials.class_Concrete import Concrete
+from StructEng.Sections.class_RectConcSect import RectConcSect
+from StructEng.Sections.class_CrackEquilibrium import CrackEquilibrium
 
-def Ecm():
-    return 22 * pow((fck + 8) * 0.1, 0.3) * 1E3
 
-def A(y):
-    return b*y
+def plot_eqM(ax, equilibrium: CrackEquilibrium, eps_lim: tuple = (-0.02, 0), y_lim: tuple = None, n: int = 100):
+    """plots the eqM surface of a section and its zero contour (states in equilibrium with M) on a 3d axis
+    :param ax: matplotlib 3d axis
+    :param equilibrium: CrackEquilibrium of the section to plot
+    :param n: number of points along each axis. 1000 is still interactive
+    """
+    EPS, Y, Z = equilibrium.surface(eps_lim, y_lim, n)
+    eps0, y0 = equilibrium.zero_contour(EPS, Y, Z)
 
-def Qx(y):
-    return b*pow(y,2)/2
+    # a surface with n x n facets is not interactive. Plot it downsampled, the contour is full resolution
+    step = max(1, n // 100)
+    ax.plot_surface(EPS[::step, ::step], Y[::step, ::step], Z[::step, ::step], cmap='viridis', alpha=0.8)
+    ax.plot(eps0, y0, np.zeros_like(eps0), 'r.', markersize=2)
 
-def Ix(y):
-    return b*pow(y,3)/3
-
-def k(eps,y):
-    E_cm = Ecm()
-    return (fctm()-eps*E_cm)/(y*E_cm)
-
-def Ud_c(eps, y):
-    return Ecm()*(eps*Qx(y) + k(eps,y)*Ix(y))
-
-def Ud_s1(eps, y):
-    return (eps + k(eps,y)*d_s1)*E_s*A_s1*d_s1
-
-def Ud_s2(eps,y):
-    return (eps + k(eps,y)*d_s2)*E_s*A_s2*d_s2
-
-def Ud_p(eps, y):
-    return (eps + k(eps,y)*d_p)*E_p*A_p*d_p
-
-# Define the constant M
-
-
-# Define the eqM function
-def eqM(eps, y):
-    return Ud_c(eps, y) + Ud_s1(eps, y) + Ud_s2(eps, y) + Ud_p(eps, y) + M
+    # Set labels
+    ax.set_xlabel('Eps')
+    ax.set_ylabel('Y')
+    ax.set_zlabel('eqM')
+    return eps0, y0
 
 
 if __name__ == '__main__':
-    # Create a meshgrid for eps and y
-    eps = np.linspace(-0.02, 0, 100)
-    y = np.linspace(h*.2, h, 100)
-    eps, y = np.meshgrid(eps, y)
-
-    # Compute eqM values
-    z = eqM(eps, y)
+    section = RectConcSect(concrete=Concrete(fck=35), b=500, h=1000, ds1=60, ds2=960, dp=800,
+                           As1=500, As2=2000, Ap=1000)
+    equilibrium = CrackEquilibrium(section, M=5)
 
     # Plotting
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
-    ax.plot_surface(eps, y, z, cmap='viridis')
-
-    # Set labels
-    ax.set_xlabel('Eps')
-    ax.set_ylabel('Y')
-    ax.set_zlabel('eqM')
+    plot_eqM(ax, equilibrium, n=1000)
 
     # Show plot
     plt.show()
@@ -1,12 +1,100 @@
-from PySide6.QtWidgets import (QMainWindow, QDockWidget, QListWidget, QTextEdit)
-from PySide6.QtGui import QIcon
+from PySide6.QtWidgets import (QMainWindow, QDockWidget, QListWidget, QTextEdit, QProgressBar, QLabel, QTableView)
+import numpy as np
+from PySide6.QtGui import QIcon, QAction
 from PySide6.QtCore import Qt
 
+import tasks
+from class_Worker import TaskRunner
+from class_StressPanel import LiveStressWidget
+from class_ArrayTableModel import ArrayTableModel
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle('QStress')
         self.setWindowIcon(QIcon('../png/logo/logo_rod.png'))
+
+        self.output = QTextEdit()
+        self.output.setReadOnly(True)
+        self.setCentralWidget(self.output)
+
+        # every calculation runs on the runner: the event loop never waits for it
+        self.runner = TaskRunner(self)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.status = QLabel('ready')
+        self.statusBar().addWidget(self.status, 1)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+
+        self.runner.progress.connect(self.progress_bar.setValue)
+        self.runner.result.connect(self.show_result)
+        self.runner.error.connect(self.show_error)
+        self.runner.busy.connect(self.set_busy)
+
+        self.stress_dock = QDockWidget('stresses', self)
+        self.stress_widget = LiveStressWidget(self.stress_dock)
+        self.stress_dock.setWidget(self.stress_widget)
+        self.addDockWidget(Qt.LeftDockWidgetArea, self.stress_dock)
+
+        # array results are shown through a model over the arrays, never as items
+        self.table_model = ArrayTableModel({}, parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
+        self.table.setSortingEnabled(True)
+        self.table_dock = QDockWidget('results', self)
+        self.table_dock.setWidget(self.table)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.table_dock)
+
+        # computations on the section of the stress panel
+        menu = self.menuBar().addMenu('compute')
+        self.compute_actions = {}
+        for name, slot in (('section report', self.section_report), ('creep history', self.creep_history)):
+            action = QAction(name, self)
+            action.triggered.connect(slot)
+            menu.addAction(action)
+            self.compute_actions[name] = action
         self.showMaximized()
 
+    def compute(self, fn, *args, **kwargs) -> None:
+        """runs fn in the background. A new call supersedes the one in progress. See tasks for fn"""
+        self.runner.submit(fn, *args, **kwargs)
+
+    def section_snapshot(self):
+        """copy of the stress panel section for a task. The panel keeps editing its own section meanwhile"""
+        section = self.stress_widget.section
+        return type(section).from_dict(section.to_dict())
+
+    def section_report(self) -> None:
+        self.compute(tasks.section_report, self.section_snapshot())
+
+    def creep_history(self) -> None:
+        """creep coefficient, strains and prestress loss of the stress panel section under its final loads,
+        from the prestress time to 100 years"""
+        N, _, Mf = self.stress_widget.loads()
+        section = self.section_snapshot()
+        times = np.geomspace(section.concrete.t_0_cem, 36500, 2000)
+        self.compute(tasks.creep_history, section, N, Mf, times)
+
+    def show_result(self, result) -> None:
+        """arrays and dicts of arrays go to the results table, anything else to the text view"""
+        if isinstance(result, np.ndarray):
+            result = {'value': result}
+        if isinstance(result, dict) and all(isinstance(v, np.ndarray) and v.ndim == 1 for v in result.values()):
+            self.table_model.set_columns(result)
+            self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        else:
+            self.output.setPlainText(str(result))
+
+    def show_error(self, error: str) -> None:
+        self.output.setPlainText(error)
+        self.status.setText('error')
+
+    def set_busy(self, busy: bool) -> None:
+        self.status.setText('computing...' if busy else 'ready')
+        if busy:
+            self.progress_bar.setValue(0)
+
+    def closeEvent(self, event) -> None:
+        self.runner.cancel()
+        super().closeEvent(event)
@@ -0,0 +1,118 @@
+import numpy as np
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class ArrayTableModel(QAbstractTableModel):
+    """table model over NumPy columns of equal length (section properties, margins, pass/fail...). Nothing is
+    copied into items: the view reads the arrays through an index array of the visible rows, so sorting is an
+    argsort of that index and filtering a boolean mask. Rows are handed to the view in batches through
+    canFetchMore() / fetchMore(), so a million rows cost no more than the ones scrolled through
+    """
+
+    def __init__(self, columns: dict, batch: int = 1000, parent=None):
+        super().__init__(parent)
+        self.batch = batch
+        self.names = []
+        self.columns = []
+        self.rows = None  # visible rows, in display order
+        self.fetched = 0
+        self.sort_key = None  # (column, order) applied after every filter
+        self.set_columns(columns)
+
+    def set_columns(self, columns: dict) -> None:
+        """new data. Every column is a 1d array of the same length"""
+        columns = {name: np.asarray(col) for name, col in columns.items()}
+        lengths = {len(col) for col in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError('every column must have the same length')
+        self.beginResetModel()
+        self.names = list(columns)
+        self.columns = list(columns.values())
+        self.rows = np.arange(lengths.pop() if lengths else 0)
+        self.fetched = min(self.batch, len(self.rows))
+        self.sort_key = None
+        self.endResetModel()
+
+    def __reset_rows(self, rows: np.ndarray) -> None:
+        self.beginResetModel()
+        self.rows = rows
+        self.fetched = min(self.batch, len(rows))
+        self.endResetModel()
+
+    # -----------LAZY FETCHING------------------------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.fetched
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self.fetched < len(self.rows)
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        count = min(self.batch, len(self.rows) - self.fetched)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.fetched, self.fetched + count - 1)
+        self.fetched += count
+        self.endInsertRows()
+
+    # -----------DATA------------------------
+    def value(self, row: int, column: int):
+        """value of a visible row"""
+        return self.columns[column][self.rows[row]]
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            value = self.value(index.row(), index.column())
+            if isinstance(value, np.bool_):
+                return 'pass' if value else 'fail'
+            if isinstance(value, np.floating):
+                return f'{value:.6g}'
+            return str(value)
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.names[section]
+        return str(self.rows[section])  # row number in the source arrays
+
+    # -----------SORTING AND FILTERING------------------------
+    def sort(self, column: int, order=Qt.AscendingOrder) -> None:
+        """sorts the visible rows. Stable, so sorting by several columns in turn works. A column out of range
+        (the view sends -1 to clear the sort indicator) restores the source order"""
+        if 0 <= column < len(self.columns):
+            self.sort_key = (column, order)
+            self.__reset_rows(self.__sorted(self.rows))
+        elif self.sort_key is not None:
+            self.sort_key = None
+            self.__reset_rows(np.sort(self.rows))
+
+    def __sorted(self, rows: np.ndarray) -> np.ndarray:
+        if self.sort_key is None:
+            return rows
+        column, order = self.sort_key
+        keys = self.columns[column][rows]
+        if order == Qt.DescendingOrder:
+            # reversing the stable ascending order of the reversed rows keeps ties in their original order
+            return rows[::-1][np.argsort(keys[::-1], kind='stable')][::-1]
+        return rows[np.argsort(keys, kind='stable')]
+
+    def set_filter(self, mask=None) -> None:
+        """shows only the rows where mask is True, keeping the current sort. None shows every row
+        :param mask: boolean array with one entry per source row
+        """
+        n = len(self.columns[0]) if self.columns else 0
+        rows = np.arange(n) if mask is None else np.flatnonzero(mask)
+        self.__reset_rows(self.__sorted(rows))
+
+    def filter_range(self, name: str, lo: float = -np.inf, hi: float = np.inf) -> None:
+        """shows only the rows with lo <= column <= hi"""
+        col = self.columns[self.names.index(name)]
+        self.set_filter((col >= lo) & (col <= hi))
@@ -0,0 +1,204 @@
+import time
+import numpy as np
+from PySide6.QtWidgets import (QWidget, QGridLayout, QVBoxLayout, QLabel, QSlider, QDoubleSpinBox)
+from PySide6.QtCore import Qt, QTimer, Signal
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+
+from StructEng.Materials.class_Concrete import Concrete
+from StructEng.Sections.class_RectConcSect import RectConcSect
+
+
+class ParameterPanel(QWidget):
+    """one slider and one spin box per parameter, kept in sync. Edits are collected and emitted together by
+    changed(dict) once the input has been idle for debounce_ms, with only the parameters that changed
+    """
+    changed = Signal(dict)
+    # name: (label, minimum, maximum, step, default)
+    parameters = {
+        'b': ('b (mm)', 100, 3000, 10, 500),
+        'h': ('h (mm)', 200, 3000, 10, 1000),
+        'Ap': ('Ap (mm2)', 0, 10000, 50, 1000),
+        'dp': ('dp (mm)', 50, 3000, 5, 800),
+        'fck': ('fck (MPa)', 20, 90, 1, 30),
+        'prestress_time': ('prestress time (days)', 1, 90, 1, 7),
+        'sigma_p': ('tendon stress (MPa)', 0, 1500, 10, 1000),
+        'Mi': ('Mi external (kN*m)', -5000, 5000, 10, 100),
+        'Mf': ('Mf external (kN*m)', -5000, 5000, 10, 500),
+    }
+
+    def __init__(self, parent: QWidget = None, debounce_ms: int = 40):
+        super().__init__(parent)
+        self.values = {name: p[4] for name, p in self.parameters.items()}
+        self.dirty = {}
+        self.spin_boxes = {}
+        self.sliders = {}
+
+        layout = QGridLayout(self)
+        for row, (name, (label, lo, hi, step, default)) in enumerate(self.parameters.items()):
+            spin = QDoubleSpinBox()
+            spin.setRange(lo, hi)
+            spin.setSingleStep(step)
+            spin.setDecimals(0)
+            spin.setValue(default)
+            slider = QSlider(Qt.Horizontal)
+            slider.setRange(0, int((hi - lo) / step))  # slider positions are steps from the minimum
+            slider.setValue(int((default - lo) / step))
+
+            slider.valueChanged.connect(lambda pos, n=name: self.__slider_moved(n, pos))
+            spin.valueChanged.connect(lambda value, n=name: self.__edited(n, value))
+            layout.addWidget(QLabel(label), row, 0)
+            layout.addWidget(slider, row, 1)
+            layout.addWidget(spin, row, 2)
+            self.spin_boxes[name] = spin
+            self.sliders[name] = slider
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self.__emit)
+
+    def __slider_moved(self, name: str, pos: int) -> None:
+        _, lo, _, step, _ = self.parameters[name]
+        self.spin_boxes[name].setValue(lo + pos * step)  # the spin box records the edit
+
+    def __edited(self, name: str, value: float) -> None:
+        _, lo, _, step, _ = self.parameters[name]
+        slider = self.sliders[name]
+        slider.blockSignals(True)
+        slider.setValue(int(round((value - lo) / step)))
+        slider.blockSignals(False)
+        if value != self.values[name]:
+            self.values[name] = value
+            self.dirty[name] = value
+        self.timer.start()  # restarts the idle time
+
+    def __emit(self) -> None:
+        if self.dirty:
+            dirty, self.dirty = self.dirty, {}
+            self.changed.emit(dirty)
+
+
+class StressCanvas(FigureCanvasQTAgg):
+    """stress diagram with blitting. Axes, grid and limit lines are drawn once into a cached background; the
+    stress curves are animated artists drawn over it. The background is only rendered again when the limits
+    or the axis ranges change
+    """
+
+    def __init__(self, parent: QWidget = None):
+        self.fig = Figure(figsize=(5, 6))
+        super().__init__(self.fig)
+        self.setParent(parent)
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_xlabel('stress (MPa)')
+        self.ax.set_ylabel('depth from top fibre (mm)')
+        self.ax.axvline(0, color='k', lw=0.5)
+        self.curves = {
+            'init': self.ax.plot([], [], 'b-', label='initial', animated=True)[0],
+            'final': self.ax.plot([], [], 'r-', label='final', animated=True)[0],
+        }
+        self.limits = [self.ax.axvline(0, color=c, ls=':', lw=0.8) for c in ('b', 'b', 'r', 'r')]
+        self.ax.legend(loc='lower right')
+        self.background = None
+        self.mpl_connect('draw_event', self.__cache_background)
+
+    def __cache_background(self, event) -> None:
+        self.background = self.copy_from_bbox(self.fig.bbox)
+        self.__draw_curves()
+
+    def __draw_curves(self) -> None:
+        for curve in self.curves.values():
+            self.ax.draw_artist(curve)
+
+    def set_limits(self, limits, h: float) -> None:
+        """stress limits (init tension, init compression, final tension, final compression) and depth. They
+        belong to the background, which is rendered again"""
+        for line, f in zip(self.limits, limits):
+            line.set_xdata([f, f])
+        lo, hi = min(limits), max(limits)
+        self.ax.set_xlim(lo - 0.2 * (hi - lo), hi + 0.2 * (hi - lo))
+        self.ax.set_ylim(h, 0)
+        self.background = None
+
+    def update_curves(self, changed: dict) -> None:
+        """new (stress, depth) data of the changed curves only
+        :param changed: curve name: (x, y)
+        """
+        for name, (x, y) in changed.items():
+            self.curves[name].set_data(x, y)
+
+        # a curve out of the x range needs a new background
+        x = np.concatenate([c.get_xdata() for c in self.curves.values()])
+        lo, hi = self.ax.get_xlim()
+        if x.size and (x.min() < lo or x.max() > hi):
+            span = x.max() - x.min()
+            self.ax.set_xlim(min(lo, x.min() - 0.1 * span), max(hi, x.max() + 0.1 * span))
+            self.background = None
+
+        if self.background is None:
+            self.draw()  # full render, the draw_event caches the background and draws the curves
+        else:
+            self.restore_region(self.background)
+            self.__draw_curves()
+            self.blit(self.fig.bbox)
+
+
+class LiveStressWidget(QWidget):
+    """parameter panel driving a stress diagram. Every edit updates the section through set() with only the
+    changed attributes and redraws only the curves it affects. The label shows the time spent per frame
+    """
+    section_keys = ('b', 'h', 'Ap', 'dp')
+    concrete_keys = ('fck', 'prestress_time')
+
+    def __init__(self, parent: QWidget = None):
+        super().__init__(parent)
+        self.panel = ParameterPanel(self)
+        self.canvas = StressCanvas(self)
+        self.frame_label = QLabel()
+
+        values = self.panel.values
+        # own concrete: set() must not modify the default concrete shared by other sections
+        self.concrete = Concrete(fck=values['fck'], prestress_time=values['prestress_time'])
+        self.section = RectConcSect(concrete=self.concrete, **{k: values[k] for k in self.section_keys})
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.canvas, 1)
+        layout.addWidget(self.panel)
+        layout.addWidget(self.frame_label)
+
+        self.panel.changed.connect(self.recompute)
+        self.recompute(dict(values))
+
+    def loads(self) -> tuple:
+        """(N, Mi, Mf) with whole moments from the top fibre"""
+        values = self.panel.values
+        N = -values['sigma_p'] * self.section.Ap
+        Mp = N * self.section.dp
+        return N, values['Mi'] * 1E6 + Mp, values['Mf'] * 1E6 + Mp
+
+    def recompute(self, changed: dict) -> None:
+        start = time.perf_counter()
+        section_kw = {k: v for k, v in changed.items() if k in self.section_keys}
+        concrete_kw = {k: v for k, v in changed.items() if k in self.concrete_keys}
+        if concrete_kw:
+            self.concrete.set(**concrete_kw)
+        if section_kw or concrete_kw:
+            self.section.set(**section_kw)  # also refreshes the modular ratios after a concrete change
+
+        conc = self.concrete
+        if concrete_kw or 'h' in section_kw:
+            self.canvas.set_limits((conc.f_ctmt, -0.45 * conc.f_ckt, conc.f_ctm, -0.45 * conc.fck), self.section.h)
+
+        # the initial curve does not depend on Mf nor the final one on Mi
+        N, Mi, Mf = self.loads()
+        depth = np.array((0.0, self.section.h))
+        curves = {}
+        if changed.keys() - {'Mf'}:
+            curves['init'] = (self.section.stress_t(N, Mi, depth), depth)
+        if changed.keys() - {'Mi'}:
+            curves['final'] = (self.section.stress(N, Mf, depth), depth)
+        self.canvas.update_curves(curves)
+
+        check = self.section.magnel_stress_limit(N, Mi, Mf)
+        self.frame_label.setText(f"frame {1E3 * (time.perf_counter() - start):.1f} ms    "
+                                 f"magnel stress limits: {'OK' if check else 'NOT MET'}")
@@ -0,0 +1,105 @@
+import traceback
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+
+class WorkerSignals(QObject):
+    """signals of a Worker. QRunnable is not a QObject, so it can not emit them itself"""
+    progress = Signal(int)  # percentage
+    result = Signal(object)
+    error = Signal(str)  # formatted traceback
+    finished = Signal()
+
+
+class Worker(QRunnable):
+    """runs fn(*args, **kwargs) on a QThreadPool thread. fn receives two more keyword arguments:
+    progress(percentage) to report its advance and cancelled() to poll for cancellation. A cancelled worker
+    does not emit its result. Signals are delivered to the GUI thread as queued connections
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancelled = False
+        self.setAutoDelete(False)  # the runner keeps a reference until finished is emitted
+
+    def cancel(self) -> None:
+        """asks fn to stop at its next cancelled() poll"""
+        self._cancelled = True
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @Slot()
+    def run(self) -> None:
+        try:
+            result = self.fn(*self.args, progress=self.signals.progress.emit, cancelled=self.cancelled,
+                             **self.kwargs)
+        except Exception:
+            if not self._cancelled:
+                self.signals.error.emit(traceback.format_exc())
+        else:
+            if not self._cancelled:
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class TaskRunner(QObject):
+    """coalesces computation requests of the GUI. Only one task runs at a time: a new request cancels the
+    running one and replaces any request still waiting, so rapid parameter edits compute only the latest one.
+    Results of superseded requests are never emitted
+    """
+    progress = Signal(int)
+    result = Signal(object)
+    error = Signal(str)
+    busy = Signal(bool)
+
+    def __init__(self, parent: QObject = None, pool: QThreadPool = None):
+        super().__init__(parent)
+        self.pool = pool if pool is not None else QThreadPool.globalInstance()
+        self.running: Worker = None
+        self.pending: Worker = None
+
+    def submit(self, fn, *args, **kwargs) -> Worker:
+        """queues fn(*args, **kwargs) as the latest request. See Worker for the signature of fn"""
+        worker = Worker(fn, *args, **kwargs)
+        worker.signals.progress.connect(lambda p, w=worker: self.__forward(w, self.progress, p))
+        worker.signals.result.connect(lambda r, w=worker: self.__forward(w, self.result, r))
+        worker.signals.error.connect(lambda e, w=worker: self.__forward(w, self.error, e))
+        worker.signals.finished.connect(lambda w=worker: self.__finished(w))
+
+        self.pending = worker
+        if self.running is None:
+            self.__start_pending()
+        else:
+            self.running.cancel()
+        return worker
+
+    def cancel(self) -> None:
+        """drops the waiting request and cancels the running one"""
+        self.pending = None
+        if self.running is not None:
+            self.running.cancel()
+
+    def is_busy(self) -> bool:
+        return self.running is not None
+
+    def __forward(self, worker: Worker, signal: Signal, value) -> None:
+        # a worker cancelled after emitting may still have queued signals. Only the current one gets through
+        if worker is self.running and not worker.cancelled():
+            signal.emit(value)
+
+    def __start_pending(self) -> None:
+        self.running, self.pending = self.pending, None
+        if self.running is None:
+            self.busy.emit(False)
+            return
+        self.busy.emit(True)
+        self.pool.start(self.running)
+
+    def __finished(self, worker: Worker) -> None:
+        if worker is self.running:
+            self.__start_pending()
@@ -1,13 +1,23 @@
 # two main APIs QT widgets and QML this course is about QT widgets
-from PySide6.QtWidgets import QApplication
+from PySide6.QtWidgets import QApplication, QSplashScreen
+from PySide6.QtGui import QPixmap
+import os
 import sys
-from class_buttonHolder import ButtonHolder
-from Main_Window import MainWindow
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # StructEng from the repo root
 
 if __name__ == "__main__":
   app = QApplication(sys.argv)
+  # the splash is shown before the heavy imports (numpy, matplotlib, StructEng) of the window modules
+  splash = QSplashScreen(QPixmap('../png/logo/logo_rod.png'))
+  splash.show()
+  splash.showMessage('loading...')
+  app.processEvents()
+
+  from Main_Window import MainWindow
   main_window = MainWindow()
   main_window.show()
+  splash.finish(main_window)
+  # from class_buttonHolder import ButtonHolder
   # window = ButtonHolder()
   # window.show()
   app.exec() #stat event loop
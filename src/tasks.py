@@ -0,0 +1,55 @@
+import numpy as np
+from StructEng.Sections.class_ConcreteSection import ConcreteSection
+
+"""
+computations run by the GUI on TaskRunner workers. Every task takes the progress(percentage) and cancelled()
+callables passed by Worker, works by chunks to poll them and returns None when cancelled
+"""
+
+
+def section_report(section: ConcreteSection, progress, cancelled) -> str:
+    """text summary of the section and its homogenized properties"""
+    hmg = section.hmgSection()
+    progress(100)
+    return str(section) + '\n' + '\n'.join(f'{key}: {value:.6g}' for key, value in hmg.items())
+
+
+def creep_history(section: ConcreteSection, N: float, M: float, times, progress, cancelled,
+                  chunk: int = 4096) -> dict:
+    """time history of the creep coefficient, the long term strains and the creep loss of prestress
+    :param N: quasi-permanent normal force
+    :param M: quasi-permanent whole moment
+    :param times: concrete ages (days)
+    :param chunk: times computed between two progress reports
+    """
+    times = np.asarray(times, dtype=float)
+    # instantaneous strains at top fibre, bottom fibre and tendons centroid. Creep scales them by (1 + phi)
+    eps = section.eps(N, M, np.array((0.0, section.h, section.tendons()[1])))
+    phi = np.empty_like(times)
+    for start in range(0, len(times), chunk):
+        if cancelled():
+            return None
+        t = times[start:start + chunk]
+        phi[start:start + chunk] = section.phi_time(t)
+        progress(int(100 * min(start + chunk, len(times)) / len(times)))
+
+    return {
+        't': times,
+        'phi': phi,
+        'eps_top': eps[0] * (1 + phi),
+        'eps_bottom': eps[1] * (1 + phi),
+        'loss': -section.prestress_steel.Ep * eps[2] * phi,  # same as section.creep_loss(), phi already known
+    }
+
+
+def magnel_sweep(section: ConcreteSection, N, Mi, Mf, progress, cancelled, chunk: int = 100000):
+    """magnel check of many load cases. Arrays of the same shape"""
+    N, Mi, Mf = (np.ravel(a).astype(float) for a in np.broadcast_arrays(N, Mi, Mf))
+    check = np.empty(N.shape, dtype=bool)
+    for start in range(0, len(N), chunk):
+        if cancelled():
+            return None
+        s = slice(start, start + chunk)
+        check[s] = section.magnel_check(N[s], Mi[s], Mf[s])
+        progress(int(100 * min(start + chunk, len(N)) / len(N)))
+    return check
@@ -0,0 +1,252 @@
+import unittest
+import numpy as np
+from StructEng.Beam import Beam, ConcBeam, Tendon
+from StructEng.Sections.class_RectConcSect import RectConcSect
+from StructEng.Sections.class_TConcSect import TConcSect
+
+
+class TestBeam(unittest.TestCase):
+    L = 12000
+    beam = Beam(L=L, n_stations=121)
+
+    def test_stations_created_correctly(self):
+        self.assertEqual(len(self.beam.x), 121)
+        self.assertEqual(self.beam.x[-1], self.L)
+        self.assertAlmostEqual(self.beam.w.sum(), self.L)
+
+    def test_uniform_load_moment_and_shear(self):
+        q = 20
+        M = self.beam.moment(q=q)
+        V = self.beam.shear(q=q)
+        np.testing.assert_allclose(M, q * self.beam.x * (self.L - self.beam.x) / 2, atol=1E-3)
+        np.testing.assert_allclose(V[:-1], q * (self.L / 2 - self.beam.x[:-1]), atol=1E-6)
+        self.assertAlmostEqual(V[-1], -q * self.L / 2)
+
+    def test_lumped_load_equals_uniform_load(self):
+        q = 20
+        lumped = self.beam.moment(q=np.full(self.beam.n_stations, q))
+        np.testing.assert_allclose(lumped, self.beam.moment(q=q), atol=1E-3)
+
+    def test_point_load_moment(self):
+        P = 100E3
+        M = self.beam.moment(point_loads=[(self.L / 2, P)])
+        self.assertAlmostEqual(M[60], P * self.L / 4)
+
+    def test_overhang_moment_at_support(self):
+        beam = Beam(L=self.L, n_stations=121, supports=(0, 10000))
+        M = beam.moment(point_loads=[(self.L, 10E3)])
+        self.assertAlmostEqual(M[100], -10E3 * 2000)
+        self.assertAlmostEqual(M[-1], 0)
+
+    def test_load_cases_are_batched(self):
+        q = np.array([[10.0], [20.0]]) * np.ones(self.beam.n_stations)
+        M = self.beam.moment(q=q)
+        self.assertEqual(M.shape, (2, self.beam.n_stations))
+        np.testing.assert_allclose(M[1], 2 * M[0])
+
+    def test_single_axle_envelope(self):
+        P = 100E3
+        env = self.beam.envelope(axles=[(0, P)])
+        x = self.beam.x
+        np.testing.assert_allclose(env['M_max'], P * x * (self.L - x) / self.L, atol=1E-3)
+        self.assertTrue(np.all(env['M_min'] >= -1E-6))
+
+    def test_train_envelope_matches_brute_force(self):
+        axles = ((0, 150E3), (1550, 150E3), (3730, 90E3))
+        env = self.beam.envelope(axles=axles, both_directions=False)
+        brute = np.full(self.beam.n_stations, -np.inf)
+        for front in np.arange(0, self.L + 3800, 10.0):
+            loads = [(front - a, P) for a, P in axles if 0 <= front - a <= self.L]
+            if loads:
+                brute = np.maximum(brute, self.beam.moment(point_loads=loads))
+        np.testing.assert_allclose(env['M_max'], brute, rtol=1E-3, atol=1E-3)
+
+    def test_lane_load_envelope(self):
+        q = 9
+        env = self.beam.envelope(lane_load=q)
+        np.testing.assert_allclose(env['M_max'], self.beam.moment(q=q), atol=1E-3)
+        # lane load on the positive part of the shear influence line at the left support (lumped at stations)
+        self.assertAlmostEqual(env['V_max'][0], q * self.L / 2, delta=q * self.L / 120)
+
+    def test_set_works_correctly(self):
+        beam = Beam(L=self.L)
+        beam.set(n_stations=11)
+        self.assertEqual(len(beam.x), 11)
+        with self.assertRaises(AttributeError):
+            beam.set(span=5)
+
+
+class TestContinuousBeam(unittest.TestCase):
+    L = 10000
+    beam = Beam(L=2 * L, n_stations=201, supports=(0, L, 2 * L))
+
+    def test_uniform_load_two_spans(self):
+        q = 10
+        np.testing.assert_allclose(self.beam.uniform_reactions() * q, (3 * q * self.L / 8, 10 * q * self.L / 8,
+                                                                     3 * q * self.L / 8))
+        self.assertAlmostEqual(self.beam.moment(q=q)[100] / (-q * pow(self.L, 2) / 8), 1)
+
+    def test_influence_line_reuses_factorization(self):
+        factor = self.beam.factorization()
+        IL_M, _ = self.beam.influence_lines()
+        self.assertIs(self.beam.factorization(), factor)
+        # maximum hogging ordinate at the interior support of two equal spans
+        self.assertAlmostEqual(IL_M[100].min() / self.L, -0.0962, places=4)
+        # symmetric spans give symmetric influence lines
+        self.assertAlmostEqual(IL_M[50, 150], IL_M[150, 50], places=4)
+
+    def test_train_effects_between_stations_match_a_direct_solve(self):
+        axles = ((0, 150E3), (1550, 100E3), (2525, 80E3))  # 0, 15.5 and 25.25 station spacings
+        for which, effect in ((0, self.beam.moment), (1, self.beam.shear)):
+            effects = self.beam.train_effects(axles, which)
+            for p in (60, 120, 180):  # first block: the front axle on station p
+                loads = [(p * 100.0 - a, P) for a, P in axles if p * 100.0 - a >= 0]
+                np.testing.assert_allclose(effects[:, p], effect(point_loads=loads), rtol=1E-9, atol=1E-3)
+
+    def test_supports_must_sit_on_stations(self):
+        with self.assertRaises(ValueError):
+            Beam(L=2 * self.L, n_stations=201, supports=(0, self.L + 50, 2 * self.L)).factorization()
+
+    def test_straight_tendon_hyperstatic_moment(self):
+        section = RectConcSect(b=400, h=1000, Ap=1500, dp=800)
+        P = 1000E3
+        tendon = Tendon(P0=P, P_inf=P, x=(0, 2 * self.L), dp=(800, 800))
+        beam = ConcBeam(section=section, tendon=tendon, L=2 * self.L, n_stations=201,
+                        supports=(0, self.L, 2 * self.L))
+        e = 800 - section.hmgSect['y_cen']
+        M1, M2 = beam.prestress_moments(P)
+        self.assertAlmostEqual(M1[30], -P * e)
+        self.assertAlmostEqual(M2[100] / (1.5 * P * e), 1, places=6)
+        self.assertAlmostEqual(M2[0], 0)
+
+    def test_determinate_beam_has_no_hyperstatic_moment(self):
+        beam = ConcBeam(L=self.L, n_stations=51)
+        self.assertTrue(np.all(beam.prestress_moments(1000E3)[1] == 0))
+
+
+class TestDeflection(unittest.TestCase):
+    L = 10000
+    section = RectConcSect(b=300, h=800, As2=1800, ds2=740)
+    beam = ConcBeam(section=section, tendon=Tendon(P0=0, P_inf=0), L=L, n_stations=201)
+
+    def test_uncracked_instantaneous_deflection(self):
+        q = 5
+        hmg = self.section.hmgSect
+        EI = self.section.concrete.E_cm * (hmg['I'] - pow(hmg['Q'], 2) / hmg['A'])
+        t0 = self.section.concrete.t_0_cem
+        v = self.beam.long_term_deflection(self.beam.moment(q=q), self.beam.moment(q=q), [t0])
+        self.assertAlmostEqual(v[0, 100] / (5 * q * pow(self.L, 4) / (384 * EI)), 1, places=4)
+        self.assertAlmostEqual(v[0, 0], 0)
+        self.assertAlmostEqual(v[0, -1], 0)
+
+    def test_creep_rescales_quasi_permanent_deflection(self):
+        Mf = self.beam.moment(q=5)
+        Mqp = self.beam.moment(q=2)
+        times = [100, 1000, 25550]
+        v = self.beam.long_term_deflection(Mf, Mqp, times)
+        phi = self.beam.creep_coefficients(times)[:, 0]
+        v_inst = self.beam.deflection(self.beam.curvature(0, Mf))
+        v_qp = self.beam.deflection(self.beam.curvature(0, Mqp))
+        np.testing.assert_allclose(v, v_inst + phi[:, None] * v_qp)
+        self.assertTrue(np.all(np.diff(v[:, 100]) > 0))
+
+    def test_cracked_stations_use_cracked_curvature(self):
+        Mf = self.beam.moment(q=40)
+        k = self.beam.curvature(0, Mf)
+        cracked = self.section.is_cracked(0, Mf)
+        self.assertTrue(cracked[100] and not cracked[0])
+        y0 = self.section.y0_cr(0, Mf[100])
+        self.assertAlmostEqual(k[100], self.section.k_cr(0, Mf[100], y0))
+        self.assertAlmostEqual(self.section.eps_cr(0, Mf[100], y0, y0), 0)
+        self.assertAlmostEqual(k[1], self.section.k(0, Mf[1]))
+
+    def test_crack_width_at_every_station(self):
+        Mf = np.stack([self.beam.moment(q=q) for q in (5, 40)])
+        w = self.beam.crack_width(Mf, phi=20, c=40)
+        self.assertEqual(w.shape, (2, 201))
+        self.assertTrue(np.all(w[0] == 0))
+        self.assertGreater(w[1, 100], 0)
+
+    def test_continuous_beam_deflection_is_zero_at_supports(self):
+        beam = ConcBeam(section=self.section, tendon=Tendon(P0=0, P_inf=0), L=2 * self.L, n_stations=201,
+                        supports=(0, self.L, 2 * self.L))
+        v = beam.long_term_deflection(beam.moment(q=5), beam.moment(q=2), [1000])
+        self.assertLess(abs(v[0, 100]), 1E-3 * v[0].max())
+        self.assertGreater(v[0, 42], 0)
+
+    def test_cracked_continuous_beam_deflection(self):
+        section = RectConcSect(b=300, h=800, As1=1800, As2=1800)
+        beam = ConcBeam(section=section, tendon=Tendon(P0=0, P_inf=0), L=2 * self.L, n_stations=201,
+                        supports=(0, self.L, 2 * self.L))
+        for q in (30, 60):
+            Mf = beam.moment(q=q)
+            self.assertTrue(section.is_cracked(0, Mf).any())
+            v = beam.long_term_deflection(Mf, beam.moment(q=0.6 * q), [28])[0]
+            np.testing.assert_allclose(v[[0, 100, 200]], 0, atol=1E-9)
+            np.testing.assert_allclose(v, v[::-1], atol=1E-9)
+            self.assertGreater(v[42], 0)
+
+        # every span deflects as a simply supported span with the same curvature
+        k = beam.curvature(0, beam.moment(q=60))
+        span = Beam(L=self.L, n_stations=101)
+        np.testing.assert_allclose(beam.deflection(k)[:101], span.deflection(k[:101]), atol=1E-9)
+
+
+class TestConcBeam(unittest.TestCase):
+    L = 20000
+    section = RectConcSect(b=400, h=1000, Ap=1500, dp=850, As2=1000, ds2=950)
+    tendon = Tendon.parabolic(L, 500, 850, P0=1800E3, P_inf=1500E3)
+    beam = ConcBeam(section=section, tendon=tendon, L=L, n_stations=201)
+
+    def test_tendon_profile(self):
+        self.assertAlmostEqual(self.tendon.dp_x(0), 500)
+        self.assertAlmostEqual(self.tendon.dp_x(self.L / 2), 850)
+
+    def test_stresses_match_section(self):
+        Mi = self.beam.moment(q=10)
+        Mf = self.beam.moment(q=25)
+        stresses = self.beam.stresses(Mi, Mf)
+        i = 60
+        dp = self.tendon.dp_x(self.beam.x[i])
+        self.assertAlmostEqual(stresses['init_top'][i], self.section.stress_t(-1800E3, Mi[i] - 1800E3 * dp, 0))
+        self.assertAlmostEqual(stresses['final_bottom'][i],
+                               self.section.stress(-1500E3, Mf[i] - 1500E3 * dp, self.section.h))
+
+    def test_magnel_check_matches_section(self):
+        beam = ConcBeam(section=self.section, L=self.L, n_stations=51,
+                        tendon=Tendon.parabolic(self.L, 500, 850, P0=1500E3, P_inf=1500E3))
+        Mi = beam.moment(q=10)
+        Mf = beam.moment(q=25)
+        check = beam.magnel_check(Mi, Mf)
+        for i in (0, 10, 25):
+            dp = beam.dp[i]
+            self.assertEqual(check[i], self.section.magnel_stress_limit(-1500E3, Mi[i] - 1500E3 * dp,
+                                                                        Mf[i] - 1500E3 * dp))
+
+    def test_varying_sections(self):
+        tsect = TConcSect(b=1200, h=1000, t=300, t1=150, t2=100, Ap=1500, dp=850)
+        beam = ConcBeam(section=[(0, self.L, self.section), (5000, 15000, tsect)], tendon=self.tendon,
+                        L=self.L, n_stations=201)
+        self.assertEqual(len(beam.groups), 2)
+        stresses = beam.stresses(0, beam.moment(q=25))
+        i = 100
+        dp = self.tendon.dp_x(beam.x[i])
+        self.assertAlmostEqual(stresses['final_top'][i],
+                               tsect.stress(-1500E3, beam.moment(q=25)[i] - 1500E3 * dp, 0))
+
+    def test_envelope_check(self):
+        Mi = self.beam.moment(q=10)
+        env = self.beam.envelope(axles=((0, 150E3), (1500, 150E3)))
+        check = self.beam.envelope_check(Mi, self.beam.moment(q=15), env)
+        self.assertEqual(check.shape, (201,))
+        expected = self.beam.magnel_check(Mi, self.beam.moment(q=15) + env['M_max']) & \
+            self.beam.magnel_check(Mi, self.beam.moment(q=15) + env['M_min'])
+        np.testing.assert_array_equal(check, expected)
+
+    def test_batched_load_cases_shape(self):
+        Mf = np.stack([self.beam.moment(q=q) for q in (10, 20, 30)])
+        self.assertEqual(self.beam.magnel_check(0, Mf).shape, (3, 201))
+
+
+if __name__ == '__main__':
+    unittest.main()
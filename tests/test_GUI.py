@@ -0,0 +1,203 @@
+import os
+import sys
+import threading
+import time
+import unittest
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')  # no display needed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from PySide6.QtCore import Qt, QThreadPool
+from PySide6.QtWidgets import QApplication
+from class_Worker import TaskRunner
+from class_StressPanel import LiveStressWidget
+from class_ArrayTableModel import ArrayTableModel
+from Main_Window import MainWindow
+from StructEng.Materials.class_PrestressSteel import PrestressSteel
+
+
+def process_events_until(condition, timeout: float = 5.0) -> bool:
+    """runs the Qt event loop until condition() is true. False on timeout"""
+    app = QApplication.instance() or QApplication([])
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+class TestTaskRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication([])
+        self.pool = QThreadPool()
+        self.runner = TaskRunner(pool=self.pool)
+        self.results, self.started = [], []
+        self.runner.result.connect(self.results.append)
+        self.gate = threading.Event()
+
+    def tearDown(self):
+        self.gate.set()
+        self.pool.waitForDone()
+
+    def task(self, value, progress, cancelled, poll: bool = True):
+        """returns value once the gate opens. Stops early when cancelled if poll"""
+        self.started.append(value)
+        while not self.gate.wait(0.001):
+            if poll and cancelled():
+                return None
+        return value
+
+    def test_only_the_latest_request_is_emitted(self):
+        self.runner.submit(self.task, 1)
+        self.assertTrue(process_events_until(lambda: self.started))
+        for value in (2, 3, 4):
+            self.runner.submit(self.task, value)
+        self.gate.set()
+        self.assertTrue(process_events_until(lambda: not self.runner.is_busy()))
+        self.assertEqual(self.results, [4])
+        self.assertEqual(self.started, [1, 4])  # the superseded requests never ran
+
+    def test_cancel_stops_delivery(self):
+        # the task ignores cancelled() and returns its value: the runner must drop it
+        self.runner.submit(self.task, 1, poll=False)
+        self.assertTrue(process_events_until(lambda: self.started))
+        self.runner.submit(self.task, 2)
+        self.runner.cancel()
+        self.gate.set()
+        self.assertTrue(process_events_until(lambda: not self.runner.is_busy()))
+        self.pool.waitForDone()
+        self.app.processEvents()
+        self.assertEqual(self.results, [])
+        self.assertEqual(self.started, [1])
+
+
+class RecordingStressWidget(LiveStressWidget):
+    """records the changes of every recompute"""
+
+    def __init__(self):
+        self.recomputed = []
+        super().__init__()
+
+    def recompute(self, changed: dict) -> None:
+        self.recomputed.append(changed)
+        super().recompute(changed)
+
+
+class TestLiveStressWidget(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication([])
+        self.widget = RecordingStressWidget()
+        self.widget.recomputed.clear()  # the initial full recompute
+
+    def test_edits_are_debounced_into_one_recompute(self):
+        spin_boxes, timer = self.widget.panel.spin_boxes, self.widget.panel.timer
+        for name, value in (('b', 600), ('h', 1200), ('b', 700), ('fck', 35), ('Mf', 0), ('Mf', 600)):
+            spin_boxes[name].setValue(value)
+        self.assertEqual(self.widget.recomputed, [])
+        self.assertTrue(process_events_until(lambda: self.widget.recomputed))
+        process_events_until(lambda: False, timeout=5 * timer.interval() / 1000)  # well past the debounce
+        self.assertEqual(self.widget.recomputed, [{'b': 700, 'h': 1200, 'fck': 35, 'Mf': 600}])
+        self.assertEqual((self.widget.section.b, self.widget.section.h, self.widget.concrete.fck), (700, 1200, 35))
+
+
+class TestArrayTableModel(unittest.TestCase):
+    n = 100000
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.columns = {'margin': rng.normal(size=self.n), 'case': np.arange(self.n) % 7,
+                        'ok': rng.random(self.n) > 0.3}
+        self.model = ArrayTableModel(self.columns, batch=1000)
+
+    def fetch_all(self) -> int:
+        """fetches every batch, returning the number of fetches"""
+        fetches = 0
+        while self.model.canFetchMore():
+            self.model.fetchMore()
+            fetches += 1
+        return fetches
+
+    def test_rows_are_fetched_in_batches(self):
+        self.assertEqual(self.model.rowCount(), 1000)
+        self.model.fetchMore()
+        self.assertEqual(self.model.rowCount(), 2000)
+        self.assertEqual(self.fetch_all(), 98)
+        self.assertEqual(self.model.rowCount(), self.n)
+        self.model.fetchMore()  # nothing left
+        self.assertEqual(self.model.rowCount(), self.n)
+
+    def test_sorting_permutes_the_index_only(self):
+        margin = self.columns['margin']
+        self.model.sort(0, Qt.DescendingOrder)
+        self.assertIs(self.model.columns[0], margin)  # no copy of the data
+        np.testing.assert_array_equal(np.sort(self.model.rows), np.arange(self.n))
+        np.testing.assert_array_equal(margin[self.model.rows], np.sort(margin)[::-1])
+        self.assertEqual(self.model.rowCount(), 1000)  # fetching starts again
+        self.assertEqual(self.model.value(0, 0), margin.max())
+
+        self.model.sort(1)  # stable: equal cases keep the descending margins
+        rows = self.model.rows
+        self.assertTrue(np.all(np.diff(self.columns['case'][rows]) >= 0))
+        same = self.columns['case'][rows[:-1]] == self.columns['case'][rows[1:]]
+        self.assertTrue(np.all(np.diff(margin[rows])[same] <= 0))
+        self.model.sort(-1)
+        np.testing.assert_array_equal(self.model.rows, np.arange(self.n))
+
+    def test_filter_mask_sets_the_row_count(self):
+        mask = self.columns['ok']
+        self.model.sort(0)
+        self.model.set_filter(mask)
+        self.assertEqual(self.model.rowCount(), 1000)
+        self.fetch_all()
+        self.assertEqual(self.model.rowCount(), np.count_nonzero(mask))
+        self.assertTrue(np.all(mask[self.model.rows]))
+        self.assertTrue(np.all(np.diff(self.columns['margin'][self.model.rows]) >= 0))  # still sorted
+
+        self.model.filter_range('margin', -0.5, 0.5)
+        self.fetch_all()
+        inside = np.abs(self.columns['margin']) <= 0.5
+        self.assertEqual(self.model.rowCount(), np.count_nonzero(inside))
+        self.model.set_filter(np.zeros(self.n, dtype=bool))
+        self.assertEqual(self.model.rowCount(), 0)
+        self.assertFalse(self.model.canFetchMore())
+
+
+
+class TestMainWindow(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication([])
+        self.window = MainWindow()
+
+    def tearDown(self):
+        self.window.close()
+        QThreadPool.globalInstance().waitForDone()
+
+    def trigger(self, name: str) -> None:
+        self.window.compute_actions[name].trigger()
+        self.assertTrue(process_events_until(lambda: not self.window.runner.is_busy(), timeout=30))
+
+    def test_section_report_action(self):
+        self.trigger('section report')
+        self.assertIn('Ixo', self.window.output.toPlainText())
+
+    def test_creep_history_action_uses_every_tendon(self):
+        section = self.window.stress_widget.section
+        section.set(layers=((500, 950, PrestressSteel()),))
+        self.trigger('creep history')
+        model = self.window.table_model
+        self.assertEqual(model.names, ['t', 'phi', 'eps_top', 'eps_bottom', 'loss'])
+        t, loss = model.columns[0], model.columns[-1]
+        self.assertAlmostEqual(t[0], section.concrete.t_0_cem)
+        N, _, Mf = self.window.stress_widget.loads()
+        np.testing.assert_allclose(loss[::500], section.creep_loss(N, Mf, t[::500]))
+        self.assertNotEqual(section.tendons()[1], section.dp)
+
+
+if __name__ == '__main__':
+    unittest.main()
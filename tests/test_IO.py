@@ -0,0 +1,173 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from StructEng.Materials.class_Concrete import Concrete
+from StructEng.Materials.class_PrestressSteel import PrestressSteel
+from StructEng.Sections.class_RectConcSect import RectConcSect
+from StructEng.Sections.class_TConcSect import TConcSect
+from StructEng.IO.class_Project import Project
+from StructEng.IO.class_SectionBatch import SectionBatch
+from StructEng.IO.class_ResultCache import ResultCache
+
+
+class TestSerialization(unittest.TestCase):
+
+    def test_concrete_round_trip(self):
+        concrete = Concrete(fck=45, cem_type='R', HR=60)
+        other = Concrete.from_dict(concrete.to_dict())
+        self.assertEqual(concrete.__dict__, other.__dict__)
+
+    def test_section_round_trip(self):
+        sect = TConcSect(concrete=Concrete(fck=40), t=300, h=1200, Ap=800, dp=1000)
+        other = TConcSect.from_dict(sect.to_dict())
+        self.assertEqual(other.geometry(), sect.geometry())
+        self.assertEqual(other.hmgSect, sect.hmgSect)
+        self.assertEqual(other.concrete.fck, 40)
+
+
+class TestProject(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'project.zip')
+        concrete = Concrete(fck=40)
+        self.project = Project(
+            sections={'rect': RectConcSect(concrete=concrete, b=400, Ap=1000),
+                      'tee': TConcSect(concrete=concrete, t=300)},
+            results={'margins': np.arange(8 * 50, dtype=float).reshape(8, 50),
+                     'check': np.array([True, False, True])},
+            metadata={'author': 'test'})
+        self.project.save(self.path)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_sections_and_shared_materials_are_restored(self):
+        project = Project.open(self.path)
+        self.assertEqual(project.sections['rect'].hmgSect, self.project.sections['rect'].hmgSect)
+        self.assertIs(project.sections['rect'].concrete, project.sections['tee'].concrete)
+        self.assertEqual(project.metadata, {'author': 'test'})
+
+    def test_results_are_memory_mapped(self):
+        project = Project.open(self.path)
+        self.assertIsInstance(project.results['margins'], np.memmap)
+        np.testing.assert_array_equal(project.results['margins'], self.project.results['margins'])
+        np.testing.assert_array_equal(project.results['check'], self.project.results['check'])
+
+    def test_reinforcement_layers_are_restored(self):
+        sect = RectConcSect(b=400, Ap=700, layers=[(560, 900, PrestressSteel(Ep=190E3)),
+                                                   (140, 900, PrestressSteel(), False)])
+        path = os.path.join(self.dir.name, 'layers.zip')
+        Project(sections={'rect': sect}).save(path)
+        other = Project.open(path).sections['rect']
+        self.assertEqual(other.rebar, sect.rebar)
+        self.assertEqual(other.hmgSect, sect.hmgSect)
+
+    def test_partial_loading(self):
+        project = Project.open(self.path, sections=['tee'], results=(), mmap=False)
+        self.assertEqual(list(project.sections), ['tee'])
+        self.assertEqual(project.results, {})
+
+    def test_not_a_project_raises(self):
+        import zipfile
+        with zipfile.ZipFile(self.path, 'w') as zf:
+            zf.writestr('model.json', '{"format": "other"}')
+        with self.assertRaises(ValueError):
+            Project.open(self.path)
+
+
+class TestSectionBatch(unittest.TestCase):
+    rows = np.array([
+        # b, h, Ap, dp, fck, N, Mi, Mf
+        [500, 1000, 1000, 850, 30, -1000E3, 100E6 - 850E6, 500E6 - 850E6],
+        [400, 1200, 1500, 1050, 40, -1500E3, 100E6 - 1575E6, 900E6 - 1575E6],
+        [500, 1000, 1000, 850, 30, -1000E3, 100E6 - 850E6, 2000E6 - 850E6],
+        [300, 800, 500, 700, 35, -500E3, 50E6 - 350E6, 200E6 - 350E6],
+        [600, 1500, 2000, 1350, 40, -2000E3, 300E6 - 2700E6, 1500E6 - 2700E6],
+    ])
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.dir.name, 'in.csv')
+        self.target = os.path.join(self.dir.name, 'out.csv')
+        with open(self.source, 'w') as f:
+            f.write('b,h,Ap,dp,fck,N,Mi,Mf\n')
+            np.savetxt(f, self.rows, delimiter=',')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_chunked_run_matches_row_by_row_checks(self):
+        for name, cls in SectionBatch.section_types.items():
+            summary = SectionBatch(name, chunk=2).run(self.source, self.target)
+            out = np.loadtxt(self.target, delimiter=',', skiprows=1)
+            self.assertEqual(summary['rows'], len(self.rows))
+            np.testing.assert_array_equal(out[:, 0], np.arange(len(self.rows)))
+            for i, (b, h, Ap, dp, fck, N, Mi, Mf) in enumerate(self.rows):
+                section = cls(concrete=Concrete(fck=fck), b=b, h=h, Ap=Ap, dp=dp)
+                self.assertEqual(bool(out[i, -1]), section.magnel_stress_limit(N, Mi, Mf))
+                self.assertAlmostEqual(out[i, 1] / section.hmgSect['A'], 1, places=5)
+            self.assertEqual(summary['failed'], int((out[:, -1] == 0).sum()))
+
+    def test_workers_and_npy_output_match_the_serial_run(self):
+        serial = SectionBatch(chunk=2).check(self.read_all())
+        directory = os.path.join(self.dir.name, 'npy')
+        summary = SectionBatch(chunk=2).run(self.source, directory, workers=2, fmt='npy')
+        self.assertEqual(summary, {'rows': len(self.rows), 'failed': int((~serial['ok']).sum())})
+        for name in SectionBatch.output_columns:
+            column = np.load(os.path.join(directory, f'{name}.npy'))
+            self.assertEqual(column.dtype, serial[name].dtype, name)
+            np.testing.assert_array_equal(column, serial[name], err_msg=name)
+        with self.assertRaises(ValueError):
+            SectionBatch().run(self.source, self.target, fmt='parquet')
+
+    def read_all(self) -> dict:
+        with open(self.source) as f:
+            return next(SectionBatch(chunk=len(self.rows)).read(f))
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(directory=self.dir.name)
+        self.calls = 0
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def loss(self, section, t):
+        self.calls += 1
+        return {'loss': section.creep_loss(-1000E3, -850E6, t)}
+
+    def test_key_is_canonical(self):
+        t = np.linspace(10, 1000, 5)
+        key = ResultCache.key('loss', section=RectConcSect(concrete=Concrete(fck=35)), t=t)
+        self.assertEqual(key, ResultCache.key('loss', t=t.copy(), section=RectConcSect(concrete=Concrete(fck=35.0))))
+        self.assertNotEqual(key, ResultCache.key('loss', section=RectConcSect(concrete=Concrete(fck=40)), t=t))
+        self.assertNotEqual(key, ResultCache.key('loss', section=RectConcSect(concrete=Concrete(fck=35)), t=t[:4]))
+
+    def test_unchanged_inputs_are_not_computed_again(self):
+        t = np.linspace(10, 1000, 5)
+        first = self.cache.compute('loss', self.loss, section=RectConcSect(Ap=1000), t=t)
+        second = ResultCache(directory=self.dir.name).compute('loss', self.loss, section=RectConcSect(Ap=1000), t=t)
+        self.assertEqual(self.calls, 1)
+        np.testing.assert_array_equal(first['loss'], second['loss'])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        a, b, c = (ResultCache.key('x', i=i) for i in range(3))
+        for key in (a, b):
+            self.cache.put(key, {'v': np.zeros(1000)})
+        os.utime(self.cache.path(a), (1, 1))
+        os.utime(self.cache.path(b), (2, 2))
+        self.cache.get(a)  # a becomes the most recently used
+        self.cache.max_bytes = int(2.5 * os.path.getsize(self.cache.path(a)))
+        self.cache.put(c, {'v': np.zeros(1000)})
+        self.assertIsNotNone(self.cache.get(a))
+        self.assertIsNone(self.cache.get(b))
+        self.assertIsNotNone(self.cache.get(c))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+from StructEng.Loads.class_Action import Action
+from StructEng.Loads.class_LoadCombination import LoadCombination
+from StructEng.Sections.class_RectConcSect import RectConcSect
+
+
+class TestAction(unittest.TestCase):
+
+    def test_default_factors_depend_on_kind(self):
+        self.assertEqual((Action().gamma_sup, Action().gamma_inf), (1.35, 1.0))
+        self.assertEqual(Action(kind='variable').gamma_inf, 0.0)
+        self.assertEqual(Action(kind='variable', gamma_sup=1.35).gamma_sup, 1.35)
+
+    def test_invalid_kind_raises(self):
+        with self.assertRaises(ValueError):
+            Action(kind='accidental')
+
+
+class TestLoadCombination(unittest.TestCase):
+    actions = [Action(name='G'), Action(name='P', kind='prestress'),
+               Action(name='Q1', kind='variable', psi0=0.7, psi1=0.5, psi2=0.3),
+               Action(name='Q2', kind='variable', psi0=0.6, psi1=0.2, psi2=0.0)]
+
+    def test_uls_coefficients(self):
+        C = LoadCombination(self.actions, 'ULS').C
+        rows = {tuple(r) for r in C}
+        self.assertIn((1.35, 1.0, 1.5, 1.5 * 0.6), rows)
+        self.assertIn((1.35, 1.0, 1.5 * 0.7, 1.5), rows)
+        self.assertIn((1.0, 1.0, 0.0, 0.0), rows)
+        self.assertNotIn((1.35, 1.0, 1.5, 1.5), rows)
+
+    def test_quasi_permanent_coefficients(self):
+        C = LoadCombination(self.actions, 'quasi-permanent').C
+        self.assertEqual(C[:, 2].max(), 0.3)
+        self.assertEqual(C[:, 3].max(), 0.0)
+
+    def test_apply_is_a_matrix_product(self):
+        combination = LoadCombination(self.actions, 'characteristic')
+        effects = np.random.default_rng(0).normal(size=(4, 7, 3))
+        combined = combination.apply(effects)
+        self.assertEqual(combined.shape, (len(combination), 7, 3))
+        np.testing.assert_allclose(combined[-1], np.einsum('a,aij->ij', combination.C[-1], effects))
+        with self.assertRaises(ValueError):
+            combination.apply(effects[:3])
+
+    def test_magnel_loads_feed_section_check(self):
+        section = RectConcSect(b=500, h=1000, Ap=1000, dp=600)
+        combination = LoadCombination(self.actions, 'characteristic')
+        N = np.array([0, -1350E3, 0, 0])
+        M = np.array([100E6, -1350E3 * 600, 300E6, 100E6])
+        Ni, Mi, N_f, Mf = combination.magnel_loads(N, M)
+        self.assertEqual(Ni.shape, Mi.shape)
+        self.assertTrue(np.all(Mi == 100E6 - 1350E3 * 600))
+        check = section.magnel_check(Ni, Mi, Mf, N_f)
+        for i in range(len(combination)):
+            self.assertEqual(check[i], np.all(section.magnel_margins(Ni[i], Mi[i], Mf[i], N_f[i]) > 0))
+
+    def test_initial_loads_use_unit_factors(self):
+        actions = [Action(name='G'), Action(name='P', kind='prestress', r_sup=1.1, r_inf=0.9),
+                   Action(name='Q', kind='variable', psi0=0.7)]
+        combination = LoadCombination(actions, 'characteristic')
+        N = np.array([0, -1350E3, -100E3])
+        M = np.array([100E6, -1350E3 * 600, 300E6])
+        Ni, Mi, N_f, Mf = combination.magnel_loads(N, M)
+        self.assertTrue(np.all(Ni == -1350E3))
+        self.assertTrue(np.all(Mi == 100E6 - 1350E3 * 600))
+        np.testing.assert_allclose(np.unique(N_f), np.unique(combination.C @ N))
+        self.assertIn(-1.1 * 1350E3 - 100E3, N_f)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,8 @@ import unittest
 from math import exp, log, sqrt
 import numpy as np
 from StructEng.Materials.class_Concrete import Concrete
+from StructEng.Materials.class_CreepGrid import CreepGrid
+from StructEng.Sections.class_RectConcSect import RectConcSect
 
 
 class TestConcrete(unittest.TestCase):
@@ -115,6 +117,10 @@ class TestConcrete(unittest.TestCase):
                                                         * self.default_concrete.E_cm)
         self.assertEqual(self.concrete.E_cmt, pow(self.concrete.f_cmt / self.concrete.fcm(), 0.3) * self.concrete.E_cm)
 
+    def test_Ecm_age_returns_correct_value(self):
+        self.assertAlmostEqual(self.concrete.Ecm_age(self.concrete.prestress_time), self.concrete.E_cmt)
+        self.assertAlmostEqual(self.concrete.Ecm_age(28), self.concrete.E_cm)
+
     def test_eps_c2_returns_correctly(self):
         self.concrete.set(fck=50)
         self.assertTrue(self.concrete.epsilon_c2 == 0.002)
@@ -248,4 +254,64 @@ class TestConcrete(unittest.TestCase):
         self.concrete.set(sigma_c=35, temperature_dependent=False)
         phi_nl = self.concrete.phi_time(self.concrete.delayed_effects_time, self.concrete.t_0_cem) * exp(1.5 * (self.concrete.sigma_c / self.concrete.f_ckt - 0.45))
         self.assertEqual(self.concrete.phi_non_lin(self.concrete.delayed_effects_time, self.concrete.t_0_cem), phi_nl)
-        self.concrete.set(sigma_c=0)
\ No newline at end of file
+        self.concrete.set(sigma_c=0)
+
+    def test_creep_factors_cached_per_h0(self):
+        concrete = Concrete(fck=40, HR=60)
+        factors = concrete.creep_factors(250)
+        self.assertIs(concrete.creep_factors(250), factors)
+        self.assertEqual(factors, (concrete.phiHR(250), concrete.Bfcm(), concrete.B_H(250)))
+        self.assertNotEqual(concrete.phi_time(1000, 28, 250), concrete.phi_time(1000, 28, 500))
+        concrete.set(HR=80)
+        self.assertNotEqual(concrete.creep_factors(250), factors)
+
+    def test_creep_of_array_sections(self):
+        b, h = np.array([300., 400., 600.]), np.array([900., 1000., 3000.])
+        sect = RectConcSect(b=b, h=h, Ap=1000)
+        for i in range(3):
+            scalar = RectConcSect(b=b[i], h=h[i], Ap=1000)
+            self.assertAlmostEqual(sect.phi_time(10000)[i], scalar.phi_time(10000))
+            self.assertAlmostEqual(sect.creep_loss(-1E6, 200E6, 10000)[i], scalar.creep_loss(-1E6, 200E6, 10000))
+
+
+class TestInternedConcrete(unittest.TestCase):
+
+    def test_equal_parameters_share_instance(self):
+        self.assertIs(Concrete.interned(fck=35), Concrete.interned(fck=35.0, HR=25))
+        self.assertIsNot(Concrete.interned(fck=35), Concrete.interned(fck=40))
+        self.assertEqual(Concrete.interned(fck=35).f_ctm, Concrete(fck=35).f_ctm)
+
+    def test_interned_concrete_is_frozen(self):
+        with self.assertRaises(AttributeError):
+            Concrete.interned(fck=45).set(fck=50)
+        with self.assertRaises(AttributeError):
+            Concrete.interned(fc=45)
+
+
+class TestCreepGrid(unittest.TestCase):
+    grid = CreepGrid(fck=(30, 40), HR=(50, 70), h0=np.geomspace(100, 1000, 9), t0=np.geomspace(3, 90, 9))
+
+    def test_nodes_are_exact(self):
+        concrete = Concrete(fck=40, HR=50)
+        h0, t0 = self.grid.nodes['h0'][3], self.grid.nodes['t0'][5]
+        tau = self.grid.nodes['tau'][20]
+        self.assertAlmostEqual(self.grid(t0 + tau, t0, h0, 40, 50), concrete.phi_time(t0 + tau, t0, h0), places=10)
+
+    def test_interpolation_error_is_reported(self):
+        error = self.grid.max_error(n=500)
+        self.assertLess(error['rel'], 0.05)
+        self.assertGreater(error['abs'], 0)
+
+    def test_before_loading_is_zero_and_single_node_axes_optional(self):
+        grid = CreepGrid(h0=(300,), t0=(7,))
+        self.assertEqual(grid(5, 7), 0)
+        self.assertAlmostEqual(float(grid(1000, 7)), Concrete().phi_time(1000, 7, 300), places=2)
+        with self.assertRaises(ValueError):
+            self.grid(1000, 7)
+
+    def test_values_off_a_single_node_axis_raise(self):
+        sect = RectConcSect(concrete=Concrete(fck=50, HR=80), b=400, h=1000)
+        with self.assertRaises(ValueError):
+            sect.phi_time(10000, grid=CreepGrid())
+        grid = CreepGrid(fck=(30, 50), HR=(50, 80))
+        self.assertAlmostEqual(float(sect.phi_time(10000, grid=grid)) / float(sect.phi_time(10000)), 1, places=2)
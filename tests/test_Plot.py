@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from matplotlib.image import imread
+from StructEng.Sections.class_RectConcSect import RectConcSect
+from plot.calc_sheet import CalcSheetRenderer, render_batch
+
+
+class TestCalcSheet(unittest.TestCase):
+    section = RectConcSect(b=500, h=1000, Ap=1000, dp=600)
+    N = -1350E3
+
+    def test_artists_are_reused_between_members(self):
+        renderer = CalcSheetRenderer(dpi=30)
+        lines = list(renderer.ax_magnel.lines)
+        renderer.update(self.section, self.N, 100E6 + self.N * 600, 500E6 + self.N * 600)
+        first = renderer.magnel_lines[0].get_ydata().copy()
+        renderer.update(self.section, self.N, 200E6 + self.N * 600, 600E6 + self.N * 600)
+        self.assertEqual(lines, list(renderer.ax_magnel.lines))
+        self.assertFalse(np.allclose(first, renderer.magnel_lines[0].get_ydata()))
+
+    def test_magnel_curves_reach_the_stress_limits(self):
+        # a prestress P = 1 / curve at depth dp brings the fibre to its stress limit
+        Mi, Mf, dp = 100E6, 500E6, 700.0
+        sect, conc = self.section, self.section.concrete
+        P = 1 / CalcSheetRenderer.magnel_curves(sect, Mi, Mf, np.array([dp]))[:, 0]
+        self.assertAlmostEqual(sect.stress_t(-P[0], Mi - P[0] * dp, 0), conc.f_ctmt)
+        self.assertAlmostEqual(sect.stress_t(-P[1], Mi - P[1] * dp, sect.h), -0.45 * conc.f_ckt)
+        self.assertAlmostEqual(sect.stress(-P[2], Mf - P[2] * dp, 0), -0.45 * conc.fck)
+        self.assertAlmostEqual(sect.stress(-P[3], Mf - P[3] * dp, sect.h), conc.f_ctm)
+
+    def test_render_batch_writes_every_sheet(self):
+        members = [(f'm{i}', self.section, self.N, 100E6 + self.N * 600, 500E6 + self.N * 600) for i in range(3)]
+        with tempfile.TemporaryDirectory() as out:
+            paths = render_batch(members, out, fmt='pdf', workers=1, dpi=30)
+            self.assertEqual(len(paths), 3)
+            self.assertTrue(all(os.path.getsize(p) > 0 for p in paths))
+
+    def test_process_pool_matches_sequential_rendering(self):
+        members = [(f'm{i}', self.section, self.N, (100 + 50 * i) * 1E6 + self.N * 600, 500E6 + self.N * 600)
+                   for i in range(4)]
+        with tempfile.TemporaryDirectory() as serial, tempfile.TemporaryDirectory() as pooled:
+            expected = render_batch(members, serial, fmt='png', workers=1, dpi=30)
+            paths = render_batch(members, pooled, fmt='png', workers=2, chunksize=1, dpi=30)
+            self.assertEqual([os.path.basename(p) for p in paths], [os.path.basename(p) for p in expected])
+            for path, reference in zip(paths, expected):
+                self.assertTrue(os.path.isfile(path))
+                np.testing.assert_array_equal(imread(path), imread(reference))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+from scipy import stats
+from StructEng.Materials.class_Concrete import Concrete
+from StructEng.Sections.class_RectConcSect import RectConcSect
+from StructEng.Reliability.class_MonteCarlo import MonteCarlo
+from StructEng.Reliability.class_SectionLimitStates import SampledConcrete, SectionLimitStates
+
+
+def resistance_minus_load(x):
+    return {'g': x['R'] - x['S']}
+
+
+class TestMonteCarlo(unittest.TestCase):
+    variables = {'R': stats.norm(10, 1), 'S': stats.norm(5, 1)}
+    pf = stats.norm.cdf(-5 / np.sqrt(2))  # 2.03E-4
+
+    def test_methods_match_the_exact_probability(self):
+        for method, n in (('mc', 400000), ('lhs', 400000), ('importance', 20000)):
+            result = MonteCarlo(resistance_minus_load, self.variables, method=method).run(n)['g']
+            self.assertLess(abs(result['pf'] - self.pf), 4 * result['std'], method)
+
+    def test_importance_sampling_reduces_the_error(self):
+        mc = MonteCarlo(resistance_minus_load, self.variables).run(20000)['g']
+        importance = MonteCarlo(resistance_minus_load, self.variables, method='importance').run(20000)['g']
+        self.assertLess(importance['cov'], mc['cov'] / 5)
+        self.assertAlmostEqual(importance['beta'], 5 / np.sqrt(2), places=1)
+
+    def test_design_point_of_a_rare_failure(self):
+        variables = {'R': stats.norm(10, 1), 'S': stats.norm(4, 1)}  # beta 4.24, no failures in the pilot
+        monte_carlo = MonteCarlo(resistance_minus_load, variables, method='importance')
+        np.testing.assert_allclose(monte_carlo.design_point(), (-3, 3), atol=1E-6)
+        result = monte_carlo.run(20000)['g']
+        self.assertLess(abs(result['pf'] - stats.norm.cdf(-6 / np.sqrt(2))), 4 * result['std'])
+
+    def test_result_does_not_depend_on_workers(self):
+        serial = MonteCarlo(resistance_minus_load, self.variables, chunk=30000).run(100000)
+        parallel = MonteCarlo(resistance_minus_load, self.variables, chunk=30000, workers=2).run(100000)
+        self.assertEqual(serial, parallel)
+
+    def test_fixed_variables_and_bad_input(self):
+        result = MonteCarlo(resistance_minus_load, {'R': stats.norm(10, 1), 'S': 7.0}).run(100000)['g']
+        self.assertLess(abs(result['pf'] - stats.norm.cdf(-3)), 4 * result['std'])
+        with self.assertRaises(ValueError):
+            MonteCarlo(resistance_minus_load, self.variables, method='quasi')
+        with self.assertRaises(ValueError):
+            MonteCarlo(resistance_minus_load, self.variables, method='importance', shift=(1.0,))
+
+
+class TestSectionLimitStates(unittest.TestCase):
+    section = RectConcSect(b=400, h=1000, Ap=1400, As2=1000, dp=850, ds2=950)
+
+    def test_sampled_concrete_matches_concrete(self):
+        sampled = SampledConcrete(Concrete(), np.array((30.0, 60.0)))
+        for i, fck in enumerate((30, 60)):
+            concrete = Concrete(fck=fck)
+            for name in ('f_cm', 'f_ckt', 'f_ctm', 'f_ctmt', 'E_cm', 'E_cmt'):
+                self.assertAlmostEqual(getattr(sampled, name)[i], getattr(concrete, name), msg=name)
+
+    def test_limit_states_match_the_section(self):
+        limit_states = SectionLimitStates(self.section)
+        Mg, Mq = np.array((300E6, 500E6)), np.array((200E6, 400E6))
+        g = limit_states({'Mg': Mg, 'Mq': Mq, 'loss': 0.0, 'theta_creep': 0.0})
+        N = -1400 * limit_states.values['sigma_p0']
+        margins = self.section.magnel_margins(N, Mg + N * 850, Mg + Mq + N * 850)
+        np.testing.assert_allclose(g['magnel'], margins.min(axis=0))
+
+        Fp, Fs = 1400 * 1860, 1000 * 500
+        x = (Fp + Fs) / (0.68 * 30 * 400)
+        np.testing.assert_allclose(g['bending'], Fp * (850 - 0.4 * x) + Fs * (950 - 0.4 * x) - Mg - Mq)
+
+    def test_creep_reduces_the_final_prestress(self):
+        limit_states = SectionLimitStates(self.section)
+        x = {'Mg': np.full(2, 450E6), 'Mq': np.full(2, 400E6), 'theta_creep': np.array((0.0, 1.0))}
+        magnel = limit_states(x)['magnel']
+        self.assertLess(magnel[1], magnel[0])
+        with self.assertRaises(ValueError):
+            limit_states({'wind': np.zeros(2)})
+
+
+if __name__ == '__main__':
+    unittest.main()
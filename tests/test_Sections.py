@@ -1,6 +1,20 @@
+import os
+import subprocess
+import sys
 import unittest
+import numpy as np
 from StructEng.Sections.class_RectConcSect import RectConcSect
 from StructEng.Sections.class_TConcSect import TConcSect
+from StructEng.Sections.class_CrackWidth import CrackWidth
+from StructEng.Sections.class_CrackEquilibrium import CrackEquilibrium
+from StructEng.Sections.class_Dual import Dual
+from StructEng.Sections.class_Fatigue import Rainflow, SNCurve, Fatigue
+from StructEng.Sections.class_FireSection import FireSection, iso834
+from StructEng.Sections.class_StagedSection import StagedSection
+from StructEng.Sections.class_CompositeSection import CompositeSection
+from StructEng.Materials.class_Concrete import Concrete
+from StructEng.Materials.class_ReinforcementSteel import ReinforcementSteel
+from StructEng.Materials.class_PrestressSteel import PrestressSteel
 
 from scipy.integrate import quad
 
@@ -12,6 +26,24 @@ class TestConcSect(unittest.TestCase):
     def test_e_returns_correct_value(self):
         self.assertEqual(self.RectBeam_default.e(), self.RectBeam_default.dp - self.RectBeam_default.ycentroid())
 
+    def test_default_materials_are_shared(self):
+        self.assertIs(RectConcSect().concrete, TConcSect().concrete)
+        self.assertIs(RectConcSect().prestress_steel, self.RectBeam_default.prestress_steel)
+
+    def test_sections_do_not_modify_shared_concrete(self):
+        concrete = RectConcSect().concrete
+        h0 = concrete.h0
+        small, large = RectConcSect(b=300, h=500), RectConcSect(b=1000, h=2000)
+        self.assertEqual(concrete.h0, h0)
+        self.assertAlmostEqual(small.h0, 300 * 500 / 800)
+        self.assertGreater(small.phi_time(10000), large.phi_time(10000))
+
+    def test_classes_importable_from_package_root(self):
+        import StructEng
+        self.assertIs(StructEng.RectConcSect, RectConcSect)
+        with self.assertRaises(AttributeError):
+            StructEng.NotAClass
+
 
 class TestRectSect(unittest.TestCase):
     kwargs = {
@@ -172,6 +204,508 @@ class TestRectSect(unittest.TestCase):
         self.assertTrue(self.RectBeam.magnel_stress_limit(self.N, Mi, Mf))
 
 
+class TestCrackedSection(unittest.TestCase):
+    RectBeam = RectConcSect(b=300, h=800, As2=1800, ds2=740)
+    Tsect = TConcSect(b=1200, h=1000, t=300, t1=150, t2=100, As2=2000, ds2=950)
+
+    def test_y0_cr_is_the_neutral_axis(self):
+        for sect in (self.RectBeam, self.Tsect):
+            M = np.array([300E6, 600E6])
+            y0 = sect.y0_cr(-100E3, M)
+            for m, y in zip(M, y0):
+                self.assertAlmostEqual(sect.eps_cr(-100E3, m, y, y) * 1E6, 0)
+
+    def test_curvature_switches_to_cracked(self):
+        M = np.array([10E6, 600E6])
+        k = self.RectBeam.curvature(0, M)
+        self.assertEqual(k[0], self.RectBeam.k(0, M[0]))
+        self.assertEqual(k[1], self.RectBeam.k_cr(0, M[1], self.RectBeam.y0_cr(0, M[1])))
+
+
+class TestCrackWidth(unittest.TestCase):
+    RectBeam = RectConcSect(b=300, h=800, As2=1800, ds2=740)
+    crack = CrackWidth(RectBeam, phi=20, c=40)
+
+    def test_crack_width_matches_code_expressions(self):
+        M = 300E6
+        sect = self.RectBeam
+        x = sect.y0_cr(0, M)
+        sigma_s = sect.passive_steel.Es * sect.eps_cr(0, M, x, sect.ds2)
+        h_cef = min(2.5 * (sect.h - sect.ds2), (sect.h - x) / 3, sect.h / 2)
+        rho = sect.As2 / (sect.b * h_cef)
+        s_r = 3.4 * 40 + 0.8 * 0.5 * 0.425 * 20 / rho
+        eps = max((sigma_s - 0.4 * sect.concrete.f_ctm / rho * (1 + sect.ns * rho)) / sect.passive_steel.Es,
+                  0.6 * sigma_s / sect.passive_steel.Es)
+        self.assertAlmostEqual(self.crack.crack_spacing(0, M), s_r)
+        self.assertAlmostEqual(self.crack.crack_width(0, M), s_r * eps)
+
+    def test_batch_evaluation(self):
+        M = np.linspace(0, 500E6, 12).reshape(3, 4)
+        w = self.crack.crack_width(0, M)
+        self.assertEqual(w.shape, (3, 4))
+        self.assertEqual(w[0, 0], 0)
+        self.assertTrue(np.all(np.diff(w.ravel()) >= 0))
+        np.testing.assert_array_equal(self.crack.check(0, M, 0.3), w <= 0.3)
+
+    def test_tsect_effective_area_uses_web_width(self):
+        Tsect = TConcSect(b=1200, h=1000, t=300, t1=150, t2=100, As2=2000, ds2=950)
+        state = CrackWidth(Tsect).cracked_state(0, 800E6)
+        self.assertTrue(state['cracked'])
+        self.assertAlmostEqual(state['A_cef'], 300 * state['h_cef'])
+
+    def test_layered_sections_raise(self):
+        with self.assertRaises(ValueError):
+            CrackWidth(RectConcSect(b=300, h=800, As2=1800, ds2=740, layers=[(500, 700, ReinforcementSteel())]))
+
+
+class TestCrackEquilibrium(unittest.TestCase):
+    kwargs = {'b': 500, 'h': 1000, 'ds1': 60, 'ds2': 960, 'dp': 800, 'As1': 500, 'As2': 2000, 'Ap': 1000}
+    RectBeam = RectConcSect(**kwargs)
+    equilibrium = CrackEquilibrium(RectBeam, M=-3E9)
+
+    def test_eqM_matches_term_by_term_expression(self):
+        sect = self.RectBeam
+        E, fctm = sect.concrete.E_cm, sect.concrete.f_ctm
+        eps, y = -0.001, 600
+        k = (fctm - eps * E) / (y * E)
+        eqM = E * (eps * sect.b * pow(y, 2) / 2 + k * sect.b * pow(y, 3) / 3)
+        for A, d, Es in ((500, 60, 200E3), (2000, 960, 200E3), (1000, 800, 195E3)):
+            eqM += (eps + k * d) * Es * A * d
+        self.assertAlmostEqual(self.equilibrium.eqM(eps, y) / (eqM - 3E9), 1)
+
+    def test_zero_contour_points_are_roots(self):
+        EPS, Y, Z = self.equilibrium.surface(n=200)
+        eps, y = self.equilibrium.zero_contour(EPS, Y, Z)
+        self.assertGreater(len(eps), 0)
+        self.assertTrue(np.all(np.diff(eps) >= 0))
+        scale = np.abs(Z).max()
+        self.assertLess(np.abs(self.equilibrium.eqM(eps, y)).max() / scale, 1E-9)
+
+    def test_tsect_surface(self):
+        Tsect = TConcSect(b=1200, h=1000, t=300, t1=150, t2=100, As2=2000, ds2=950)
+        EPS, Y, Z = CrackEquilibrium(Tsect, M=-3E9).surface(n=50)
+        self.assertEqual(Z.shape, (50, 50))
+
+
+class TestSectionGradient(unittest.TestCase):
+    RectBeam = RectConcSect(b=400, h=1000, Ap=1400, As1=500, As2=1000, dp=850, ds2=950)
+    Tsect = TConcSect(b=1200, h=1000, t=300, t1=150, t2=100, Ap=1400, dp=850, As2=2000, ds2=950)
+    N, Mi, Mf = -1.8E6, 400E6, 900E6
+
+    def section_results(self, sect) -> dict:
+        """results of a ConcreteSection"""
+        return {'hmg_I': sect.hmgSect['I'], 'Wxo2_t': sect.hmgSect_t['Wxo2'], **self.load_results(sect, sect.dp)}
+
+    def gradient_results(self, grad) -> dict:
+        """results of a SectionGradient, with the prestress moment a Dual of dp"""
+        return {'hmg_I': grad.hmgSection()['I'], 'Wxo2_t': grad.hmgSection_t()['Wxo2'],
+                **self.load_results(grad, grad.variables['dp'])}
+
+    def load_results(self, sect, dp) -> dict:
+        N = self.N
+        return {'k': sect.k(N, self.Mi), 'eps_0_t': sect.eps_0_t(N, self.Mi),
+                'stress': sect.stress(N, self.Mi + N * dp, 700.), 'stress_t': sect.stress_t(N, self.Mi, 300.),
+                'magnel': sect.magnel_margins(N, self.Mi + N * dp, self.Mf + N * dp)}
+
+    def perturbed(self, sect, var, delta):
+        geometry = sect.geometry()
+        if var == 'fck':
+            return type(sect)(concrete=Concrete(fck=sect.concrete.fck + delta), **geometry)
+        geometry[var] += delta
+        return type(sect)(**geometry)
+
+    def test_values_and_central_differences(self):
+        for sect, wrt in ((self.RectBeam, ('b', 'h', 'Ap', 'dp', 'fck', 'As1', 'ds2')),
+                          (self.Tsect, ('b', 'h', 't', 't1', 't2', 'Ap', 'dp', 'fck'))):
+            grad = sect.gradient(wrt)
+            results = self.gradient_results(grad)
+            for name, value in self.section_results(sect).items():
+                np.testing.assert_allclose(results[name].value, value, rtol=1E-12, err_msg=name)
+            for var in wrt:
+                plus, minus = self.perturbed(sect, var, 1E-3), self.perturbed(sect, var, -1E-3)
+                plus, minus = self.section_results(plus), self.section_results(minus)
+                for name, result in results.items():
+                    fd = (np.asarray(plus[name]) - np.asarray(minus[name])) / 2E-3
+                    np.testing.assert_allclose(result.grad[var], fd, rtol=1E-5, atol=1E-5 * np.abs(fd).max(),
+                                               err_msg=f'{name} {var}')
+
+    def test_array_designs(self):
+        b, h = np.array([300., 400., 500.]), np.array([900., 1000., 1100.])
+        grad = RectConcSect(b=b, h=h, Ap=1400, dp=800, As2=1000, ds2=850).gradient()
+        margins = grad.magnel_margins(self.N, self.Mi, self.Mf)
+        self.assertEqual(margins.grad['b'].shape, (8, 3))
+        for i in range(3):
+            single = RectConcSect(b=b[i], h=h[i], Ap=1400, dp=800, As2=1000, ds2=850).gradient()
+            np.testing.assert_allclose(margins.grad['h'][:, i],
+                                       single.magnel_margins(self.N, self.Mi, self.Mf).grad['h'], rtol=1E-12)
+
+    def test_unknown_variable_raises(self):
+        with self.assertRaises(AttributeError):
+            self.RectBeam.gradient(('b', 't1'))
+
+    def test_gradient_modules_are_imported_on_first_use(self):
+        code = ('import sys; from StructEng.Sections.class_TConcSect import TConcSect; '
+                'assert "StructEng.Sections.class_SectionGradient" not in sys.modules; TConcSect().gradient(); '
+                'assert "StructEng.Sections.class_Dual" in sys.modules')
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, '-c', code], cwd=root, check=True)
+
+    def test_dual_arithmetic(self):
+        x, y = Dual.variables(x=2.0, y=3.0).values()
+        z = np.sqrt(x * y + x ** 2) / y - np.maximum(x, 1.0)
+        self.assertAlmostEqual(z.value, np.sqrt(10) / 3 - 2)
+        self.assertAlmostEqual(z.grad['x'], (3 + 4) / (2 * np.sqrt(10) * 3) - 1)
+        self.assertAlmostEqual(z.grad['y'], 2 / (2 * np.sqrt(10) * 3) - np.sqrt(10) / 9)
+
+
+class TestFatigue(unittest.TestCase):
+    RectBeam = RectConcSect(b=400, h=1000, Ap=1400, As2=1500, dp=850, ds2=950)
+
+    def test_rainflow_four_point_cycles(self):
+        ranges, counts = Rainflow.count([0, 10, 5, 8, 0])
+        np.testing.assert_allclose(ranges, [3, 10, 10])
+        np.testing.assert_allclose(counts, [1, 0.5, 0.5])
+
+    def test_streaming_matches_sequential_counting(self):
+        def sequential(x):
+            stack, full = [], []
+            for v in Rainflow.reversals(x):
+                stack.append(v)
+                while len(stack) >= 4 and abs(stack[-2] - stack[-3]) <= min(abs(stack[-3] - stack[-4]),
+                                                                             abs(stack[-1] - stack[-2])):
+                    full.append(abs(stack[-2] - stack[-3]))
+                    del stack[-3:-1]
+            return sorted(full), sorted(np.abs(np.diff(stack)))
+
+        rng = np.random.default_rng(1)
+        x = np.round(rng.standard_normal(2000) * 3)  # many equal ranges
+        counter = Rainflow()
+        full = np.concatenate([counter.push(piece) for piece in np.array_split(x, 7)])
+        expected_full, expected_half = sequential(x)
+        np.testing.assert_allclose(np.sort(full), expected_full)
+        np.testing.assert_allclose(np.sort(counter.half_cycles()), expected_half)
+
+    def test_sn_curve(self):
+        sn = SNCurve()
+        knee = sn.dsigma_Rsk / sn.gamma_s_fat
+        self.assertAlmostEqual(sn.cycles(knee), sn.N_star)
+        self.assertAlmostEqual(sn.cycles(knee * 2) * 2 ** sn.k1, sn.N_star)
+        self.assertAlmostEqual(sn.cycles(knee / 2) / 2 ** sn.k2, sn.N_star)
+        self.assertAlmostEqual(sn.damage([knee, 0], [1000, 5]), 1000 / sn.N_star)
+
+    def test_steel_stresses(self):
+        sect = self.RectBeam
+        N, M = -1.8E6, np.array([-1.2E9, -0.5E9])
+        fatigue = Fatigue(sect)
+        stresses = fatigue.steel_stresses(N, M)
+        # uncracked
+        self.assertAlmostEqual(stresses['As2'][0], sect.passive_steel.Es * sect.eps(N, M[0], sect.ds2))
+        # cracked
+        y0 = sect.y0_cr(N, M[1])
+        self.assertAlmostEqual(stresses['Ap'][1], sect.prestress_steel.Ep * sect.eps_cr(N, M[1], y0, sect.dp))
+
+    def test_fully_tensioned_section_uses_the_steels_only(self):
+        # resultant between the steels: no neutral axis within the cracked section
+        N = np.array((3E6, 2E6))
+        M = N * np.array((900, 880))
+        sect = self.RectBeam
+        self.assertTrue(np.all(np.isnan(sect.y0_cr(N, M))))
+        stresses = Fatigue(sect).steel_stresses(N, M)
+        forces = sect.As2 * stresses['As2'], sect.Ap * stresses['Ap']
+        np.testing.assert_allclose(forces[0] + forces[1], N)
+        np.testing.assert_allclose(forces[0] * sect.ds2 + forces[1] * sect.dp, M)
+
+    def test_damage_does_not_depend_on_chunks(self):
+        rng = np.random.default_rng(0)
+        N = -1.8E6
+        M = -1.0E9 + 1E9 * rng.random(5000)
+        whole = Fatigue(self.RectBeam).damage(N, M)
+        chunked = Fatigue(self.RectBeam, chunk=333).damage(N, M)
+        for key in whole:
+            self.assertGreater(whole[key], 0)
+            self.assertAlmostEqual(chunked[key] / whole[key], 1)
+
+    def test_layered_sections_raise(self):
+        with self.assertRaises(ValueError):
+            Fatigue(RectConcSect(b=400, h=1000, Ap=1400, As2=1500, dp=850, ds2=950,
+                                 layers=[(700, 900, PrestressSteel())]))
+
+
+class TestFireSection(unittest.TestCase):
+    RectBeam = RectConcSect(b=300, h=600, Ap=0, As2=1500, ds2=550)
+    Slab = RectConcSect(b=1000, h=200, Ap=0, As2=800, ds2=170)
+
+    def test_iso834(self):
+        self.assertAlmostEqual(float(iso834(60)), 945, delta=1)
+
+    def test_slab_temperatures(self):
+        # EN 1992-1-2 annex A, figure A.2: about 420 C at 30 mm from the exposed face after 60 minutes
+        fire = FireSection(self.Slab, dimension=1, exposure=('bottom',))
+        fields = fire.temperatures([0, 60])
+        np.testing.assert_allclose(fields[0], 20)
+        self.assertAlmostEqual(float(fire.temperature_at(fields, 170)[1]), 420, delta=40)
+        self.assertTrue(np.all(np.diff(fields[1, :, 0]) > 0))  # hotter towards the fire
+
+    def test_capacity_decreases_from_plastic_moment(self):
+        fire = FireSection(self.RectBeam, dx=10, dt=60)
+        capacity = fire.moment_capacity([0, 60, 120])
+        Fs = self.RectBeam.As2 * self.RectBeam.passive_steel.fyk
+        x = Fs / (self.RectBeam.concrete.fck * self.RectBeam.b)
+        self.assertAlmostEqual(capacity[0] / (Fs * (self.RectBeam.ds2 - x / 2)), 1, places=6)
+        self.assertTrue(np.all(np.diff(capacity) < 0))
+        self.assertEqual(fire.resistance_time(capacity[1], [0, 60, 120]), 120)
+
+    def test_step_history_is_reused(self):
+        fire = FireSection(self.RectBeam, dx=10, dt=60)
+        fields = fire.temperatures([90])
+        solution = fire.solution()
+        steps = len(solution.history) - 1  # other tests may have solved longer fires of the same beam
+        self.assertGreaterEqual(steps, 90)
+        self.assertLess(solution.factorizations, steps / 9)
+        same = RectConcSect(b=300, h=600, Ap=0, As2=1500, ds2=550)
+        self.assertIs(FireSection(same, dx=10, dt=60).solution(), solution)
+        np.testing.assert_array_equal(fire.temperatures([30, 90])[1], fields[0])  # no new steps
+        self.assertEqual(len(solution.history), steps + 1)
+        np.testing.assert_allclose(fire.temperatures([30.5])[0], (fire.temperatures([30])[0] +
+                                                                  fire.temperatures([31])[0]) / 2)
+
+    def test_array_sections_are_solved_together(self):
+        beams = RectConcSect(b=np.array((250, 300, 400)), h=600, Ap=0, As2=1500, ds2=550)
+        fire = FireSection(beams, dx=10, dt=60)
+        capacity = fire.moment_capacity([0, 60])
+        self.assertEqual(capacity.shape, (2, 3))
+        np.testing.assert_allclose(capacity[:, 1], FireSection(self.RectBeam, dx=10, dt=60).moment_capacity([0, 60]),
+                                   rtol=1E-5)
+        self.assertEqual(len(fire.solution().grids), 3)
+        self.assertEqual(fire.resistance_time(capacity[1, 1], [0, 60, 120]).shape, (3,))
+
+    def test_unconverged_step_raises(self):
+        with self.assertRaises(ValueError):
+            FireSection(self.Slab, dimension=1, tol=0).temperatures([60])
+
+    def test_invalid_exposure_raises(self):
+        with self.assertRaises(ValueError):
+            FireSection(self.RectBeam, exposure=('left',))
+
+    def test_layered_sections_raise(self):
+        with self.assertRaises(ValueError):
+            FireSection(RectConcSect(b=300, h=600, Ap=0, As2=1500, ds2=550, layers=[(500, 500, ReinforcementSteel())]))
+
+
+class TestStagedSection(unittest.TestCase):
+    Beam = RectConcSect(b=400, h=1000, Ap=1400, As2=1000, dp=850, ds2=950)
+    Slab = RectConcSect(concrete=Concrete(fck=25), b=2000, h=200, Ap=0, As1=0, As2=0)
+
+    @staticmethod
+    def resultant(staged, state):
+        """N, M of the concrete stresses of the active parts and of the bonded steels over the concrete they
+        replace. Equal to the external loads: prestress is internal"""
+        N = M = 0.0
+        for name, stresses in state['parts'].items():
+            part = staged.parts[name]
+            sect, y0 = part['section'], part['y']
+            b = (stresses['bottom'] - stresses['top']) / sect.h
+            a = stresses['top'] - b * y0
+            A, Q, I = sect.Ac, sect.Q_xtop + sect.Ac * y0, sect.I_xtop + 2 * y0 * sect.Q_xtop + sect.Ac * y0 * y0
+            N, M = N + a * A + b * Q, M + a * Q + b * I
+            steels = {f'{name}.As1': (sect.As1, sect.ds1), f'{name}.As2': (sect.As2, sect.ds2), name: (sect.Ap, sect.dp)}
+            for key, (area, y) in steels.items():
+                if key in state['steel']:
+                    force = area * (state['steel'][key] - (a + b * (y0 + y)))
+                    N, M = N + force, M + force * (y0 + y)
+        return N, M
+
+    def test_single_stage_matches_section(self):
+        sect, P, Mg = self.Beam, 1.8E6, 500E6
+        staged = StagedSection()
+        staged.add_part('beam', sect)
+        state = staged.stage(28, activate=('beam',), prestress={'beam': P}, M=Mg)
+        N, M = -P, Mg - P * sect.dp
+        self.assertAlmostEqual(state['parts']['beam']['top'], sect.stress(N, M, 0))
+        self.assertAlmostEqual(state['parts']['beam']['bottom'], sect.stress(N, M, sect.h))
+        self.assertAlmostEqual(state['steel']['beam'], P / sect.Ap + sect.prestress_steel.Ep * sect.eps(N, M, sect.dp))
+
+    def test_loads_after_composite_action_share_the_strain_plane(self):
+        staged = StagedSection()
+        staged.add_part('slab', self.Slab, cast=10)
+        staged.add_part('beam', self.Beam, y=200)
+        staged.stage(100, activate=('beam',), prestress={'beam': 1.8E6}, M=400E6)
+        before = staged.stress('beam', 200)
+        state = staged.stage(100, activate=('slab',), M=300E6)
+        E_slab, E_beam = self.Slab.concrete.Ecm_age(90), self.Beam.concrete.Ecm_age(100)
+        self.assertAlmostEqual(state['parts']['slab']['bottom'] / E_slab,
+                               (state['parts']['beam']['top'] - before) / E_beam)
+        np.testing.assert_allclose(self.resultant(staged, state), (0, 700E6), atol=1E-3)
+
+    def test_creep(self):
+        # plain concrete creeps freely: no stress change
+        plain = StagedSection()
+        plain.add_part('beam', RectConcSect(b=400, h=1000, Ap=0, As1=0, As2=0))
+        first = plain.stage(7, activate=('beam',), N=-1E6, M=300E6)
+        last = plain.stage(10000)
+        for fibre in ('top', 'bottom'):
+            self.assertAlmostEqual(last['parts']['beam'][fibre], first['parts']['beam'][fibre])
+        # the bonded steels take load from the concrete, the resultant stays the same
+        staged = StagedSection()
+        staged.add_part('beam', self.Beam)
+        first = staged.stage(7, activate=('beam',), prestress={'beam': 1.8E6}, M=400E6)
+        last = staged.stage(10000)
+        self.assertLess(last['steel']['beam'], first['steel']['beam'] - 50)  # creep loss
+        self.assertGreater(last['parts']['beam']['bottom'], 0.8 * first['parts']['beam']['bottom'])  # less compression
+        np.testing.assert_allclose(self.resultant(staged, last), (0, 400E6), atol=1E-3)
+
+    def test_stages_go_forward(self):
+        staged = StagedSection()
+        staged.add_part('beam', self.Beam, cast=5)
+        with self.assertRaises(ValueError):
+            staged.stage(3, activate=('beam',))
+        staged.stage(28, activate=('beam',))
+        with self.assertRaises(ValueError):
+            staged.stage(20)
+
+    def test_layered_parts_raise(self):
+        layered = RectConcSect(b=400, h=1000, Ap=1400, As2=1000, dp=850, ds2=950, layers=[(700, 900, PrestressSteel())])
+        with self.assertRaises(ValueError):
+            StagedSection().add_part('beam', layered)
+
+
+class TestCompositeSection(unittest.TestCase):
+    Beam = RectConcSect(b=400, h=1000, Ap=1400, As2=1000, dp=850, ds2=950)
+    Slab = RectConcSect(concrete=Concrete(fck=25), b=2000, h=200, Ap=0, As1=500, As2=500, ds1=40, ds2=160)
+
+    def test_single_part_matches_section(self):
+        sect, N, M = self.Beam, -1.8E6, 500E6 - 1.8E6 * 850
+        composite = CompositeSection({'beam': (sect, 0.0)})
+        for key in ('A', 'Q', 'I'):
+            self.assertAlmostEqual(composite.hmgSect[key] / sect.hmgSection()[key], 1)
+        self.assertAlmostEqual(composite.stress(N, M, sect.h, 'beam'), sect.stress(N, M, sect.h))
+        self.assertAlmostEqual(composite.k(N, M) / sect.k(N, M), 1)
+
+    def test_matches_staged_section_loaded_at_once(self):
+        staged = StagedSection()
+        staged.add_part('slab', self.Slab, cast=10)
+        staged.add_part('beam', RectConcSect(b=400, h=1000, Ap=0, As2=1000, ds2=950), y=200)
+        state = staged.stage(100, activate=('beam', 'slab'), N=-1E6, M=800E6)
+        composite = CompositeSection({'beam': (staged.parts['beam']['section'], 200, 100),
+                                      'slab': (self.Slab, 0.0, 90)})
+        for name, stresses in composite.stresses(-1E6, 800E6).items():
+            for fibre, stress in stresses.items():
+                self.assertAlmostEqual(stress, state['parts'][name][fibre])
+
+    def test_interface_strains_are_compatible(self):
+        composite = CompositeSection({'slab': (self.Slab, 0.0, 28), 'beam': (self.Beam, 200, 400)})
+        stresses = composite.stresses(0, 900E6)
+        eps_slab = stresses['slab']['bottom'] / composite.parts['slab']['E']
+        eps_beam = stresses['beam']['top'] / composite.parts['beam']['E']
+        self.assertAlmostEqual(eps_slab, eps_beam)
+        self.assertGreater(composite.m['beam'], 1)
+
+    def test_variants_match_scalar_composites(self):
+        b, t = np.meshgrid([1500, 2000, 2500], [150, 200])
+        slab = RectConcSect(concrete=Concrete(fck=25), b=b, h=t, Ap=0, As1=500, As2=500, ds1=40, ds2=t - 40)
+        stresses = CompositeSection({'slab': (slab, 0.0, 60), 'beam': (self.Beam, t, 400)}).stresses(-1E6, 900E6)
+        for i, j in np.ndindex(b.shape):
+            scalar = RectConcSect(concrete=Concrete(fck=25), b=b[i, j], h=t[i, j], Ap=0, As1=500, As2=500, ds1=40,
+                                  ds2=t[i, j] - 40)
+            expected = CompositeSection({'slab': (scalar, 0.0, 60), 'beam': (self.Beam, t[i, j], 400)})
+            for name, fibres in expected.stresses(-1E6, 900E6).items():
+                for fibre, stress in fibres.items():
+                    self.assertAlmostEqual(stresses[name][fibre][i, j], stress)
+
+
+class TestReinforcementLayers(unittest.TestCase):
+    Strands = [(700, 900, PrestressSteel()), (560, 850, PrestressSteel()), (140, 850, PrestressSteel(), False)]
+    Beam = RectConcSect(b=400, h=1000, As2=1000, ds2=950, Ap=700, dp=800, layers=Strands)
+
+    def test_layer_equals_main_reinforcement(self):
+        layered = RectConcSect(b=400, h=1000, As2=0, Ap=0, layers=[(1000, 950, ReinforcementSteel()),
+                                                                   (1400, 850, PrestressSteel())])
+        plain = RectConcSect(b=400, h=1000, As2=1000, ds2=950, Ap=1400, dp=850)
+        for key in ('A', 'Q', 'I', 'Wxo2'):
+            self.assertAlmostEqual(layered.hmgSect[key] / plain.hmgSect[key], 1)
+            self.assertAlmostEqual(layered.hmgSect_t[key] / plain.hmgSect_t[key], 1)
+
+    def test_sections_without_layers_match_the_rows(self):
+        plain = RectConcSect(b=400, h=1000, As1=300, As2=1000, ds2=950, Ap=1400, dp=850)
+        empty_row = RectConcSect(b=400, h=1000, As1=300, As2=1000, ds2=950, Ap=1400, dp=850,
+                                 layers=[(0, 500, ReinforcementSteel())])
+        for key in plain.hmgSect:
+            self.assertAlmostEqual(plain.hmgSect[key] / empty_row.hmgSect[key], 1)
+            self.assertAlmostEqual(plain.hmgSect_t[key] / empty_row.hmgSect_t[key], 1)
+        np.testing.assert_allclose(plain.tendons(), empty_row.tendons())
+        np.testing.assert_array_equal(plain.rebar['A'], [300, 1000, 1400])  # built on first use
+
+    def test_set_layers(self):
+        sect = RectConcSect(b=400, h=1000, As2=1000, ds2=950, Ap=700, dp=800)
+        sect.set(layers=self.Strands)
+        self.assertEqual(sect.hmgSect, self.Beam.hmgSect)
+        self.assertEqual(sect.tendons(), self.Beam.tendons())
+
+    def test_unbonded_rows_are_left_out(self):
+        bonded = RectConcSect(b=400, h=1000, As2=1000, ds2=950, Ap=700, dp=800, layers=self.Strands[:2])
+        self.assertEqual(self.Beam.hmgSect, bonded.hmgSect)
+        stresses = self.Beam.bar_stresses(-1E6, 600E6)
+        self.assertEqual(stresses[-1], 0)
+        self.assertAlmostEqual(stresses[1], self.Beam.passive_steel.Es * self.Beam.eps(-1E6, 600E6, 950))
+        self.assertAlmostEqual(stresses[3], self.Beam.prestress_steel.Ep * self.Beam.eps(-1E6, 600E6, 900))
+
+    def test_tendons(self):
+        Ap, dp = self.Beam.tendons()
+        self.assertEqual(Ap, 2100)
+        self.assertAlmostEqual(dp, (700 * 800 + 700 * 900 + 700 * 850) / 2100)
+
+    def test_variants_match_scalar_sections(self):
+        h = np.array([900., 1000., 1100.])
+        sect = RectConcSect(b=400, h=h, As2=1000, ds2=h - 50, Ap=700, dp=800, layers=self.Strands)
+        y = np.array([[200.], [400.]])
+        stresses = sect.bar_stresses(-1E6, 600E6)
+        for i, hi in enumerate(h):
+            scalar = RectConcSect(b=400, h=hi, As2=1000, ds2=hi - 50, Ap=700, dp=800, layers=self.Strands)
+            for key in ('A', 'Q', 'I'):
+                self.assertAlmostEqual(sect.hmgSect[key][i] / scalar.hmgSect[key], 1)
+                np.testing.assert_allclose(sect.hmgSection_y(y)[key][:, i], scalar.hmgSection_y(y[:, 0])[key])
+            np.testing.assert_allclose(stresses[:, i], scalar.bar_stresses(-1E6, 600E6))
+
+    def test_bar_stresses_of_load_arrays(self):
+        M = np.linspace(100E6, 900E6, 5)
+        self.assertEqual(self.Beam.bar_stresses(-1E6, M).shape, (6, 5))
+
+    def test_eccentricity_and_creep_use_every_tendon(self):
+        sect = RectConcSect(b=400, h=1000, Ap=0, layers=[(500, 950, PrestressSteel()), (500, 900, PrestressSteel())])
+        self.assertEqual(sect.tendons()[1], 925)
+        self.assertEqual(sect.ecc, 925 - sect.y_cen)
+        self.assertAlmostEqual(sect.hmgSect['ecc'], 925 - sect.hmgSect['y_cen'])
+        self.assertAlmostEqual(sect.creep_loss(-1E6, 200E6, 10000),
+                               -sect.prestress_steel.Ep * sect.eps(-1E6, 200E6, 925) * sect.phi_time(10000))
+        ecc = self.Beam.gradient(('Ap', 'dp')).hmgSection()['ecc']
+        self.assertAlmostEqual(ecc.value, self.Beam.hmgSect['ecc'])
+        shifted = RectConcSect(b=400, h=1000, As2=1000, ds2=950, Ap=700, dp=800 + 1E-3, layers=self.Strands)
+        self.assertAlmostEqual(ecc.grad['dp'], (shifted.hmgSect['ecc'] - ecc.value) / 1E-3, places=4)
+
+    def test_crack_equilibrium_uses_every_row(self):
+        layered = RectConcSect(b=400, h=1000, As2=0, Ap=0, layers=[(1000, 950, ReinforcementSteel()),
+                                                                   (1400, 850, PrestressSteel()),
+                                                                   (300, 800, PrestressSteel(), False)])
+        plain = RectConcSect(b=400, h=1000, As2=1000, ds2=950, Ap=1400, dp=850)
+        eps, y = np.linspace(-0.003, -0.0005, 5), np.linspace(300, 900, 5)
+        np.testing.assert_allclose(CrackEquilibrium(layered, M=-2E9).eqM(eps, y),
+                                   CrackEquilibrium(plain, M=-2E9).eqM(eps, y))
+        np.testing.assert_allclose(layered.y0_cr(-1E6, 900E6), plain.y0_cr(-1E6, 900E6))
+
+    def test_dict_round_trip(self):
+        sect = RectConcSect.from_dict(self.Beam.to_dict())
+        self.assertEqual(sect.hmgSect, self.Beam.hmgSect)
+        self.assertEqual(sect.rebar, self.Beam.rebar)
+
+    def test_gradient_includes_layers(self):
+        N, M = -1E6, 600E6
+        stress = self.Beam.gradient(('h', 'fck')).stress(N, M, 1000)
+        self.assertAlmostEqual(stress.value, self.Beam.stress(N, M, 1000))
+        stresses = [RectConcSect(concrete=Concrete(fck=30 + delta), b=400, h=1000, As2=1000, ds2=950, Ap=700,
+                                 dp=800, layers=self.Strands).stress(N, M, 1000) for delta in (-1E-3, 1E-3)]
+        self.assertAlmostEqual(stress.grad['fck'], (stresses[1] - stresses[0]) / 2E-3, places=6)
+
+
 class TestTsect(unittest.TestCase):
 
     kwargs = {
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from StructEng.cli import main, job_section
+from StructEng.IO.class_SectionBatch import SectionBatch
+
+
+class TestCli(unittest.TestCase):
+    job = {'section': {'type': 'TConcSect', 'b': 800, 'h': 1200, 't': 300, 'Ap': 1500, 'dp': 1050,
+                       'concrete': {'fck': 40}},
+           'N': -1500E3, 'M': -1200E6}
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.job_path = os.path.join(self.dir.name, 'job.json')
+        with open(self.job_path, 'w') as f:
+            json.dump(self.job, f)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_loss_history_matches_creep_loss(self):
+        out = os.path.join(self.dir.name, 'loss.csv')
+        self.assertEqual(main(['loss', self.job_path, '-o', out, '--points', '20']), 0)
+        t, loss = np.loadtxt(out, delimiter=',', skiprows=1, unpack=True)
+        section = job_section(self.job)
+        self.assertEqual(section.concrete.fck, 40)
+        np.testing.assert_allclose(loss, section.creep_loss(self.job['N'], self.job['M'], t), rtol=1E-6)
+        self.assertTrue(np.all(np.diff(loss) > 0))
+
+    def test_magnel_with_workers_and_npy_output(self):
+        schedule = os.path.join(self.dir.name, 'schedule.csv')
+        with open(schedule, 'w') as f:
+            f.write('b,h,Ap,dp,N,Mi,Mf\n')
+            for Mf in np.linspace(-1000E6, 1500E6, 11):
+                f.write(f'500,1000,1000,850,-1000E3,{100E6 - 850E6},{Mf}\n')
+        csv, npy = os.path.join(self.dir.name, 'out.csv'), os.path.join(self.dir.name, 'out')
+        self.assertEqual(main(['magnel', schedule, '-o', csv, '--chunk', '3']), 0)
+        self.assertEqual(main(['magnel', schedule, '-o', npy, '--workers', '2', '--chunk', '3',
+                               '--format', 'npy']), 0)
+        out = np.loadtxt(csv, delimiter=',', skiprows=1)
+        for i, name in enumerate(SectionBatch.output_columns):
+            np.testing.assert_allclose(np.load(os.path.join(npy, f'{name}.npy')), out[:, i], rtol=1E-5,
+                                       err_msg=name)
+        self.assertTrue(0 < out[:, -1].sum() < 11)  # some rows pass and some fail
+
+    def test_batch_options_of_magnel_only(self):
+        out = os.path.join(self.dir.name, 'loss.csv')
+        for option in ('--workers', '--chunk'):
+            with self.assertRaises(SystemExit):
+                main(['loss', self.job_path, '-o', out, option, '2'])
+
+    def test_missing_job_returns_error(self):
+        self.assertEqual(main(['creep', os.path.join(self.dir.name, 'none.json'), '-o', 'x.csv']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()